@@ -0,0 +1,126 @@
+"""
+Benchmark: per-request Icons8 clients vs. one shared pooled client.
+
+Runs full face swaps (get_bbox -> process_image -> status poll) against a
+local Icons8 stand-in and reports wall time and how many TCP connections the
+stand-in saw. The old behaviour created a new AsyncClient for every request
+and never closed it; the shared client should reuse a handful of keepalive
+connections for the whole run.
+
+Usage:
+    python scripts/benchmarks/icons8_connection_reuse.py --swaps 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from discovita.service.icons8.client import Icons8Client
+from discovita.service.icons8.client.http import (
+    close_shared_http_clients,
+    get_shared_http_client,
+)
+from discovita.service.icons8.icons8_service import Icons8Service
+
+SOURCE_URL = "https://example.com/source.jpg"
+TARGET_URL = "https://example.com/target.jpg"
+FACE = {"bbox": [10, 10, 200, 200, 0.99], "landmarks": [0.0] * 10}
+
+
+def create_stand_in(connections: Set[Tuple[str, int]]) -> FastAPI:
+    """Minimal Icons8 stand-in that records every client connection."""
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def record_connection(request: Request, call_next):
+        connections.add(tuple(request.scope["client"]))
+        return await call_next(request)
+
+    @app.post("/get_bbox")
+    async def get_bbox(payload: dict):
+        return [{"img_url": url, "faces": [FACE]} for url in payload["urls"]]
+
+    @app.post("/process_image")
+    async def process_image():
+        return {"id": "job", "status": 0, "statusName": "queue"}
+
+    @app.get("/process_image/{job_id}")
+    async def job_status(job_id: str):
+        return {
+            "id": job_id,
+            "status": 2,
+            "statusName": "ready",
+            "processed": {
+                "width": 1024,
+                "height": 1024,
+                "type": "jpeg",
+                "url": "https://example.com/result.jpg",
+            },
+        }
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_swaps(base_url: str, swaps: int, concurrency: int, shared: bool) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_swap() -> None:
+        async with semaphore:
+            http_client = get_shared_http_client(base_url) if shared else None
+            # The per-request variant mirrors the old dependency: a fresh
+            # client for every request that is never closed.
+            client = Icons8Client("bench-key", base_url, http_client=http_client)
+            service = Icons8Service(client)
+            service.polling_interval = 0
+            await service.swap_faces(SOURCE_URL, TARGET_URL)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_swap() for _ in range(swaps)))
+    return time.perf_counter() - start
+
+
+async def main(swaps: int, concurrency: int) -> None:
+    connections: Set[Tuple[str, int]] = set()
+    port = free_port()
+    server = start_server(create_stand_in(connections), port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    print(f"{swaps} swaps, concurrency {concurrency}, 3 HTTP calls per swap\n")
+    print(f"{'mode':<20}{'seconds':>10}{'swaps/s':>10}{'connections':>14}")
+    for label, shared in (("per-request client", False), ("shared client", True)):
+        connections.clear()
+        elapsed = await run_swaps(base_url, swaps, concurrency, shared)
+        print(f"{label:<20}{elapsed:>10.2f}{swaps / elapsed:>10.1f}{len(connections):>14}")
+
+    await close_shared_http_clients()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--swaps", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.swaps, args.concurrency))
@@ -0,0 +1,92 @@
+"""
+Benchmark: bytes saved and cost of upload normalization.
+
+Generates phone-camera sized test images and reports, for each one:
+- the original size
+- the normalized size
+- the normalization time
+
+It then normalizes a burst of uploads through the ImageNormalizer process
+pool while a 10 ms ticker measures the longest event loop stall.
+
+Usage:
+    python scripts/benchmarks/image_normalization.py --uploads 16
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from PIL import Image
+
+from discovita.service.imaging import ImageNormalizer, normalize_image
+
+
+def photo_like(width: int, height: int) -> Image.Image:
+    """Noisy gradient: compresses about as badly as a real photo."""
+    noise = Image.effect_noise((width, height), 40).convert("L")
+    gradient = Image.linear_gradient("L").resize((width, height))
+    return Image.merge("RGB", (noise, gradient, gradient.rotate(90)))
+
+
+def encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+async def burst(normalizer: ImageNormalizer, content: bytes, uploads: int):
+    max_stall = 0.0
+    running = True
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_stall = max(max_stall, time.perf_counter() - before - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(normalizer.normalize(content) for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await tick
+    return elapsed, max_stall * 1000
+
+
+async def main(uploads: int) -> None:
+    photo = photo_like(4032, 3024)
+    samples = {
+        "4032x3024 JPEG q95": encode(photo, "JPEG", quality=95),
+        "4032x3024 PNG": encode(photo, "PNG"),
+    }
+
+    print(f"{'input':<22}{'original KB':>13}{'normalized KB':>15}{'ms':>8}")
+    for label, content in samples.items():
+        start = time.perf_counter()
+        normalized = normalize_image(content)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"{label:<22}{len(content) / 1024:>13.0f}"
+            f"{len(normalized.content) / 1024:>15.0f}{elapsed:>8.0f}"
+        )
+
+    normalizer = ImageNormalizer()
+    try:
+        await normalizer.normalize(samples["4032x3024 JPEG q95"])  # start the workers
+        elapsed, stall = await burst(normalizer, samples["4032x3024 JPEG q95"], uploads)
+    finally:
+        normalizer.close()
+    print(
+        f"\n{uploads} concurrent JPEG uploads through the pool: "
+        f"{elapsed:.2f} s, max event loop stall {stall:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.uploads))
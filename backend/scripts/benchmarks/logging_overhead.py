@@ -0,0 +1,109 @@
+"""
+Benchmark: per-request logging overhead, synchronous handlers vs. the queue pipeline.
+
+Simulates the logging a request does (a few INFO lines plus DEBUG payload
+dumps that are filtered out at INFO level) and reports the time spent in
+the calling thread per request:
+
+- sync:     the previous setup, StreamHandler + FileHandler on the root logger
+            and unguarded `json.dumps(..., indent=2)` debug calls
+- pipeline: configure_app_logging() (queue + listener thread) with
+            `isEnabledFor` guards around the debug dumps
+
+Usage:
+    python scripts/benchmarks/logging_overhead.py --requests 5000
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from discovita.utils.logger.pipeline import APP_LOG_FORMAT, configure_app_logging
+
+PAYLOAD = {
+    "records": [
+        {"id": i, "Email": f"user{i}@example.com", "Full Name": f"User {i}"}
+        for i in range(50)
+    ]
+}
+
+logger = logging.getLogger("benchmark.request")
+
+
+def log_request_unguarded(request_id: int) -> None:
+    logger.info(f"Making GET request to /collections with params: {{'offset': {request_id}}}")
+    logger.info(f"Response status: {200}")
+    logger.debug(f"Raw API response: {json.dumps(PAYLOAD, indent=2)}")
+    logger.info(f"Request {request_id} done")
+
+
+def log_request_guarded(request_id: int) -> None:
+    logger.info("Making GET request to /collections with params: %s", {"offset": request_id})
+    logger.info("Response status: %s", 200)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw API response: %s", json.dumps(PAYLOAD, indent=2))
+    logger.info("Request %s done", request_id)
+
+
+def reset_root() -> logging.Logger:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.INFO)
+    return root
+
+
+def measure(log_request, requests: int) -> float:
+    start = time.perf_counter()
+    for request_id in range(requests):
+        log_request(request_id)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def run_sync(log_dir: Path, requests: int) -> float:
+    root = reset_root()
+    formatter = logging.Formatter(APP_LOG_FORMAT)
+    for handler in (logging.StreamHandler(), logging.FileHandler(log_dir / "sync.log")):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    return measure(log_request_unguarded, requests)
+
+
+def run_pipeline(log_dir: Path, requests: int) -> float:
+    reset_root()
+    listener = configure_app_logging(log_dir=str(log_dir), log_filename="pipeline.log")
+    try:
+        return measure(log_request_guarded, requests)
+    finally:
+        listener.stop()
+
+
+def main(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        # Console output goes to /dev/null so the terminal does not dominate.
+        real_stderr, sys.stderr = sys.stderr, open("/dev/null", "w")
+        try:
+            sync_us = run_sync(log_dir, requests)
+            pipeline_us = run_pipeline(log_dir, requests)
+        finally:
+            sys.stderr.close()
+            sys.stderr = real_stderr
+        reset_root()
+
+    print(f"{requests} simulated requests, 3 INFO records + 1 filtered DEBUG dump each\n")
+    print(f"{'setup':<12}{'us/request (caller thread)':>28}")
+    print(f"{'sync':<12}{sync_us:>28.1f}")
+    print(f"{'pipeline':<12}{pipeline_us:>28.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,172 @@
+"""
+Benchmark: buffered vs. streaming uploads to S3.
+
+Uploads spooled files (as FastAPI hands them to the route) to a local moto S3
+server and reports, per upload:
+
+- throughput
+- peak Python memory allocated while uploading (tracemalloc)
+- the longest event loop stall seen by a 10 ms ticker running alongside
+
+The buffered path is the previous route: `await file.read()`, a
+FileUploadRequest copy, then a blocking put_object inside the coroutine.
+The streaming path is S3Service.upload_fileobj in a worker thread.
+
+Usage:
+    pip install "moto[server]"
+    python scripts/benchmarks/s3_upload.py --sizes 1 16 64
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Awaitable, Callable, Tuple
+
+import boto3
+from boto3.s3.transfer import create_transfer_manager
+from fastapi.concurrency import run_in_threadpool
+
+from discovita.config import Settings
+from discovita.service.s3 import FileUploadRequest, S3Service
+
+MB = 1024 * 1024
+BUCKET = "benchmark-bucket"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_moto(port: int) -> subprocess.Popen:
+    """Run moto in a separate process so its memory is not measured."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("moto server did not start")
+
+
+def make_service(endpoint: str) -> S3Service:
+    settings = Settings(
+        icons8_api_key="",
+        icons8_base_url="",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        aws_region="us-east-1",
+        s3_bucket=BUCKET,
+        openai_api_key="",
+        adalo_app_id="",
+        adalo_api_key="",
+    )
+    service = S3Service(settings)
+    service.client = boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+    service.transfer_manager = create_transfer_manager(service.client, service.transfer_config)
+    service.client.create_bucket(Bucket=BUCKET)
+    return service
+
+
+def spooled_file(size: int) -> tempfile.SpooledTemporaryFile:
+    """A file like the one Starlette gives UploadFile (spooled above 1 MB)."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=MB)
+    chunk = os.urandom(MB)
+    for _ in range(size // MB):
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+async def buffered_upload(service: S3Service, spooled) -> str:
+    content = spooled.read()
+    request = FileUploadRequest(filename="image.jpg", content_type="image/jpeg", content=content)
+    return _put_object(service, request)
+
+
+def _put_object(service: S3Service, request: FileUploadRequest) -> str:
+    key = f"uploads/{uuid.uuid4()}.jpg"
+    service.client.put_object(
+        Bucket=service.bucket, Key=key, Body=request.content, ContentType=request.content_type
+    )
+    return key
+
+
+async def streaming_upload(service: S3Service, spooled) -> str:
+    return await run_in_threadpool(service.upload_fileobj, spooled, "image.jpg", "image/jpeg")
+
+
+async def measure(
+    upload: Callable[[S3Service, object], Awaitable[str]], service: S3Service, size: int
+) -> Tuple[float, float, float]:
+    """Returns (MB/s, peak MB allocated, max event loop stall in ms)."""
+    max_stall = 0.0
+    running = True
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_stall = max(max_stall, time.perf_counter() - before - 0.01)
+
+    with spooled_file(size) as spooled:
+        tick = asyncio.create_task(ticker())
+        await asyncio.sleep(0.02)
+        tracemalloc.start()
+        start = time.perf_counter()
+        await upload(service, spooled)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        running = False
+        await tick
+
+    return size / MB / elapsed, peak / MB, max_stall * 1000
+
+
+async def main(sizes_mb) -> None:
+    port = free_port()
+    server = start_moto(port)
+    try:
+        service = make_service(f"http://127.0.0.1:{port}")
+        # Warm up the connection pool and the transfer threads
+        for upload in (buffered_upload, streaming_upload):
+            await measure(upload, service, MB)
+        print(f"{'size':>6}  {'path':<10}{'MB/s':>8}{'peak MB':>10}{'max stall ms':>14}")
+        for size_mb in sizes_mb:
+            for label, upload in (("buffered", buffered_upload), ("streaming", streaming_upload)):
+                rate, peak, stall = await measure(upload, service, size_mb * MB)
+                print(f"{size_mb:>4}MB  {label:<10}{rate:>8.1f}{peak:>10.1f}{stall:>14.1f}")
+    finally:
+        service.close()
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,81 @@
+"""
+Build the precomputed scene library used by the identity pipeline.
+
+Generates a person-neutral HD scene for each (setting, outfit, emotion)
+combination, stores it in the S3 asset store, detects its face with Icons8
+and writes everything to a JSON manifest. Point SCENE_LIBRARY_PATH at the
+manifest to serve matching pipeline requests with a face swap alone.
+
+Combinations already in the manifest are kept and not generated again.
+
+Usage:
+    python scripts/scenes/build_scene_library.py \\
+        --combinations scripts/scenes/combinations.example.json \\
+        --output scene_library.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import List
+
+from discovita.api.routes.face_swap import get_icons8_service
+from discovita.config import Settings
+from discovita.service.assets import get_shared_asset_mirror
+from discovita.service.icons8.client.http import close_shared_http_clients
+from discovita.service.openai.core import OpenAIService
+from discovita.service.openai.core.image_generation import (
+    ImageGenerationService,
+    get_generation_slots,
+)
+from discovita.service.openai.core.prompt_safety import get_cleaned_prompt_cache
+from discovita.service.scenes import (
+    SceneCombination,
+    SceneIndex,
+    SceneLibrary,
+    SceneLibraryBuilder,
+)
+from discovita.utils.http import close_download_client
+
+
+def read_combinations(path: str) -> List[SceneCombination]:
+    with open(path) as f:
+        return [SceneCombination.model_validate(item) for item in json.load(f)]
+
+
+async def main(combinations_path: str, output: str) -> None:
+    settings = Settings.from_env()
+    existing = SceneLibrary.load(output)
+    todo = [
+        c for c in read_combinations(combinations_path)
+        if SceneIndex.key(c.setting, c.outfit, c.emotion) not in existing.index
+    ]
+    print(f"{len(existing)} scenes in the library, {len(todo)} to generate")
+
+    builder = SceneLibraryBuilder(
+        ImageGenerationService(
+            OpenAIService(api_key=settings.openai_api_key),
+            slots=get_generation_slots(settings.image_generation_concurrency),
+            prompt_cache=get_cleaned_prompt_cache(),
+        ),
+        get_icons8_service(settings),
+        get_shared_asset_mirror(settings),
+    )
+    try:
+        built = await builder.build(todo)
+    finally:
+        await close_shared_http_clients()
+        await close_download_client()
+
+    SceneLibrary.save(existing.scenes + built, output)
+    print(f"Generated {len(built)} of {len(todo)} scenes, wrote {output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--combinations", required=True)
+    parser.add_argument("--output", default="scene_library.json")
+    args = parser.parse_args()
+    asyncio.run(main(args.combinations, args.output))
@@ -2,11 +2,21 @@
 
 from discovita.config import Settings
 from discovita.dependencies import get_settings
+from discovita.service.assets import AssetMirror, get_shared_asset_mirror
 from discovita.service.coach.prompt.manager import PromptManager
 from discovita.service.coach.service import CoachService
 from discovita.service.openai.core import OpenAIService
+from discovita.service.openai.core.base import get_openai_single_flight
+from discovita.service.openai.core.description_cache import get_description_cache
 from discovita.service.openai.core.image_description import ImageDescriptionService
-from discovita.service.openai.core.image_generation import ImageGenerationService
+from discovita.service.openai.core.image_generation import (
+    ImageGenerationService,
+    get_generation_slots,
+)
+from discovita.service.openai.core.prompt_safety import get_cleaned_prompt_cache
+from discovita.service.openai.core.rate_limit import get_shared_openai_http_client
+from discovita.service.scenes import SceneLibrary, get_shared_scene_library
+from discovita.utils.content_hash import get_content_hasher
 from fastapi import Depends
 
 
@@ -16,21 +26,43 @@ async def get_openai_service(
     """Get OpenAI client."""
     return OpenAIService(
         api_key=settings.openai_api_key,
+        http_client=get_shared_openai_http_client(settings),
+        in_flight=get_openai_single_flight(),
     )
 
 
+def get_asset_mirror(settings: Settings = Depends(get_settings)) -> AssetMirror:
+    """Get the asset mirror for expiring image URLs."""
+    return get_shared_asset_mirror(settings)
+
+
+def get_scene_library(settings: Settings = Depends(get_settings)) -> SceneLibrary:
+    """Get the precomputed scene library."""
+    return get_shared_scene_library(settings)
+
+
 async def get_image_description_service(
     open_ai_service: OpenAIService = Depends(get_openai_service),
+    settings: Settings = Depends(get_settings),
 ) -> ImageDescriptionService:
     """Get image description service."""
-    return ImageDescriptionService(open_ai_service)
+    return ImageDescriptionService(
+        open_ai_service,
+        cache=get_description_cache(),
+        hasher=get_content_hasher(settings),
+    )
 
 
 async def get_image_generation_service(
     open_ai_service: OpenAIService = Depends(get_openai_service),
+    settings: Settings = Depends(get_settings),
 ) -> ImageGenerationService:
     """Get image generation service."""
-    return ImageGenerationService(open_ai_service)
+    return ImageGenerationService(
+        open_ai_service,
+        slots=get_generation_slots(settings.image_generation_concurrency),
+        prompt_cache=get_cleaned_prompt_cache(),
+    )
 
 
 async def get_coach_service(
@@ -0,0 +1,272 @@
+"""Idempotency-Key support: replay the stored response of a repeated request."""
+
+import asyncio
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.cache import TTLCache
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# Expensive endpoints a mobile client retries after a timeout
+IDEMPOTENT_PATHS = (
+    "/api/v1/generate",
+    "/api/v1/swap",
+    "/api/v1/coach/user_input",
+)
+
+
+@dataclass
+class IdempotencyRecord:
+    """A request seen under an idempotency key, and its response once finished."""
+    fingerprint: str  # SHA-256 of the request body
+    status_code: Optional[int] = None  # None while the request is running
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    @property
+    def complete(self) -> bool:
+        return self.status_code is not None
+
+
+class IdempotencyStore(ABC):
+    """
+    Where requests with an idempotency key and their responses are kept.
+
+    Implement it on a shared store (e.g. Redis) to deduplicate retries
+    across worker processes; `MemoryIdempotencyStore` covers one process.
+    """
+
+    poll_interval: float = 0.25
+
+    @abstractmethod
+    async def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """
+        Atomically record a new request under `key`.
+
+        Returns None if the caller now owns the key and must run the
+        request, otherwise the record already stored under it.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """The record under `key`, if any."""
+
+    @abstractmethod
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        """Store the finished response of a claimed request."""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Forget a claimed request that failed, so a retry runs it again."""
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        """
+        Wait up to `timeout` seconds for the request under `key` to finish.
+
+        Returns the record (still pending on timeout), or None if the
+        request was released. Polls by default.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            record = await self.get(key)
+            if record is None or record.complete or time.monotonic() >= deadline:
+                return record
+            await asyncio.sleep(self.poll_interval)
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Idempotency records in process memory.
+
+    Finished responses are kept for `ttl` seconds. A claim that is never
+    completed or released (e.g. its worker died) expires after
+    `pending_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 24 * 60 * 60,
+        pending_ttl: float = 10 * 60,
+        max_entries: int = 4096,
+    ):
+        self._completed: TTLCache[str, IdempotencyRecord] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._pending: TTLCache[str, IdempotencyRecord] = TTLCache(max_entries=max_entries, ttl=pending_ttl)
+        self._finished: Dict[str, asyncio.Event] = {}
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        existing = await self.get(key)
+        if existing is not None:
+            return existing
+        self._pending.set(key, IdempotencyRecord(fingerprint=fingerprint))
+        self._finished[key] = asyncio.Event()
+        return None
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        return self._completed.get(key) or self._pending.get(key)
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        self._completed.set(key, record)
+        self._finish(key)
+
+    async def release(self, key: str) -> None:
+        self._finish(key)
+
+    def _finish(self, key: str) -> None:
+        self._pending.delete(key)
+        finished = self._finished.pop(key, None)
+        if finished is not None:
+            finished.set()
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        finished = self._finished.get(key)
+        if finished is not None:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(key)
+
+
+def _json_response(status_code: int, detail: str) -> IdempotencyRecord:
+    return IdempotencyRecord(
+        fingerprint="",
+        status_code=status_code,
+        headers=[(b"content-type", b"application/json")],
+        body=json.dumps({"detail": detail}).encode(),
+    )
+
+
+class IdempotencyMiddleware:
+    """
+    Run a POST with an `Idempotency-Key` header at most once per key.
+
+    Applies to `paths` only. The first request with a key runs and its
+    response is stored unless it is a 5xx, which lets a retry run it again.
+    A repeat gets the stored response with `Idempotent-Replayed: true`; a
+    repeat arriving while the first is still running waits for it, up to
+    `wait_timeout` seconds (then 409). Reusing a key for a different
+    request body is a 422. Keys are scoped to the path.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        paths: Iterable[str] = IDEMPOTENT_PATHS,
+        wait_timeout: float = 120.0,
+    ):
+        self.app = app
+        self.store = store
+        self.paths = frozenset(paths)
+        self.wait_timeout = wait_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER.encode())
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            await _send(send, _json_response(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"))
+            return
+
+        body, receive = await _buffer_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = f"{scope['path']} {idempotency_key.decode('latin-1')}"
+
+        while True:
+            record = await self.store.claim(key, fingerprint)
+            if record is None:
+                break
+            if record.fingerprint != fingerprint:
+                await _send(send, _json_response(422, "Idempotency-Key was already used for a different request"))
+                return
+            if not record.complete:
+                record = await self.store.wait(key, self.wait_timeout)
+                if record is None:
+                    continue  # The first attempt failed; run this one
+                if not record.complete:
+                    await _send(send, _json_response(409, "A request with this Idempotency-Key is still in progress"))
+                    return
+            await _send(send, record, replayed=True)
+            return
+
+        await self._run(key, fingerprint, scope, receive, send)
+
+    async def _run(self, key: str, fingerprint: str, scope: Scope, receive: Receive, send: Send) -> None:
+        response = IdempotencyRecord(fingerprint=fingerprint)
+        chunks: List[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive, capture)
+            if response.status_code is not None and response.status_code < 500:
+                response.body = b"".join(chunks)
+                await self.store.complete(key, response)
+                completed = True
+        finally:
+            if not completed:
+                await self.store.release(key)
+
+
+async def _buffer_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the whole request body and return a `receive` that replays it."""
+    chunks: List[bytes] = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+async def _send(send: Send, record: IdempotencyRecord, replayed: bool = False) -> None:
+    headers = [
+        (name, value) for name, value in record.headers if name.lower() != b"content-length"
+    ]
+    headers.append((b"content-length", str(len(record.body)).encode()))
+    if replayed:
+        headers.append((REPLAYED_HEADER.encode(), b"true"))
+    await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": record.body})
+
+
+_store: IdempotencyStore = MemoryIdempotencyStore()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Process-wide store of idempotent responses."""
+    return _store
@@ -1,7 +1,10 @@
 """API router configuration."""
 
 from fastapi import APIRouter
-from .routes import image_generation, face_swap, upload, image_description, coach
+from ..service.icons8.icons8_service import get_icons8_single_flight
+from ..service.openai.core.base import get_openai_single_flight
+from ..utils.resilience import upstream_snapshots
+from .routes import image_generation, face_swap, upload, image_description, coach, images, pipeline
 
 router = APIRouter()
 
@@ -10,9 +13,24 @@ async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@router.get("/health/upstreams")
+async def upstream_health() -> list[dict]:
+    """Circuit state, call counters and latencies of each upstream service."""
+    return upstream_snapshots()
+
+@router.get("/health/coalescing")
+async def coalescing_stats() -> dict[str, int]:
+    """Requests that shared an identical upstream call already in flight."""
+    return {
+        "openai": get_openai_single_flight().coalesced,
+        "icons8": get_icons8_single_flight().coalesced,
+    }
+
 # Include route modules
 router.include_router(image_generation.router, tags=["image-generation"])
 router.include_router(face_swap.router, tags=["face-swap"])
 router.include_router(upload.router, tags=["upload"])
+router.include_router(images.router, tags=["images"])
 router.include_router(image_description.router, tags=["image-description"])
+router.include_router(pipeline.router, tags=["pipeline"])
 router.include_router(coach.router, prefix="/coach", tags=["coach"])
@@ -1,23 +1,62 @@
 """Coach route handlers."""
 
-from fastapi import APIRouter, Depends
+from typing import List
 
+from fastapi import APIRouter, Depends, HTTPException
+
+from .pipeline import build_identity_pipeline
+from ...config import Settings
+from ...dependencies import get_settings
+from ...service.coach.hooks import CoachStateHook
 from ...service.coach.models import CoachRequest, CoachResponse, CoachState
+from ...service.coach.pregeneration import (
+    IdentityImage,
+    IdentityImagePregenerator,
+    IdentityImageStore,
+    get_identity_image_store,
+)
 from ...service.coach.service import CoachService
+from ...utils.background import get_background_tasks
 from ..dependencies import get_coach_service
 
 router = APIRouter()
 
 
+async def get_coach_hooks(
+    settings: Settings = Depends(get_settings),
+    store: IdentityImageStore = Depends(get_identity_image_store),
+) -> List[CoachStateHook]:
+    """Opt-in coach hooks; image pre-generation needs COACH_PREGENERATE_IMAGES=1."""
+    if not settings.coach_pregenerate_images:
+        return []
+    # Built only when enabled, so coach turns never load the scene library
+    pipeline = await build_identity_pipeline(settings)
+    return [IdentityImagePregenerator(pipeline, store, get_background_tasks())]
+
+
 @router.post("/user_input", response_model=CoachResponse)
 async def handle_user_input(
-    request: CoachRequest, service: CoachService = Depends(get_coach_service)
+    request: CoachRequest,
+    service: CoachService = Depends(get_coach_service),
+    hooks: List[CoachStateHook] = Depends(get_coach_hooks),
 ) -> CoachResponse:
     """Handle user input and get coach response."""
-    result = await service.process_message(request.message, request.coach_state)
+    result = await service.process_message(request.message, request.coach_state, hooks=hooks)
     return CoachResponse(
         message=result.message,
         coach_state=result.state,
         final_prompt=result.final_prompt,
         actions=result.actions or [],
     )
+
+
+@router.get("/identity_images/{identity_id}", response_model=IdentityImage)
+async def get_identity_image(
+    identity_id: str,
+    store: IdentityImageStore = Depends(get_identity_image_store),
+) -> IdentityImage:
+    """Pre-generated image of an identity whose refinement is complete."""
+    image = store.get(identity_id)
+    if image is None:
+        raise HTTPException(status_code=404, detail="No image for this identity")
+    return image
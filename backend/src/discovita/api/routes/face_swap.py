@@ -1,23 +1,41 @@
 """Face swap route handlers."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from ...config import Settings
 from ...dependencies import get_settings
-from ...models import SwapFaceRequest
-from ...service.icons8.icons8_service import Icons8Service
+from ...models import BatchSwapFaceRequest, SwapFaceRequest
+from ...service.assets import get_shared_asset_mirror
+from ...service.icons8.cache import get_landmark_cache, get_swap_result_cache
+from ...service.icons8.icons8_service import Icons8Service, get_icons8_single_flight
 from ...service.icons8.client import Icons8Client
+from ...service.icons8.client.http import get_shared_http_client
+from ...service.icons8.jobs import SwapJobRegistry, get_swap_job_registry
 from ...service.icons8.models import Icons8Error
+from ...utils.content_hash import get_content_hasher
+from ..sse import format_sse, sse_response
 
 router = APIRouter()
 
+MAX_LONG_POLL_SECONDS = 30
+
 def get_icons8_service(settings: Settings = Depends(get_settings)) -> Icons8Service:
     """Dependency for Icons8 service instance."""
     client = Icons8Client(
         api_key=settings.icons8_api_key,
-        base_url=settings.icons8_base_url
+        base_url=settings.icons8_base_url,
+        http_client=get_shared_http_client(settings.icons8_base_url)
+    )
+    return Icons8Service(
+        client,
+        # Icons8 result URLs are third-party links; serve our own copies
+        result_cache=get_swap_result_cache(rehost=get_shared_asset_mirror(settings).rehost),
+        hasher=get_content_hasher(settings),
+        landmark_cache=get_landmark_cache(),
+        in_flight=get_icons8_single_flight()
     )
-    return Icons8Service(client)
 
 @router.post("/swap", status_code=status.HTTP_200_OK)
 async def swap_faces(
@@ -33,3 +51,69 @@ async def swap_faces(
         return JSONResponse(content=result)
     except Icons8Error as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.post("/swap/batch")
+async def swap_faces_batch(
+    request: BatchSwapFaceRequest,
+    service: Icons8Service = Depends(get_icons8_service)
+) -> StreamingResponse:
+    """Swap one source face onto many targets, streaming each result as it completes."""
+    try:
+        results = await service.swap_faces_batch(request.source_url, request.target_urls)
+    except Icons8Error as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def events() -> AsyncIterator[str]:
+        async for result in results:
+            yield format_sse(result.model_dump(), event="result")
+        yield format_sse({}, event="done")
+
+    return sse_response(events())
+
+@router.post("/swap/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_swap_job(
+    request: SwapFaceRequest,
+    service: Icons8Service = Depends(get_icons8_service),
+    registry: SwapJobRegistry = Depends(get_swap_job_registry)
+) -> JSONResponse:
+    """Start a face swap job in the background and return its id immediately."""
+    try:
+        job = registry.submit(service, request.source_url, request.target_url)
+    except Icons8Error as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job.to_frontend_response()
+    )
+
+@router.get("/swap/jobs/{job_id}")
+async def get_swap_job(
+    job_id: str,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=MAX_LONG_POLL_SECONDS,
+        description="Seconds to long-poll for the job to finish"
+    ),
+    registry: SwapJobRegistry = Depends(get_swap_job_registry)
+) -> JSONResponse:
+    """Get the status of a face swap job, optionally waiting for it to finish."""
+    job = await registry.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JSONResponse(content=job.to_frontend_response())
+
+@router.get("/swap/jobs/{job_id}/events")
+async def stream_swap_job(
+    job_id: str,
+    registry: SwapJobRegistry = Depends(get_swap_job_registry)
+) -> StreamingResponse:
+    """Stream status updates of a face swap job as server-sent events."""
+    if registry.get(job_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    async def events() -> AsyncIterator[str]:
+        async for job in registry.watch(job_id):
+            yield format_sse(job.to_frontend_response(), event="status")
+
+    return sse_response(events())
@@ -1,10 +1,13 @@
 """Image description route handlers."""
 
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends
 
-from ...models import DescribeImageRequest, DescribeImageResponse
+from ...models import BatchDescribeImageRequest, DescribeImageRequest, DescribeImageResponse
 from ...service.openai.core.image_description import ImageDescriptionService
 from ..dependencies import get_image_description_service
+from ..sse import format_sse, sse_response
 
 router = APIRouter()
 
@@ -17,3 +20,17 @@ async def describe_image(
     """Get a clean description of an image."""
     description = await service.get_clean_description(request.image_url)
     return DescribeImageResponse(description=description)
+
+
+@router.post("/describe/batch")
+async def describe_images_batch(
+    request: BatchDescribeImageRequest,
+    service: ImageDescriptionService = Depends(get_image_description_service),
+):
+    """Describe several images, streaming each description as it is ready."""
+    async def events() -> AsyncIterator[str]:
+        async for result in service.describe_batch(request.image_urls):
+            yield format_sse(result.model_dump(), event="result")
+        yield format_sse({}, event="done")
+
+    return sse_response(events())
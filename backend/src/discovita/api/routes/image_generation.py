@@ -1,33 +1,120 @@
 """Image generation route handlers."""
 
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException
 
-from ...models import GenerateImageRequest, GenerateImageResponse
+from ...models import (
+    FinalizeImageRequest,
+    GenerateImageRequest,
+    GenerateImageResponse,
+    GenerateVariantsRequest,
+)
+from ...service.assets import AssetMirror
 from ...service.openai.core.image_generation import ImageGenerationService
-from ..dependencies import get_image_generation_service
+from ...service.openai.models.image_models import SafeImageResponse
+from ..dependencies import get_asset_mirror, get_image_generation_service
+from ..sse import format_sse, sse_response
 
 router = APIRouter()
 
 
+def generation_error(response: SafeImageResponse) -> HTTPException:
+    """HTTP error for a failed generation; content policy rejections are 422."""
+    status_code = 422 if response.safety_violation else 500
+    return HTTPException(status_code=status_code, detail=response.error)
+
+
 @router.post("/generate", response_model=GenerateImageResponse)
 async def generate_scene(
     request: GenerateImageRequest,
     service: ImageGenerationService = Depends(get_image_generation_service),
+    mirror: AssetMirror = Depends(get_asset_mirror),
 ) -> GenerateImageResponse:
-    """Generate an image based on the user's vision."""
-    response = await service.safe_generate_scene(
+    """
+    Generate an image based on the user's vision.
+
+    Use `mode=draft` while the user is refining the scene and render the
+    accepted draft with /generate/final. The image is copied to the asset
+    store, so the returned URL does not expire like the DALL-E one.
+    """
+    response = await service.safe_generate_scene_async(
         setting=request.setting,
         outfit=request.outfit,
         emotion=request.emotion,
         user_description=request.userDescription,
         user_feedback=request.userFeedback,
         previous_augmented_prompt=request.previousAugmentedPrompt,
+        mode=request.mode,
     )
     if not response.success:
-        raise HTTPException(status_code=500, detail=response.error)
+        raise generation_error(response)
 
     assert response.data is not None
     image = response.data.data[0]
     return GenerateImageResponse(
-        imageUrl=image.url, augmentedPrompt=image.revised_prompt
+        imageUrl=await mirror.stable_url(image.url),
+        augmentedPrompt=image.revised_prompt,
+    )
+
+
+@router.post("/generate/final", response_model=GenerateImageResponse)
+async def render_final_scene(
+    request: FinalizeImageRequest,
+    service: ImageGenerationService = Depends(get_image_generation_service),
+    mirror: AssetMirror = Depends(get_asset_mirror),
+) -> GenerateImageResponse:
+    """Render an accepted draft in HD from its augmented prompt."""
+    response = await service.render_final(request.augmentedPrompt)
+    if not response.success:
+        raise generation_error(response)
+
+    image = response.data.data[0]
+    return GenerateImageResponse(
+        imageUrl=await mirror.stable_url(image.url),
+        augmentedPrompt=image.revised_prompt,
     )
+
+
+@router.post("/generate/variants")
+async def generate_scene_variants(
+    request: GenerateVariantsRequest,
+    service: ImageGenerationService = Depends(get_image_generation_service),
+    mirror: AssetMirror = Depends(get_asset_mirror),
+):
+    """
+    Generate several variants of a scene concurrently.
+
+    Each variant is streamed as a server-sent `variant` event as soon as it
+    is ready, followed by a `done` event. Closing the stream after picking
+    a variant cancels the ones that have not started yet.
+    """
+    variants = service.generate_scene_variants(
+        count=request.count,
+        setting=request.setting,
+        outfit=request.outfit,
+        emotion=request.emotion,
+        user_description=request.userDescription,
+        user_feedback=request.userFeedback,
+        previous_augmented_prompt=request.previousAugmentedPrompt,
+        mode=request.mode,
+    )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for index, response in variants:
+                if response.success:
+                    image = response.data.data[0]
+                    payload = {
+                        "index": index,
+                        "imageUrl": await mirror.stable_url(image.url),
+                        "augmentedPrompt": image.revised_prompt,
+                    }
+                else:
+                    payload = {"index": index, "error": response.error}
+                yield format_sse(payload, event="variant")
+            yield format_sse({}, event="done")
+        finally:
+            await variants.aclose()
+
+    return sse_response(events())
@@ -0,0 +1,39 @@
+"""Image variant route handlers."""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from ...config import Settings
+from ...dependencies import get_settings
+from ...service.imaging import ImageError, VariantService, get_variant_service
+
+router = APIRouter()
+
+VARIANT_CACHE_CONTROL = "public, max-age=604800"
+
+def get_variants(settings: Settings = Depends(get_settings)) -> VariantService:
+    """Dependency for the shared image variant service."""
+    return get_variant_service(settings)
+
+@router.get("/images/variant")
+async def get_image_variant(
+    url: str = Query(..., description="Image URL on an allowed host"),
+    width: int = Query(..., description="One of the width presets"),
+    fmt: str = Query("webp", alias="format", description="webp or jpeg"),
+    if_none_match: str | None = Header(None),
+    service: VariantService = Depends(get_variants)
+) -> Response:
+    """Return a resized variant of an image, with a strong ETag."""
+    try:
+        service.validate(url, width, fmt)
+        etag = service.etag(service.variant_key(url, width, fmt))
+        headers = {"ETag": etag, "Cache-Control": VARIANT_CACHE_CONTROL}
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip() for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=304, headers=headers)
+
+        variant = await service.get_variant(url, width, fmt)
+    except ImageError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return Response(content=variant.content, media_type=variant.content_type, headers=headers)
@@ -0,0 +1,79 @@
+"""Identity image pipeline route handlers."""
+
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+
+from .face_swap import get_icons8_service
+from ..dependencies import (
+    get_asset_mirror,
+    get_image_description_service,
+    get_image_generation_service,
+    get_openai_service,
+    get_scene_library,
+)
+from ..sse import format_sse, sse_response
+from ...config import Settings
+from ...dependencies import get_settings
+from ...models import IdentityImageRequest
+from ...service.assets import AssetMirror
+from ...service.icons8.icons8_service import Icons8Service
+from ...service.openai.core.image_description import ImageDescriptionService
+from ...service.openai.core.image_generation import ImageGenerationService
+from ...service.pipeline import IdentityImagePipeline
+from ...service.scenes import SceneLibrary
+from ...utils.content_hash import get_content_hasher
+
+router = APIRouter()
+
+def get_identity_pipeline(
+    description_service: ImageDescriptionService = Depends(get_image_description_service),
+    generation_service: ImageGenerationService = Depends(get_image_generation_service),
+    icons8_service: Icons8Service = Depends(get_icons8_service),
+    mirror: AssetMirror = Depends(get_asset_mirror),
+    library: SceneLibrary = Depends(get_scene_library),
+    settings: Settings = Depends(get_settings),
+) -> IdentityImagePipeline:
+    """Dependency for the identity image pipeline."""
+    return IdentityImagePipeline(
+        description_service,
+        generation_service,
+        icons8_service,
+        mirror,
+        hasher=get_content_hasher(settings),
+        library=library,
+    )
+
+async def build_identity_pipeline(settings: Settings) -> IdentityImagePipeline:
+    """
+    Build the pipeline outside of FastAPI's dependency injection.
+
+    For callers that only need it in some requests, so the scene library
+    and services are not loaded for the others.
+    """
+    open_ai_service = await get_openai_service(settings)
+    return get_identity_pipeline(
+        await get_image_description_service(open_ai_service, settings),
+        await get_image_generation_service(open_ai_service, settings),
+        get_icons8_service(settings),
+        get_asset_mirror(settings),
+        get_scene_library(settings),
+        settings,
+    )
+
+@router.post("/pipeline")
+async def run_pipeline(
+    request: IdentityImageRequest,
+    pipeline: IdentityImagePipeline = Depends(get_identity_pipeline),
+):
+    """
+    Describe the headshot, generate the scene, mirror it and swap the face in.
+
+    Progress is streamed as server-sent events; the stream ends with a
+    `result` or `error` event.
+    """
+    async def events() -> AsyncIterator[str]:
+        async for event in pipeline.run(request):
+            yield format_sse(event.data, event=event.event)
+
+    return sse_response(events())
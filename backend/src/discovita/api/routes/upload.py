@@ -1,22 +1,75 @@
 """File upload route handlers."""
 
-from fastapi import APIRouter, Depends, UploadFile, HTTPException, status
+import io
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import APIRouter, Depends, UploadFile, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from .face_swap import get_icons8_service
+from ..dependencies import get_image_description_service
 from ...config import Settings
 from ...dependencies import get_settings
-from ...service.s3 import S3Service, FileUploadRequest
+from ...models import CompleteUploadRequest, PresignedUploadRequest
+from ...service.imaging import (
+    SNIFF_BYTES,
+    ImageError,
+    ImageNormalizer,
+    get_image_normalizer,
+    sniff_image_type,
+)
+from ...service.icons8.icons8_service import Icons8Service
+from ...service.openai.core.image_description import ImageDescriptionService
+from ...service.openai.core.rate_limit import in_background
+from ...service.s3 import S3Service, S3UploadError, get_shared_s3_service
+from ...utils.background import BackgroundTaskSet, get_background_tasks
+from ...utils.content_hash import get_content_hasher
 
 router = APIRouter()
 
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+def _spool_to_disk(source: BinaryIO, target: BinaryIO, max_bytes: int) -> bool:
+    """Copy an upload to `target` in chunks; False if it is over `max_bytes`."""
+    copied = 0
+    while chunk := source.read(SPOOL_CHUNK_BYTES):
+        copied += len(chunk)
+        if copied > max_bytes:
+            return False
+        target.write(chunk)
+    target.flush()
+    return True
+
 def get_s3_service(settings: Settings = Depends(get_settings)) -> S3Service:
-    """Dependency for S3 service instance."""
-    return S3Service(settings)
+    """Dependency for the shared S3 service instance."""
+    return get_shared_s3_service(settings)
+
+def get_normalizer(settings: Settings = Depends(get_settings)) -> ImageNormalizer:
+    """Dependency for the shared image normalizer."""
+    return get_image_normalizer(settings)
 
 @router.post("/upload")
 async def upload_image(
     file: UploadFile,
-    s3_service: S3Service = Depends(get_s3_service)
+    precompute: bool = Query(False, description="Describe the image and detect faces in the background"),
+    s3_service: S3Service = Depends(get_s3_service),
+    normalizer: ImageNormalizer = Depends(get_normalizer),
+    icons8_service: Icons8Service = Depends(get_icons8_service),
+    description_service: ImageDescriptionService = Depends(get_image_description_service),
+    background_tasks: BackgroundTaskSet = Depends(get_background_tasks),
+    settings: Settings = Depends(get_settings)
 ) -> dict[str, str]:
-    """Upload an image to S3 and return its public URL."""
+    """
+    Normalize an uploaded image and store it in S3, returning its public URL.
+
+    The image is checked by its magic bytes, turned upright according to
+    its EXIF orientation, downscaled and re-encoded before it is stored.
+
+    With `precompute=true` (for headshots) the image description and the
+    face landmarks are computed in the background and cached by content
+    hash, so the follow-up /describe and /swap calls find them ready.
+    """
     if not file.filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,11 +82,96 @@ async def upload_image(
             detail="Content type is required"
         )
     
-    content = await file.read()
-    request = FileUploadRequest(
-        filename=file.filename,
-        content_type=file.content_type,
-        content=content
+    # Reject non-images and oversized files before reading the whole body
+    header = await file.read(SNIFF_BYTES)
+    if sniff_image_type(header) is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="File is not a supported image"
+        )
+    if file.size is not None and file.size > settings.upload_max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail="File is too large"
+        )
+
+    # The worker reads the original from a temporary file, so it is never
+    # held in memory here; only the normalized image comes back.
+    await file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="upload-") as spooled:
+        if not await run_in_threadpool(_spool_to_disk, file.file, spooled, settings.upload_max_bytes):
+            raise HTTPException(
+                status_code=413,
+                detail="File is too large"
+            )
+        try:
+            normalized = await normalizer.normalize(spooled.name)
+        except ImageError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    filename = f"{Path(file.filename).stem}{normalized.extension}"
+    result = await run_in_threadpool(
+        s3_service.upload_fileobj,
+        io.BytesIO(normalized.content),
+        filename,
+        normalized.content_type,
     )
-    url = s3_service.upload(request)
-    return {"url": url}
+    # The URL is content-addressed; record its hash so swap caching
+    # does not have to download the file again.
+    get_content_hasher(settings).remember(result.url, result.sha256)
+
+    if precompute:
+        background_tasks.spawn(
+            in_background(description_service.get_clean_description(result.url)),
+            name=f"describe:{result.sha256}",
+        )
+        background_tasks.spawn(
+            icons8_service.get_image_faces(result.url),
+            name=f"landmarks:{result.sha256}",
+        )
+    return {"url": result.url}
+
+
+@router.post("/upload/presigned")
+async def create_presigned_upload(
+    request: PresignedUploadRequest,
+    s3_service: S3Service = Depends(get_s3_service)
+) -> dict:
+    """
+    Issue a presigned POST for uploading an image straight to S3.
+
+    If the client sends the SHA-256 of the file and that content was
+    already uploaded, its URL is returned and no upload is needed.
+    Otherwise the hash is checked when the upload is completed.
+    """
+    try:
+        if request.sha256:
+            existing_url = await run_in_threadpool(
+                s3_service.find_existing_upload, request.sha256, request.filename
+            )
+            if existing_url:
+                return {"upload_required": False, "url": existing_url}
+
+        upload = await run_in_threadpool(
+            s3_service.create_presigned_upload,
+            request.filename,
+            request.content_type,
+            request.sha256,
+        )
+    except S3UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return {"upload_required": True, **upload.model_dump()}
+
+@router.post("/upload/complete")
+async def complete_presigned_upload(
+    request: CompleteUploadRequest,
+    s3_service: S3Service = Depends(get_s3_service),
+    settings: Settings = Depends(get_settings)
+) -> dict[str, str]:
+    """Check a finished presigned upload and return its content-addressed URL."""
+    try:
+        result = await run_in_threadpool(s3_service.complete_presigned_upload, request.key)
+    except S3UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    get_content_hasher(settings).remember(result.url, result.sha256)
+    return {"url": result.url}
@@ -0,0 +1,23 @@
+"""Server-sent events helpers."""
+
+import json
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Format a JSON-serializable payload as a single server-sent event."""
+    message = f"data: {json.dumps(data)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an iterator of formatted events in a streaming response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
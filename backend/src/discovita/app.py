@@ -2,45 +2,43 @@
 
 import os
 import logging
-from pathlib import Path
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from .api.idempotency import IdempotencyMiddleware, get_idempotency_store
 from .api.router import router
 from .dependencies import get_settings
+from .service.icons8.client.http import close_shared_http_clients
+from .service.icons8.jobs import get_swap_job_registry
+from .service.imaging import close_image_normalizer
+from .service.openai.core.rate_limit import close_shared_openai_http_client
+from .service.s3 import close_shared_s3_service
+from .utils.background import get_background_tasks
+from .utils.http import close_download_client
 from fastapi.staticfiles import StaticFiles
+from logging.handlers import QueueListener
+from .utils.logger.pipeline import configure_app_logging
 
-def setup_logging() -> None:
-    """Configure logging for the application."""
-    log_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(log_format)
-    
-    # File handler
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(logs_dir / "face_swap.log")
-    file_handler.setFormatter(log_format)
-    
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    
-    # Set Icons8 client logger to DEBUG for detailed API logging
+def setup_logging() -> QueueListener:
+    """Configure logging for the application.
+
+    All records go through a queue to a background thread that writes the
+    console, a rotating `logs/face_swap.log` and, with LOG_JSON=1, a
+    JSON-lines file. Returns the listener; stop it on shutdown to flush.
+    """
+    listener = configure_app_logging(log_dir="logs", log_filename="face_swap.log")
+
+    # Set ICONS8_LOG_LEVEL=DEBUG for full Icons8 request/response logging.
     icons8_logger = logging.getLogger("face_swap.icons8.client")
-    icons8_logger.setLevel(logging.DEBUG)
+    icons8_logger.setLevel(os.getenv("ICONS8_LOG_LEVEL", "INFO").upper())
+    return listener
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-setup_logging()
+log_listener = setup_logging()
 
 # Log environment variables on startup
 logger = logging.getLogger(__name__)
@@ -53,7 +51,23 @@ logger.info("Environment variables loaded", extra={
 })
 logger.info("VERSION 1.8")
 
-app = FastAPI(title="Face Swap API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start up and tear down process-wide resources."""
+    yield
+    await get_background_tasks().aclose()
+    await get_swap_job_registry().aclose()
+    await close_shared_http_clients()
+    await close_download_client()
+    close_shared_s3_service()
+    close_shared_openai_http_client()
+    close_image_normalizer()
+    log_listener.stop()
+
+app = FastAPI(title="Face Swap API", lifespan=lifespan)
+
+# Retries with the same Idempotency-Key replay the first response
+app.add_middleware(IdempotencyMiddleware, store=get_idempotency_store())
 
 origins = [
     "http://localhost:3000",  # Assuming your local frontend runs on port 3000
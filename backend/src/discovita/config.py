@@ -3,6 +3,7 @@
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -21,6 +22,38 @@ class Settings:
     openai_api_key: str
     adalo_app_id: str
     adalo_api_key: str
+    # Upload normalization: images are downscaled to fit this many pixels
+    # on their longest side and re-encoded in this format and quality.
+    upload_max_dimension: int = 2048
+    upload_image_format: str = "JPEG"
+    upload_image_quality: int = 85
+    upload_max_bytes: int = 25 * 1024 * 1024
+    # Worker processes for image processing; None uses one per CPU.
+    image_workers: Optional[int] = None
+    # Resized image variants: local disk cache and extra hosts (besides the
+    # S3 bucket) that images may be fetched from.
+    variant_cache_dir: str = "cache/variants"
+    variant_cache_max_bytes: int = 512 * 1024 * 1024
+    variant_allowed_hosts: Tuple[str, ...] = ()
+    # Concurrent DALL-E calls across the whole process.
+    image_generation_concurrency: int = 4
+    # Precomputed scene library (JSON manifest) and how similar a request
+    # must be to a library scene (0-1) to be served by a face swap alone.
+    scene_library_path: Optional[str] = None
+    scene_library_min_score: float = 0.75
+    # Generate an identity's image in the background once its refinement
+    # completes in the coach.
+    coach_pregenerate_images: bool = False
+    # Starting OpenAI rate limits per model, until response headers report
+    # the account's actual limits. Image models have no token limit.
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 30_000
+    openai_image_requests_per_minute: int = 50
+
+    @property
+    def s3_bucket_host(self) -> str:
+        """Host of the bucket's public URLs."""
+        return f"{self.s3_bucket}.s3.{self.aws_region}.amazonaws.com"
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -62,5 +95,29 @@ class Settings:
             s3_bucket=s3_bucket,
             openai_api_key=openai_api_key,
             adalo_app_id=adalo_app_id,
-            adalo_api_key=adalo_api_key
+            adalo_api_key=adalo_api_key,
+            upload_max_dimension=int(os.getenv("UPLOAD_MAX_DIMENSION", "2048")),
+            upload_image_format=os.getenv("UPLOAD_IMAGE_FORMAT", "JPEG").upper(),
+            upload_image_quality=int(os.getenv("UPLOAD_IMAGE_QUALITY", "85")),
+            upload_max_bytes=int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024))),
+            image_workers=int(os.getenv("IMAGE_WORKERS")) if os.getenv("IMAGE_WORKERS") else None,
+            variant_cache_dir=os.getenv("VARIANT_CACHE_DIR", "cache/variants"),
+            variant_cache_max_bytes=int(
+                os.getenv("VARIANT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+            ),
+            variant_allowed_hosts=tuple(
+                host.strip()
+                for host in os.getenv("VARIANT_ALLOWED_HOSTS", "").split(",")
+                if host.strip()
+            ),
+            image_generation_concurrency=int(os.getenv("IMAGE_GENERATION_CONCURRENCY", "4")),
+            scene_library_path=os.getenv("SCENE_LIBRARY_PATH") or None,
+            scene_library_min_score=float(os.getenv("SCENE_LIBRARY_MIN_SCORE", "0.75")),
+            coach_pregenerate_images=os.getenv("COACH_PREGENERATE_IMAGES", "").lower()
+            in ("1", "true", "yes"),
+            openai_requests_per_minute=int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500")),
+            openai_tokens_per_minute=int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000")),
+            openai_image_requests_per_minute=int(
+                os.getenv("OPENAI_IMAGE_REQUESTS_PER_MINUTE", "50")
+            ),
         )
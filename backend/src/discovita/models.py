@@ -1,8 +1,9 @@
 """API-specific data models."""
 
 from pydantic import BaseModel, HttpUrl, AnyHttpUrl
-from enum import IntEnum
-from typing import Optional
+from enum import Enum, IntEnum
+from typing import List, Optional
+from pydantic import Field
 
 class DescribeImageRequest(BaseModel):
     """Request to get a clean description of an image."""
@@ -12,6 +13,27 @@ class DescribeImageResponse(BaseModel):
     """Response containing clean description of an image."""
     description: str
 
+class BatchDescribeImageRequest(BaseModel):
+    """Request to describe several images."""
+    image_urls: List[AnyHttpUrl] = Field(..., min_length=1, max_length=20)
+
+class BatchDescribeItemResult(BaseModel):
+    """Description of a single image in a batch."""
+    image_url: str
+    description: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+class RenderMode(str, Enum):
+    """
+    How much to spend on a scene render.
+
+    Drafts use standard quality, which is noticeably faster, for iterating
+    on a scene; the final HD render is made once the user accepts it.
+    """
+    DRAFT = "draft"
+    FINAL = "final"
+
 class GenerateImageRequest(BaseModel):
     setting: str
     outfit: str
@@ -19,6 +41,20 @@ class GenerateImageRequest(BaseModel):
     userFeedback: str | None = None
     previousAugmentedPrompt: str | None = None
     userDescription: str | None = None  # Clean description of user's headshot
+    mode: RenderMode = RenderMode.FINAL  # DRAFT while iterating, FINAL for HD
+
+class FinalizeImageRequest(BaseModel):
+    """Request to render an accepted draft in HD."""
+    augmentedPrompt: str = Field(..., min_length=1)
+
+class GenerateVariantsRequest(GenerateImageRequest):
+    """Request to generate several variants of the same scene."""
+    count: int = Field(3, ge=1, le=4)
+
+class IdentityImageRequest(GenerateImageRequest):
+    """Request to generate a scene and swap the user's headshot into it."""
+    headshot_url: AnyHttpUrl
+    useLibrary: bool = True  # Allow serving a precomputed library scene
 
 class GenerateImageResponse(BaseModel):
     imageUrl: str
@@ -38,6 +74,28 @@ class SwapFaceRequest(BaseModel):
     source_url: HttpUrl
     target_url: HttpUrl
 
+class BatchSwapFaceRequest(BaseModel):
+    """Request model for swapping one source face onto many targets."""
+    source_url: HttpUrl
+    target_urls: List[HttpUrl] = Field(..., min_length=1, max_length=20)
+
+class BatchSwapItemResult(BaseModel):
+    """Result of a single target in a batch face swap."""
+    target_url: str
+    url: str = ""
+    status: str
+    error: Optional[str] = None
+
+class PresignedUploadRequest(BaseModel):
+    """Request for a presigned URL to upload an image straight to S3."""
+    filename: str = Field(..., min_length=1)
+    content_type: str = Field(..., min_length=1)
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
+
+class CompleteUploadRequest(BaseModel):
+    """Notification that a presigned upload has finished."""
+    key: str
+
 class ProcessingStatus(IntEnum):
     """Status of a face swap processing job."""
     QUEUE = 0
@@ -1,13 +1,18 @@
 from typing import Optional, TypeVar, Generic, Type
 import json
+import logging
 from contextlib import contextmanager
 
 import httpx
 
 from discovita.config import Settings
+from discovita.utils.resilience import ResilientTransport, get_upstream, idempotent_requests
 from ..models.base import AdaloRecord, GetRecordsResponse
 from ..logging import logger
 
+# Reads are hedged; writes are never sent twice
+UPSTREAM = get_upstream("adalo", hedge=idempotent_requests())
+
 T = TypeVar('T', bound=AdaloRecord)
 R = TypeVar('R', bound=GetRecordsResponse)
 
@@ -32,9 +37,10 @@ class BaseAdaloClient(Generic[T, R]):
             "Accept": "application/json"
         }
         self.client = httpx.Client(
-            timeout=30.0,
-            verify=True,
-            http2=True
+            transport=ResilientTransport(
+                UPSTREAM, httpx.HTTPTransport(verify=True, http2=True)
+            ),
+            timeout=30.0
         )
 
     def _build_collection_url(self, element_id: Optional[int] = None) -> str:
@@ -65,27 +71,27 @@ class BaseAdaloClient(Generic[T, R]):
             params["filterKey"] = filter_key
             params["filterValue"] = filter_value
         
-        logger.info(f"Making GET request to {url} with params: {params}")
+        logger.info("Making GET request to %s with params: %s", url, params)
         response = self.client.get(
             url,
             headers=self.headers,
             params=params
         )
-        logger.info(f"Response status: {response.status_code}")
+        logger.info("Response status: %s", response.status_code)
         response.raise_for_status()
         
         response_json = response.json()
-        logger.debug(f"Raw API response: {json.dumps(response_json, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw API response: %s", json.dumps(response_json, indent=2))
         
         return self.response_type.parse_obj(response_json)
 
     def create_record(self, record: T) -> T:
         url = self._build_collection_url()
         payload = {k: v for k, v in record.dict(by_alias=True).items() if v is not None}
-        logger.debug(f"POST request payload: {json.dumps(payload, indent=2)}")
-        
-        logger.debug(f"Request headers: {self.headers}")
-        logger.debug(f"Request URL: {url}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("POST request payload: %s", json.dumps(payload, indent=2))
+            logger.debug("Request URL: %s", url)
         
         response = self.client.post(
             url,
@@ -94,8 +100,8 @@ class BaseAdaloClient(Generic[T, R]):
         )
         
         if response.status_code != 200:
-            logger.error(f"API error response: {response.text}")
-            logger.error(f"Response headers: {response.headers}")
+            logger.error("API error response: %s", response.text)
+            logger.error("Response headers: %s", response.headers)
         response.raise_for_status()
         
         return self.record_type.parse_obj(response.json())
@@ -1,23 +1,34 @@
+import atexit
 import logging
 import os
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+from discovita.utils.logger.queue import start_queue_logging
+
 def setup_adalo_logger() -> logging.Logger:
+    """Log Adalo client activity to logs/adalo.log through a non-blocking queue.
+
+    Records also propagate to the application's logging pipeline. The level
+    defaults to INFO; set ADALO_LOG_LEVEL=DEBUG for request/response payloads.
+    """
     logger = logging.getLogger("adalo_client")
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(os.getenv("ADALO_LOG_LEVEL", "INFO").upper())
 
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    file_handler = logging.FileHandler(log_dir / "adalo.log")
-    file_handler.setLevel(logging.DEBUG)
+    file_handler = RotatingFileHandler(
+        log_dir / "adalo.log", maxBytes=5 * 1024 * 1024, backupCount=3
+    )
     
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
     file_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
+    listener = start_queue_logging(logger, [file_handler])
+    atexit.register(listener.stop)
     return logger
 
 logger = setup_adalo_logger()
@@ -0,0 +1,15 @@
+"""Asset store module initialization."""
+
+from .mirror import AssetMirror, get_shared_asset_mirror
+from .models import AssetError, StoredAsset
+from .store import AssetStore, LocalAssetStore, S3AssetStore
+
+__all__ = [
+    "AssetError",
+    "AssetMirror",
+    "AssetStore",
+    "LocalAssetStore",
+    "S3AssetStore",
+    "StoredAsset",
+    "get_shared_asset_mirror",
+]
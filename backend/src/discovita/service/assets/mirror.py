@@ -0,0 +1,121 @@
+"""Mirroring of third-party image URLs into an asset store."""
+
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Optional
+
+from httpx import AsyncClient, HTTPError
+
+from .models import AssetError, StoredAsset
+from .store import AssetStore, S3AssetStore
+from ..s3 import get_shared_s3_service
+from ...config import Settings
+from ...models import ProcessedImageResult
+from ...utils.cache import TTLCache
+from ...utils.http import get_download_client
+from ...utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Bodies up to this size stay in memory, larger ones spill to disk
+SPOOL_MAX_SIZE = 8 * MB
+MAX_ASSET_BYTES = 30 * MB
+
+
+class AssetMirror:
+    """
+    Copy files behind expiring URLs (DALL-E output, Icons8 results) into
+    an asset store and return stable URLs.
+
+    Downloads are streamed and hashed chunk by chunk into a spooled
+    temporary file, so only small files are held in memory. Storing runs
+    in a worker thread. Results are memoized per source URL, and
+    concurrent requests for the same URL share one download.
+    """
+
+    def __init__(
+        self,
+        store: AssetStore,
+        http_client: Optional[AsyncClient] = None,
+        max_entries: int = 4096,
+        ttl: float = 24 * 60 * 60,
+    ):
+        self.store = store
+        self._http_client = http_client
+        self._mirrored: TTLCache[str, StoredAsset] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._in_flight: SingleFlight[StoredAsset] = SingleFlight()
+
+    @property
+    def http_client(self) -> AsyncClient:
+        return self._http_client or get_download_client()
+
+    async def mirror(self, url: str) -> StoredAsset:
+        """Store the content at `url` and return the stored asset."""
+        asset = self._mirrored.get(url)
+        if asset is not None:
+            return asset
+        return await self._in_flight.do(url, lambda: self._mirror(url))
+
+    async def stable_url(self, url: str) -> str:
+        """
+        Mirrored URL for `url`, falling back to `url` itself on failure.
+
+        For responses that are still useful with the original link.
+        """
+        try:
+            return (await self.mirror(url)).url
+        except AssetError as e:
+            logger.warning("Could not mirror %s: %s", url, e.detail)
+            return url
+
+    async def rehost(self, processed: ProcessedImageResult) -> ProcessedImageResult:
+        """`SwapResultCache` rehost hook: point a swap result at its mirror."""
+        url = await self.stable_url(str(processed.url))
+        return processed.model_copy(update={"url": url})
+
+    async def _mirror(self, url: str) -> StoredAsset:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            sha256 = hashlib.sha256()
+            size = 0
+            try:
+                # Mirrored URLs come from our own upstreams, not from clients
+                async with self.http_client.stream("GET", url, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "application/octet-stream")
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > MAX_ASSET_BYTES:
+                            raise AssetError(status_code=413, detail="Asset is too large")
+                        sha256.update(chunk)
+                        buffer.write(chunk)
+            except HTTPError as e:
+                raise AssetError(status_code=502, detail=f"Could not download {url}: {e}") from e
+
+            buffer.seek(0)
+            try:
+                asset = await asyncio.to_thread(
+                    self.store.put, buffer, sha256.hexdigest(), content_type
+                )
+            except Exception as e:
+                # e.g. S3 errors or a full disk; the caller decides whether
+                # the original URL is good enough
+                logger.exception("Could not store asset from %s", url)
+                raise AssetError(status_code=502, detail=f"Could not store {url}: {e}") from e
+
+        self._mirrored.set(url, asset)
+        return asset
+
+
+_mirror: Optional[AssetMirror] = None
+
+
+def get_shared_asset_mirror(settings: Settings) -> AssetMirror:
+    """Process-wide mirror into the S3 asset store."""
+    global _mirror
+    if _mirror is None:
+        _mirror = AssetMirror(S3AssetStore(get_shared_s3_service(settings)))
+    return _mirror
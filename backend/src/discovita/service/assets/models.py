@@ -0,0 +1,18 @@
+"""Models for stored assets."""
+
+from pydantic import BaseModel
+
+
+class StoredAsset(BaseModel):
+    """A file kept in an asset store under its content hash."""
+    url: str
+    sha256: str
+    content_type: str
+
+
+class AssetError(Exception):
+    """An asset could not be fetched or stored."""
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"Asset error: {detail}")
@@ -0,0 +1,83 @@
+"""Content-addressed stores for mirrored assets."""
+
+import hashlib
+import io
+import mimetypes
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+from .models import StoredAsset
+from ..s3 import S3Service
+
+
+def extension_for(content_type: str) -> str:
+    """File extension for a Content-Type header, or "" if unknown."""
+    return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+
+
+class AssetStore(ABC):
+    """Stores files by content hash and returns stable URLs for them."""
+
+    @abstractmethod
+    def put(self, fileobj: BinaryIO, sha256: str, content_type: str) -> StoredAsset:
+        """
+        Store a seekable file whose SHA-256 is already known.
+
+        Storing the same content twice returns the same asset. This call
+        blocks, so async callers should run it in a thread.
+        """
+
+    def put_bytes(self, content: bytes, content_type: str) -> StoredAsset:
+        """Store in-memory content."""
+        return self.put(
+            io.BytesIO(content), hashlib.sha256(content).hexdigest(), content_type
+        )
+
+
+class S3AssetStore(AssetStore):
+    """Asset store backed by the content-addressed S3 uploads."""
+
+    def __init__(self, s3_service: S3Service):
+        self.s3_service = s3_service
+
+    def put(self, fileobj: BinaryIO, sha256: str, content_type: str) -> StoredAsset:
+        result = self.s3_service.upload_fileobj(
+            fileobj, f"asset{extension_for(content_type)}", content_type, sha256=sha256
+        )
+        return StoredAsset(url=result.url, sha256=result.sha256, content_type=content_type)
+
+
+class LocalAssetStore(AssetStore):
+    """
+    Asset store in a local directory.
+
+    Files are named `<sha256><ext>` and written to a temporary file first,
+    then renamed into place, so readers never see partial files. Asset
+    URLs are `<base_url>/<name>` when a base URL is given (for a directory
+    served over HTTP), otherwise the file path.
+    """
+
+    def __init__(self, directory: str, base_url: Optional[str] = None):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/") if base_url else None
+
+    def put(self, fileobj: BinaryIO, sha256: str, content_type: str) -> StoredAsset:
+        name = f"{sha256}{extension_for(content_type)}"
+        path = os.path.join(self.directory, name)
+
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    shutil.copyfileobj(fileobj, tmp)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        url = f"{self.base_url}/{name}" if self.base_url else path
+        return StoredAsset(url=url, sha256=sha256, content_type=content_type)
@@ -0,0 +1,38 @@
+"""Hooks into coaching state changes."""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .models.state import CoachState, Identity, IdentityState
+
+
+@dataclass(frozen=True)
+class IdentityTransition:
+    """An identity that was created or changed state while applying actions."""
+    identity: Identity
+    previous: Optional[IdentityState]  # None for a newly created identity
+
+
+def identity_transitions(before: CoachState, after: CoachState) -> List[IdentityTransition]:
+    """Identities whose state differs between two coaching states."""
+    previous_states = {identity.id: identity.state for identity in before.identities}
+    return [
+        IdentityTransition(identity, previous_states.get(identity.id))
+        for identity in after.identities
+        if previous_states.get(identity.id) != identity.state
+    ]
+
+
+class CoachStateHook:
+    """
+    Optional extension point of `CoachService.process_message`.
+
+    Hooks run inline with the request and must return quickly; slow work
+    belongs in a background task. Override the methods you need.
+    """
+
+    def on_identity_transition(self, transition: IdentityTransition, state: CoachState) -> None:
+        """Called for each identity that changed state, with the new coaching state."""
+
+    def on_response(self, state: CoachState) -> None:
+        """Called with the final state before it is returned to the client."""
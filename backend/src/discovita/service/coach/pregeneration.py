@@ -0,0 +1,204 @@
+"""Background generation of identity images once refinement completes."""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from .hooks import CoachStateHook, IdentityTransition
+from .models.identity import IdentityCategory
+from .models.state import CoachState, Identity, IdentityState
+from ..openai.core.rate_limit import Priority, request_priority
+from ..pipeline import IdentityImagePipeline
+from ...models import IdentityImageRequest, RenderMode
+from ...utils.background import BackgroundTaskSet
+from ...utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys on the coaching state. The client may provide the headshot
+# and its description; images are attached under METADATA_IMAGES.
+METADATA_HEADSHOT_URL = "headshot_url"
+METADATA_USER_DESCRIPTION = "user_description"
+METADATA_IMAGES = "identity_images"
+
+# Scene (setting, outfit, emotion) per identity category. The identity's
+# own description is added to the setting.
+CATEGORY_SCENES: Dict[IdentityCategory, tuple] = {
+    IdentityCategory.PASSIONS: ("a creative studio", "expressive casual clothes", "inspired"),
+    IdentityCategory.MONEY_MAKER: ("a modern office", "a sharp business outfit", "confident"),
+    IdentityCategory.MONEY_KEEPER: ("a calm, well-organized home office", "smart casual clothes", "assured"),
+    IdentityCategory.SPIRITUAL: ("a peaceful natural landscape", "comfortable flowing clothes", "serene"),
+    IdentityCategory.APPEARANCE: ("a bright city street", "a stylish outfit", "radiant"),
+    IdentityCategory.HEALTH: ("an outdoor trail at sunrise", "athletic wear", "energetic"),
+    IdentityCategory.FAMILY: ("a warm family living room", "relaxed casual clothes", "loving"),
+    IdentityCategory.ROMANTIC: ("a candlelit terrace", "an elegant evening outfit", "affectionate"),
+    IdentityCategory.ACTION: ("a busy workshop", "practical work clothes", "determined"),
+}
+
+
+class IdentityImage(BaseModel):
+    """Pre-generated image of an identity."""
+    identity_id: str
+    description: str  # Identity description the image was generated for
+    status: str  # pending, ready or error
+    imageUrl: Optional[str] = None  # Face-swapped image, or the scene without a headshot
+    sceneUrl: Optional[str] = None
+    augmentedPrompt: Optional[str] = None
+    error: Optional[str] = None
+
+
+class IdentityImageStore:
+    """Pre-generated identity images by identity id."""
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 24 * 60 * 60):
+        self._images: TTLCache[str, IdentityImage] = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, identity_id: str) -> Optional[IdentityImage]:
+        return self._images.get(identity_id)
+
+    def set(self, image: IdentityImage) -> None:
+        self._images.set(image.identity_id, image)
+
+    def delete(self, identity_id: str) -> None:
+        self._images.delete(identity_id)
+
+
+def scene_for_identity(identity: Identity) -> Dict[str, str]:
+    """Scene attributes for an identity's image."""
+    setting, outfit, emotion = CATEGORY_SCENES.get(
+        identity.category, ("a setting that fits them", "clothes that fit them", "fulfilled")
+    )
+    return {
+        "setting": f"{setting}, living this identity: {identity.description}",
+        "outfit": outfit,
+        "emotion": emotion,
+    }
+
+
+class IdentityImagePregenerator(CoachStateHook):
+    """
+    Generate an identity's image as soon as its refinement completes.
+
+    The user asks for the image next, so it is generated in a background
+    task right away: through the identity pipeline (scene plus face swap)
+    when the state's metadata carries a `headshot_url`, otherwise as a
+    scene only. Results are kept in an `IdentityImageStore` and attached to
+    the state metadata under `identity_images` on every coach response.
+    """
+
+    def __init__(
+        self,
+        pipeline: IdentityImagePipeline,
+        store: IdentityImageStore,
+        tasks: BackgroundTaskSet,
+    ):
+        self.pipeline = pipeline
+        self.store = store
+        self.tasks = tasks
+
+    def on_identity_transition(self, transition: IdentityTransition, state: CoachState) -> None:
+        identity = transition.identity
+        if identity.state != IdentityState.REFINEMENT_COMPLETE:
+            return
+        existing = self.store.get(identity.id)
+        if (
+            existing is not None
+            and existing.description == identity.description
+            and existing.status != "error"
+        ):
+            return
+
+        self.store.set(IdentityImage(
+            identity_id=identity.id, description=identity.description, status="pending"
+        ))
+        task = self.tasks.spawn(
+            self._generate(
+                identity,
+                state.metadata.get(METADATA_HEADSHOT_URL),
+                state.metadata.get(METADATA_USER_DESCRIPTION),
+            ),
+            name=f"pregenerate-identity-{identity.id}",
+        )
+        if task is None:
+            self.store.delete(identity.id)
+
+    def on_response(self, state: CoachState) -> None:
+        images = {}
+        for identity in state.identities:
+            image = self.store.get(identity.id)
+            if image is not None:
+                images[identity.id] = image.model_dump()
+        if images:
+            state.metadata[METADATA_IMAGES] = images
+
+    async def _generate(
+        self,
+        identity: Identity,
+        headshot_url: Optional[str],
+        user_description: Optional[str],
+    ) -> None:
+        request = dict(
+            **scene_for_identity(identity),
+            userDescription=user_description,
+            mode=RenderMode.FINAL,
+        )
+        try:
+            with request_priority(Priority.BACKGROUND):
+                if headshot_url:
+                    image = await self._run_pipeline(
+                        IdentityImageRequest(headshot_url=headshot_url, **request)
+                    )
+                else:
+                    image = await self._generate_scene(request)
+        except asyncio.CancelledError:
+            self.store.delete(identity.id)
+            raise
+        except Exception as e:
+            logger.exception("Pre-generating identity %s failed", identity.id)
+            image = {"status": "error", "error": str(e)}
+
+        self.store.set(IdentityImage(
+            identity_id=identity.id, description=identity.description, **image
+        ))
+
+    async def _run_pipeline(self, request: IdentityImageRequest) -> dict:
+        async for event in self.pipeline.run(request):
+            if event.event == "error":
+                return {"status": "error", "error": event.data["detail"]}
+            if event.event == "result":
+                return {
+                    "status": "ready",
+                    "imageUrl": event.data["url"],
+                    "sceneUrl": event.data["sceneUrl"],
+                    "augmentedPrompt": event.data["augmentedPrompt"],
+                }
+        return {"status": "error", "error": "Pipeline ended without a result"}
+
+    async def _generate_scene(self, request: dict) -> dict:
+        response = await self.pipeline.generation_service.safe_generate_scene_async(
+            setting=request["setting"],
+            outfit=request["outfit"],
+            emotion=request["emotion"],
+            user_description=request["userDescription"],
+            mode=request["mode"],
+        )
+        if not response.success:
+            return {"status": "error", "error": response.error or "Generation failed"}
+        image = response.data.data[0]
+        scene_url = await self.pipeline.mirror.stable_url(image.url)
+        return {
+            "status": "ready",
+            "imageUrl": scene_url,
+            "sceneUrl": scene_url,
+            "augmentedPrompt": image.revised_prompt,
+        }
+
+
+_store = IdentityImageStore()
+
+
+def get_identity_image_store() -> IdentityImageStore:
+    """Dependency for the process-wide pre-generated identity images."""
+    return _store
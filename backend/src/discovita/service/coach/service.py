@@ -1,13 +1,21 @@
 """Coaching service implementation."""
 
+import asyncio
+import logging
+from typing import Sequence
+
 from ..openai.core import OpenAIService
+from ..openai.core.rate_limit import Priority, request_priority
 from .actions.definitions import get_available_actions
 from .actions.handler import apply_actions
+from .hooks import CoachStateHook, identity_transitions
 from .models.action import ProcessMessageResult
 from .models.llm import CoachLLMResponse
 from .models.state import CoachState, Message
 from .prompt.manager import PromptManager
 
+logger = logging.getLogger(__name__)
+
 
 class CoachService:
     """
@@ -22,9 +30,17 @@ class CoachService:
         self.prompt_manager = prompt_manager
 
     async def process_message(
-        self, message: str, state: CoachState
+        self,
+        message: str,
+        state: CoachState,
+        hooks: Sequence[CoachStateHook] = (),
     ) -> ProcessMessageResult:
-        """Process a user message and update the coaching state."""
+        """
+        Process a user message and update the coaching state.
+
+        `hooks` are told about identity state changes and see the final
+        state before it is returned. A failing hook is logged and skipped.
+        """
         if not state.conversation_history:
             state = self.prompt_manager.add_initial_message_to_state(state)
         state.conversation_history.append(Message(role="user", content=message))
@@ -33,11 +49,15 @@ class CoachService:
             system_message=system_prompt, messages=state.conversation_history
         )
 
-        response = self.open_ai_service.create_structured_chat_completion(
-            model="gpt-4o-2024-08-06",
-            messages=formatted_messages,
-            response_format=CoachLLMResponse,
-        )
+        # A user is waiting on this turn: it goes ahead of background work
+        # in the rate limit queue, which may block, so it runs in a thread.
+        with request_priority(Priority.INTERACTIVE):
+            response = await asyncio.to_thread(
+                self.open_ai_service.create_structured_chat_completion,
+                model="gpt-4o-2024-08-06",
+                messages=formatted_messages,
+                response_format=CoachLLMResponse,
+            )
 
         if not response or not hasattr(response.choices[0].message, "parsed"):
             raise ValueError(f"Failed to parse LLM response")
@@ -46,11 +66,16 @@ class CoachService:
 
         # Apply actions
         new_state = apply_actions(state, llm_response.actions)
+        for transition in identity_transitions(state, new_state):
+            for hook in hooks:
+                self._run_hook(hook.on_identity_transition, transition, new_state)
 
         # Add coach response to history
         new_state.conversation_history.append(
             Message(role="coach", content=llm_response.message)
         )
+        for hook in hooks:
+            self._run_hook(hook.on_response, new_state)
 
         # Construct final result with updated state
         return ProcessMessageResult(
@@ -59,3 +84,10 @@ class CoachService:
             actions=llm_response.actions,
             final_prompt=system_prompt,
         )
+
+    @staticmethod
+    def _run_hook(method, *args) -> None:
+        try:
+            method(*args)
+        except Exception:
+            logger.exception("Coach hook %r failed", method)
@@ -0,0 +1,93 @@
+"""Caches of face swap results and face detection results."""
+
+from typing import Awaitable, Callable, Optional, Tuple
+
+from .models import ImageFaces
+from ...models import ProcessedImageResult, SwapFaceResult
+from ...utils.cache import TTLCache
+from ...utils.singleflight import SingleFlight
+
+SwapKey = Tuple[str, str]
+Rehost = Callable[[ProcessedImageResult], Awaitable[ProcessedImageResult]]
+
+
+class SwapResultCache:
+    """
+    Completed swaps keyed by the content hashes of (source, target).
+
+    Stores the final processed image (URL and dimensions). An optional
+    `rehost` callable can copy the processed image somewhere stable before it
+    is cached, so cached entries outlive third-party URLs. Concurrent swaps of
+    the same pair are coalesced into one Icons8 job through `in_flight`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 24 * 60 * 60,
+        rehost: Optional[Rehost] = None,
+    ):
+        self._results: TTLCache[SwapKey, ProcessedImageResult] = TTLCache(
+            max_entries=max_entries, ttl=ttl
+        )
+        self.in_flight: SingleFlight[SwapFaceResult] = SingleFlight()
+        self.rehost = rehost
+
+    @staticmethod
+    def key(source_hash: str, target_hash: str) -> SwapKey:
+        return (source_hash, target_hash)
+
+    def get(self, key: SwapKey) -> Optional[ProcessedImageResult]:
+        """Return the cached processed image for a pair, if any."""
+        return self._results.get(key)
+
+    async def store(self, key: SwapKey, processed: ProcessedImageResult) -> ProcessedImageResult:
+        """Cache a processed image, re-hosting it first if configured."""
+        if self.rehost:
+            processed = await self.rehost(processed)
+        self._results.set(key, processed)
+        return processed
+
+
+class LandmarkCache:
+    """
+    Face detection results keyed by the content hash of the image.
+
+    Detection depends only on the image bytes, so a result can be reused for
+    any URL serving the same content. Images without faces are cached too,
+    which lets swaps with such a source fail without calling Icons8.
+    Concurrent lookups of the same image share one request via `in_flight`.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 24 * 60 * 60):
+        self._faces: TTLCache[str, ImageFaces] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.in_flight: SingleFlight[ImageFaces] = SingleFlight()
+
+    def get(self, content_hash: str) -> Optional[ImageFaces]:
+        """Return the detection result for an image, if cached."""
+        return self._faces.get(content_hash)
+
+    def set(self, content_hash: str, faces: ImageFaces) -> None:
+        """Cache the detection result for an image."""
+        self._faces.set(content_hash, faces)
+
+
+_cache: Optional[SwapResultCache] = None
+_landmark_cache = LandmarkCache()
+
+
+def get_swap_result_cache(rehost: Optional[Rehost] = None) -> SwapResultCache:
+    """
+    Process-wide swap result cache.
+
+    Created on first use; `rehost` only takes effect on that first call.
+    """
+    global _cache
+    if _cache is None:
+        _cache = SwapResultCache(rehost=rehost)
+    return _cache
+
+
+def get_landmark_cache() -> LandmarkCache:
+    """Dependency for the process-wide face detection cache."""
+    return _landmark_cache
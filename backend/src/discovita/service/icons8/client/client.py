@@ -2,22 +2,43 @@
 
 from typing import List, Optional
 from httpx import AsyncClient
-from ..models import FaceSwapResponse, ImageId, GetBboxResponse
+from pydantic import AnyHttpUrl
+from ..models import Face, FaceSwapResponse, ImageId, GetBboxResponse
 from . import operations
+from .http import create_http_client
 
 class Icons8Client:
-    """Client for interacting with Icons8 face swap API."""
+    """Client for interacting with Icons8 face swap API.
+
+    Pass a shared `http_client` (see `http.get_shared_http_client`) to reuse
+    pooled connections across requests. Without one, the client creates and
+    owns its own connection pool, which should be released with `aclose()`.
+    """
     
-    def __init__(self, api_key: Optional[str], base_url: str) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str,
+        http_client: Optional[AsyncClient] = None
+    ) -> None:
         if not api_key:
             raise ValueError("API key is required")
             
         self.base_url = base_url
         self.api_key = api_key
-        self.client = AsyncClient(
-            base_url=base_url,
-            timeout=90.0
-        )
+        self._owns_client = http_client is None
+        self.client = http_client or create_http_client(base_url)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this instance owns it."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "Icons8Client":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
     
     async def get_landmarks(self, urls: List[str]) -> GetBboxResponse:
         """Get face landmarks for the given image URLs."""
@@ -27,6 +48,18 @@ class Icons8Client:
         """Submit a face swap job to Icons8."""
         return await operations.swap_faces(self.client, self.api_key, source_url, target_url)
     
+    async def submit_face_swap(
+        self,
+        source_url: AnyHttpUrl,
+        source_face: Face,
+        target_url: AnyHttpUrl,
+        target_face: Face
+    ) -> FaceSwapResponse:
+        """Submit a face swap job for faces whose landmarks are already known."""
+        return await operations.submit_face_swap(
+            self.client, self.api_key, source_url, source_face, target_url, target_face
+        )
+    
     async def get_job_status(self, job_id: ImageId) -> FaceSwapResponse:
         """Get the status of a face swap job."""
         return await operations.get_job_status(self.client, self.api_key, job_id)
@@ -0,0 +1,50 @@
+"""Shared HTTP client for the Icons8 API."""
+
+from typing import Dict
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, Timeout
+from ....utils.resilience import AsyncResilientTransport, get_upstream, idempotent_requests
+
+# Connection pool sizing for a single worker process. Keepalive connections
+# are what saves the TCP + TLS handshake on every swap and status poll.
+DEFAULT_LIMITS = Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0
+)
+
+# Fallback timeout; individual operations pass their own (see operations.py).
+DEFAULT_TIMEOUT = Timeout(90.0, connect=10.0)
+
+# Status polls, job lists and face detection can be sent twice safely;
+# /process_image starts a new job and is never hedged.
+UPSTREAM = get_upstream("icons8", hedge=idempotent_requests("/get_bbox"))
+
+_shared_clients: Dict[str, AsyncClient] = {}
+
+def create_http_client(
+    base_url: str,
+    limits: Limits = DEFAULT_LIMITS,
+    timeout: Timeout = DEFAULT_TIMEOUT
+) -> AsyncClient:
+    """Create an HTTP/2 capable client configured for the Icons8 API."""
+    transport = AsyncHTTPTransport(http2=True, limits=limits)
+    return AsyncClient(
+        base_url=base_url,
+        transport=AsyncResilientTransport(UPSTREAM, transport),
+        timeout=timeout
+    )
+
+def get_shared_http_client(base_url: str) -> AsyncClient:
+    """Get the process-wide client for the given base URL, creating it on first use."""
+    client = _shared_clients.get(base_url)
+    if client is None or client.is_closed:
+        client = create_http_client(base_url)
+        _shared_clients[base_url] = client
+    return client
+
+async def close_shared_http_clients() -> None:
+    """Close all shared clients. Called on application shutdown."""
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -1,19 +1,79 @@
-"""Logging utilities for Icons8 API client."""
+"""Logging utilities for Icons8 API client.
 
+Traffic is logged as structured records on the ``face_swap.icons8.client``
+logger. Nothing is decoded or formatted unless a handler actually emits the
+record: bodies are wrapped in lazy, size-capped objects, successful calls
+can be sampled, and errors are always logged.
+"""
+
+import logging
+import os
+import random
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit, urlunsplit
 from httpx import Response
 
-def log_response(response: Response, context: str) -> None:
-    """Log API request and response details using print statements."""
-    print(f"\n=== Icons8 API {context} ===")
-    
-    # Request details
-    print("\nRequest:")
-    print(f"URL: {response.request.url}")
-    print(f"Method: {response.request.method}")
-    print("Body:", response.request.content.decode() if response.request.content else "None")
-    
-    # Response details
-    print("\nResponse:")
-    print(f"Status: {response.status_code}")
-    print("Body:", response.text)
-    print("=" * 50)
+logger = logging.getLogger("face_swap.icons8.client")
+
+# Maximum characters of a request/response body included in a log record
+MAX_BODY_CHARS = int(os.getenv("ICONS8_LOG_MAX_BODY_CHARS", "2048"))
+
+# Fraction of successful status polls that are logged
+STATUS_POLL_SAMPLE_RATE = float(os.getenv("ICONS8_LOG_POLL_SAMPLE_RATE", "0.1"))
+
+class LazyBody:
+    """Body that is only decoded and truncated when a handler formats it."""
+
+    def __init__(self, load: Callable[[], Any], limit: int = MAX_BODY_CHARS):
+        self._load = load
+        self._limit = limit
+
+    def __str__(self) -> str:
+        body = self._load()
+        if body is None or body == b"":
+            return "None"
+        if isinstance(body, bytes):
+            body = body.decode(errors="replace")
+        if len(body) > self._limit:
+            return f"{body[:self._limit]}... [{len(body) - self._limit} more chars]"
+        return body
+
+def _redact_token(url: Any) -> str:
+    """Strip query parameters, which carry the API token."""
+    parts = urlsplit(str(url))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+def log_response(
+    response: Response, context: str, sample_rate: Optional[float] = None
+) -> None:
+    """Log an Icons8 API request/response pair.
+
+    Error responses are logged at WARNING. Successful ones are logged at
+    DEBUG, for a `sample_rate` fraction of calls (all calls when None).
+    """
+    is_error = response.status_code >= 400
+    level = logging.WARNING if is_error else logging.DEBUG
+    if not logger.isEnabledFor(level):
+        return
+    if not is_error and sample_rate is not None and random.random() >= sample_rate:
+        return
+
+    request = response.request
+    logger.log(
+        level,
+        "Icons8 API %s: %s %s -> %s | request: %s | response: %s",
+        context,
+        request.method,
+        _redact_token(request.url),
+        response.status_code,
+        LazyBody(lambda: request.content),
+        LazyBody(lambda: response.text),
+        extra={
+            "icons8": {
+                "context": context,
+                "method": request.method,
+                "url": _redact_token(request.url),
+                "status_code": response.status_code,
+            }
+        },
+    )
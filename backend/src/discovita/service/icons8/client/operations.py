@@ -2,7 +2,7 @@
 
 from typing import List
 from urllib.parse import quote
-from httpx import AsyncClient
+from httpx import AsyncClient, Timeout
 from pydantic import AnyHttpUrl, TypeAdapter
 from ..models import (
     FaceSwapRequest,
@@ -13,14 +13,23 @@ from ..models import (
     GetBboxRequest,
     GetBboxResponse,
     Face,
+    ImageFaces,
 )
 from ..face_selection import select_primary_face
-from .logging import log_response
+from .logging import STATUS_POLL_SAMPLE_RATE, log_response
+
+# Per-operation timeouts. Face detection on full-size images is the slow
+# call; status polls are cheap and should fail fast so the next poll runs.
+LANDMARKS_TIMEOUT = Timeout(60.0, connect=10.0)
+SUBMIT_TIMEOUT = Timeout(30.0, connect=10.0)
+STATUS_TIMEOUT = Timeout(10.0, connect=5.0)
+LIST_TIMEOUT = Timeout(30.0, connect=10.0)
+
+_URL_ADAPTER = TypeAdapter(AnyHttpUrl)
 
 def validate_url(url: str) -> AnyHttpUrl:
     """Validate URL string and return AnyHttpUrl object."""
-    url_adapter = TypeAdapter(AnyHttpUrl)
-    return url_adapter.validate_python(url)
+    return _URL_ADAPTER.validate_python(url)
 
 async def get_landmarks(client: AsyncClient, api_key: str, urls: List[str]) -> GetBboxResponse:
     """Get face landmarks for the given image URLs."""
@@ -30,7 +39,8 @@ async def get_landmarks(client: AsyncClient, api_key: str, urls: List[str]) -> G
     response = await client.post(
         "/get_bbox",
         params={"token": api_key},
-        json=request.to_json()
+        json=request.to_json(),
+        timeout=LANDMARKS_TIMEOUT
     )
     
     response_data = response.json()
@@ -44,34 +54,57 @@ async def get_landmarks(client: AsyncClient, api_key: str, urls: List[str]) -> G
         
     return GetBboxResponse.model_validate(response_data)
 
+def find_image_faces(landmarks: GetBboxResponse, url: AnyHttpUrl) -> ImageFaces:
+    """Find the detection result for an image in a get_bbox response."""
+    image_faces = next((img for img in landmarks.images if img.img_url == url), None)
+    if image_faces is None:
+        raise Icons8Error(
+            status_code=502,
+            detail=f"No face detection result returned for {url}"
+        )
+    return image_faces
+
+def select_face(image_faces: ImageFaces) -> Face:
+    """Select the primary face of an image based on size and confidence."""
+    face_objs = image_faces.get_face_objects()
+    primary_bbox = select_primary_face([face.bbox for face in face_objs])
+    return next(face for face in face_objs if face.bbox == primary_bbox)
+
 async def swap_faces(client: AsyncClient, api_key: str, source_url: str, target_url: str) -> FaceSwapResponse:
     """Submit a face swap job to Icons8."""
     target_http_url = validate_url(target_url)
     source_http_url = validate_url(source_url)
     
     landmarks_response = await get_landmarks(client, api_key, [source_url, target_url])
-    source_faces = next(img for img in landmarks_response.images if img.img_url == source_http_url)
-    target_faces = next(img for img in landmarks_response.images if img.img_url == target_http_url)
+    source_faces = find_image_faces(landmarks_response, source_http_url)
+    target_faces = find_image_faces(landmarks_response, target_http_url)
     
-    assert source_faces.faces, "No faces detected in source image"
-    assert target_faces.faces, "No faces detected in target image"
-    
-    # Convert raw faces to Face objects for proper bbox handling
-    source_face_objs = source_faces.get_face_objects()
-    target_face_objs = target_faces.get_face_objects()
+    if not source_faces.faces:
+        raise Icons8Error(status_code=422, detail="No faces detected in source image")
+    if not target_faces.faces:
+        raise Icons8Error(status_code=422, detail="No faces detected in target image")
     
     # Select primary faces based on size
-    primary_source_face = select_primary_face([face.bbox for face in source_face_objs])
-    primary_target_face = select_primary_face([face.bbox for face in target_face_objs])
-    
-    # Find corresponding Face objects
-    source_face = next(face for face in source_face_objs if face.bbox == primary_source_face)
-    target_face = next(face for face in target_face_objs if face.bbox == primary_target_face)
+    source_face = select_face(source_faces)
+    target_face = select_face(target_faces)
     
+    return await submit_face_swap(
+        client, api_key, source_http_url, source_face, target_http_url, target_face
+    )
+
+async def submit_face_swap(
+    client: AsyncClient,
+    api_key: str,
+    source_url: AnyHttpUrl,
+    source_face: Face,
+    target_url: AnyHttpUrl,
+    target_face: Face
+) -> FaceSwapResponse:
+    """Submit a face swap job for faces whose landmarks are already known."""
     request = FaceSwapRequest(
-        target_url=target_http_url,
+        target_url=target_url,
         face_tasks=[FaceTask(
-            source_url=source_http_url,
+            source_url=source_url,
             source_landmarks=source_face.landmarks,
             target_landmarks=target_face.landmarks
         )]
@@ -80,7 +113,8 @@ async def swap_faces(client: AsyncClient, api_key: str, source_url: str, target_
     response = await client.post(
         "/process_image",
         params={"token": api_key},
-        json=request.to_json()
+        json=request.to_json(),
+        timeout=SUBMIT_TIMEOUT
     )
     
     response_data = response.json()
@@ -98,11 +132,12 @@ async def get_job_status(client: AsyncClient, api_key: str, job_id: ImageId) ->
     """Get the status of a face swap job."""
     response = await client.get(
         f"/process_image/{job_id}",
-        params={"token": api_key}
+        params={"token": api_key},
+        timeout=STATUS_TIMEOUT
     )
     
     response_data = response.json()
-    log_response(response, "Job status check")
+    log_response(response, "Job status check", sample_rate=STATUS_POLL_SAMPLE_RATE)
     
     if response.status_code >= 400:
         raise Icons8Error(
@@ -116,7 +151,8 @@ async def list_jobs(client: AsyncClient, api_key: str) -> List[FaceSwapResponse]
     """Get list of face swap jobs."""
     response = await client.get(
         "/process_images",
-        params={"token": api_key}
+        params={"token": api_key},
+        timeout=LIST_TIMEOUT
     )
     
     log_response(response, "List jobs")
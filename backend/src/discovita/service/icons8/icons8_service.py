@@ -1,21 +1,48 @@
 """Icons8 service for face swap operations."""
 
 import asyncio
-from typing import Dict
-from pydantic import HttpUrl
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+from httpx import HTTPError
+from pydantic import AnyHttpUrl, HttpUrl
+from .cache import LandmarkCache, SwapKey, SwapResultCache
 from .client import Icons8Client
-from .models import ImageId, Icons8Error, ProcessStatus
-from ...models import SwapFaceResult
+from .client.operations import find_image_faces, select_face, validate_url
+from .models import Face, FaceSwapResponse, ImageFaces, ImageId, Icons8Error, ProcessStatus
+from ...models import BatchSwapItemResult, ProcessingStatus, SwapFaceResult
+from ...utils.content_hash import ContentHasher, ContentHashError
+from ...utils.singleflight import SingleFlight, coalescing_enabled, request_key
+
+logger = logging.getLogger(__name__)
+
+ResultCallback = Callable[[SwapFaceResult], None]
+
+T = TypeVar("T")
 
 class Icons8Service:
     """Service for Icons8 face swap operations."""
     
-    def __init__(self, client: Icons8Client):
+    def __init__(
+        self,
+        client: Icons8Client,
+        result_cache: Optional[SwapResultCache] = None,
+        hasher: Optional[ContentHasher] = None,
+        landmark_cache: Optional[LandmarkCache] = None,
+        in_flight: Optional[SingleFlight] = None,
+    ):
         self.client = client
+        self.result_cache = result_cache
+        self.hasher = hasher
+        self.landmark_cache = landmark_cache
+        # Concurrent identical swaps and detections by URL share one call
+        self.in_flight = in_flight
         self.max_polling_time = 60  # Maximum time to wait in seconds
         self.polling_interval = 2   # Time between checks in seconds
+        self.max_concurrent_submissions = 4  # Parallel /process_image calls in a batch
         
-    async def _poll_until_complete(self, job_id: ImageId) -> SwapFaceResult:
+    async def _poll_until_complete(
+        self, job_id: ImageId, on_update: Optional[ResultCallback] = None
+    ) -> SwapFaceResult:
         """Poll job status until completion or timeout."""
         start_time = asyncio.get_event_loop().time()
         
@@ -28,6 +55,8 @@ class Icons8Service:
                 
             response = await self.client.get_job_status(job_id)
             result = SwapFaceResult.from_icons8_response(response)
+            if on_update:
+                on_update(result)
             
             if result.status == ProcessStatus.READY:
                 return result
@@ -39,6 +68,180 @@ class Icons8Service:
                 )
                 
             await asyncio.sleep(self.polling_interval)
+
+    async def run_swap(
+        self,
+        source_url: HttpUrl,
+        target_url: HttpUrl,
+        on_update: Optional[ResultCallback] = None,
+    ) -> SwapFaceResult:
+        """
+        Submit a face swap job and poll it to completion.
+
+        When a result cache and content hasher are configured, a pair of
+        images that was swapped before is answered from the cache without any
+        Icons8 call, and concurrent swaps of the same pair share one job.
+
+        Args:
+            source_url: Image containing the face to use
+            target_url: Image the face is placed onto
+            on_update: Optional callback invoked with every intermediate result
+
+        Returns:
+            The final (READY) result of the job.
+        """
+        key = await self._cache_key(source_url, target_url)
+        if key is None:
+            return await self._run_uncached_swap(source_url, target_url, on_update)
+
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            logger.info("Face swap cache hit for %s onto %s", source_url, target_url)
+            return SwapFaceResult(
+                job_id="cached",
+                processed=cached,
+                status=ProcessingStatus.READY,
+                status_name="ready",
+            )
+
+        return await self.result_cache.in_flight.do(
+            key, lambda: self._swap_and_store(key, source_url, target_url, on_update)
+        )
+
+    async def _cache_key(self, source_url: HttpUrl, target_url: HttpUrl) -> Optional[SwapKey]:
+        """Build the cache key from content hashes, or None if caching is unavailable."""
+        if self.result_cache is None or self.hasher is None:
+            return None
+        try:
+            source_hash, target_hash = await asyncio.gather(
+                self.hasher.hash_url(str(source_url)),
+                self.hasher.hash_url(str(target_url)),
+            )
+        except (HTTPError, ContentHashError) as e:
+            logger.warning("Could not hash swap inputs, skipping cache: %s", e)
+            return None
+        return SwapResultCache.key(source_hash, target_hash)
+
+    async def _swap_and_store(
+        self,
+        key: SwapKey,
+        source_url: HttpUrl,
+        target_url: HttpUrl,
+        on_update: Optional[ResultCallback],
+    ) -> SwapFaceResult:
+        """Run an uncached swap and store its processed image in the cache."""
+        result = await self._run_uncached_swap(source_url, target_url, on_update)
+        if result.processed is None:
+            return result
+        try:
+            processed = await self.result_cache.store(key, result.processed)
+        except Exception:
+            logger.exception("Failed to cache face swap result")
+            return result
+        return result.model_copy(update={"processed": processed})
+
+    async def get_image_faces(self, url: HttpUrl) -> ImageFaces:
+        """
+        Detect the faces in one image.
+
+        With a landmark cache and content hasher configured, results are
+        cached by content hash and concurrent lookups of the same image share
+        one Icons8 request.
+        """
+        image_url = validate_url(str(url))
+        content_hash = await self._content_hash(image_url)
+        if content_hash is None:
+            return await self._detect_faces(image_url)
+
+        cached = self.landmark_cache.get(content_hash)
+        if cached is not None:
+            return cached
+        return await self.landmark_cache.in_flight.do(
+            content_hash, lambda: self._detect_and_store(content_hash, image_url)
+        )
+
+    async def _content_hash(self, url: AnyHttpUrl) -> Optional[str]:
+        if self.landmark_cache is None or self.hasher is None:
+            return None
+        try:
+            return await self.hasher.hash_url(str(url))
+        except (HTTPError, ContentHashError) as e:
+            logger.warning("Could not hash %s, skipping landmark cache: %s", url, e)
+            return None
+
+    async def _coalesced(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        if self.in_flight is None or not coalescing_enabled():
+            return await fn()
+        return await self.in_flight.do(key, fn)
+
+    async def _detect_faces(self, url: AnyHttpUrl) -> ImageFaces:
+        async def detect() -> ImageFaces:
+            landmarks = await self.client.get_landmarks([str(url)])
+            return find_image_faces(landmarks, url)
+
+        return await self._coalesced(request_key("detect", str(url)), detect)
+
+    async def _detect_and_store(self, content_hash: str, url: AnyHttpUrl) -> ImageFaces:
+        image_faces = await self._detect_faces(url)
+        self.landmark_cache.set(content_hash, image_faces)
+        return image_faces
+
+    async def _submit_with_known_landmarks(
+        self, source_url: HttpUrl, target_url: HttpUrl
+    ) -> FaceSwapResponse:
+        """Submit a swap using (possibly cached) face detection for both images."""
+        source_faces, target_faces = await asyncio.gather(
+            self.get_image_faces(source_url), self.get_image_faces(target_url)
+        )
+        if not source_faces.faces:
+            raise Icons8Error(status_code=422, detail="No faces detected in source image")
+        if not target_faces.faces:
+            raise Icons8Error(status_code=422, detail="No faces detected in target image")
+
+        return await self.client.submit_face_swap(
+            validate_url(str(source_url)),
+            select_face(source_faces),
+            validate_url(str(target_url)),
+            select_face(target_faces),
+        )
+
+    async def _run_uncached_swap(
+        self,
+        source_url: HttpUrl,
+        target_url: HttpUrl,
+        on_update: Optional[ResultCallback],
+    ) -> SwapFaceResult:
+        """
+        Submit a face swap job to Icons8 and poll it to completion.
+
+        A caller joining an identical swap already in flight gets its
+        result, but not its intermediate updates.
+        """
+        return await self._coalesced(
+            request_key("swap", str(source_url), str(target_url)),
+            lambda: self._submit_and_poll(source_url, target_url, on_update),
+        )
+
+    async def _submit_and_poll(
+        self,
+        source_url: HttpUrl,
+        target_url: HttpUrl,
+        on_update: Optional[ResultCallback],
+    ) -> SwapFaceResult:
+        if self.landmark_cache is not None and self.hasher is not None:
+            response = await self._submit_with_known_landmarks(source_url, target_url)
+        else:
+            response = await self.client.swap_faces(
+                source_url=str(source_url),
+                target_url=str(target_url)
+            )
+        initial_result = SwapFaceResult.from_icons8_response(response)
+        if on_update:
+            on_update(initial_result)
+
+        return await self._poll_until_complete(
+            ImageId(initial_result.job_id), on_update
+        )
     
     async def swap_faces(self, source_url: HttpUrl, target_url: HttpUrl) -> Dict[str, str]:
         """
@@ -47,15 +250,103 @@ class Icons8Service:
         Returns:
             Dict with url and status keys formatted for frontend consumption.
         """
-        # Initiate face swap
-        response = await self.client.swap_faces(
-            source_url=str(source_url),
-            target_url=str(target_url)
-        )
-        initial_result = SwapFaceResult.from_icons8_response(response)
-        
-        # Poll until complete
-        final_result = await self._poll_until_complete(ImageId(initial_result.job_id))
+        final_result = await self.run_swap(source_url, target_url)
         
         # Convert to frontend format
         return final_result.to_frontend_response()
+
+    async def swap_faces_batch(
+        self, source_url: HttpUrl, target_urls: List[HttpUrl]
+    ) -> AsyncIterator[BatchSwapItemResult]:
+        """
+        Swap one source face onto many targets concurrently.
+
+        Landmarks for the source and all targets are fetched in a single
+        get_bbox call before this method returns, so problems with the source
+        image surface as an Icons8Error up front. The returned iterator then
+        yields one result per target in completion order.
+
+        Raises:
+            Icons8Error: If landmark detection fails or the source has no face.
+        """
+        source = validate_url(str(source_url))
+        targets = list(dict.fromkeys(validate_url(str(url)) for url in target_urls))
+
+        landmarks = await self.client.get_landmarks(
+            [str(source)] + [str(target) for target in targets]
+        )
+        source_faces = find_image_faces(landmarks, source)
+        if not source_faces.faces:
+            raise Icons8Error(status_code=422, detail="No faces detected in source image")
+        source_face = select_face(source_faces)
+
+        target_faces: Dict[AnyHttpUrl, Optional[ImageFaces]] = {}
+        for target in targets:
+            try:
+                target_faces[target] = find_image_faces(landmarks, target)
+            except Icons8Error:
+                target_faces[target] = None
+
+        return self._run_batch(source, source_face, target_faces)
+
+    async def _run_batch(
+        self,
+        source_url: AnyHttpUrl,
+        source_face: Face,
+        target_faces: Dict[AnyHttpUrl, Optional[ImageFaces]],
+    ) -> AsyncIterator[BatchSwapItemResult]:
+        """Submit and poll all target swaps, yielding results as they finish."""
+        submit_slots = asyncio.Semaphore(self.max_concurrent_submissions)
+
+        async def swap_one(
+            target_url: AnyHttpUrl, image_faces: Optional[ImageFaces]
+        ) -> BatchSwapItemResult:
+            if image_faces is None or not image_faces.faces:
+                return BatchSwapItemResult(
+                    target_url=str(target_url),
+                    status="error",
+                    error="No faces detected in target image"
+                )
+            try:
+                async with submit_slots:
+                    response = await self.client.submit_face_swap(
+                        source_url, source_face, target_url, select_face(image_faces)
+                    )
+                result = await self._poll_until_complete(ImageId(response.id))
+            except Icons8Error as e:
+                return BatchSwapItemResult(
+                    target_url=str(target_url), status="error", error=e.detail
+                )
+            except HTTPError as e:
+                # A timeout or connection error fails this target only
+                logger.warning("Batch swap onto %s failed: %r", target_url, e)
+                return BatchSwapItemResult(
+                    target_url=str(target_url), status="error", error="Face swap request failed"
+                )
+            except Exception:
+                logger.exception("Batch swap onto %s failed", target_url)
+                return BatchSwapItemResult(
+                    target_url=str(target_url), status="error", error="Face swap failed"
+                )
+            return BatchSwapItemResult(
+                target_url=str(target_url), **result.to_frontend_response()
+            )
+
+        tasks = [
+            asyncio.create_task(swap_one(target_url, image_faces))
+            for target_url, image_faces in target_faces.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_in_flight: SingleFlight = SingleFlight()
+
+
+def get_icons8_single_flight() -> SingleFlight:
+    """Process-wide coalescing of identical in-flight Icons8 calls."""
+    return _in_flight
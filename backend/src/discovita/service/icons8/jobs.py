@@ -0,0 +1,187 @@
+"""In-process registry of asynchronous face swap jobs."""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional, Set
+
+from pydantic import HttpUrl
+
+from .icons8_service import Icons8Service
+from .models import Icons8Error
+from ...models import ProcessingStatus, SwapFaceResult
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (
+    ProcessingStatus.READY,
+    ProcessingStatus.ERROR,
+    ProcessingStatus.FAILED,
+)
+
+
+@dataclass
+class SwapJob:
+    """A face swap job tracked by the registry."""
+    id: str
+    result: SwapFaceResult
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        """Whether the job reached a final status."""
+        return self.result.status in FINISHED_STATUSES
+
+    def update(self, result: SwapFaceResult, error: Optional[str] = None) -> None:
+        """Store a new result and wake up everyone waiting on this job."""
+        # Keep our own id: Icons8 job ids are an implementation detail.
+        self.result = result.model_copy(update={"job_id": self.id})
+        self.error = error
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Wait until the job is updated. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_frontend_response(self) -> dict:
+        """Frontend response shape, including the job id."""
+        return {"job_id": self.id, **self.result.to_frontend_response()}
+
+
+class SwapJobRegistry:
+    """
+    Bounded registry of face swap jobs running in the background.
+
+    Jobs are kept in insertion order. When the registry is full, the oldest
+    finished job is evicted; if every job is still running, new submissions
+    are rejected instead of growing without bound.
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, SwapJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str) -> Optional[SwapJob]:
+        """Look up a job by id."""
+        return self._jobs.get(job_id)
+
+    def submit(
+        self, service: Icons8Service, source_url: HttpUrl, target_url: HttpUrl
+    ) -> SwapJob:
+        """Register a new job and start running it in the background."""
+        self._make_room()
+
+        job_id = str(uuid.uuid4())
+        job = SwapJob(
+            id=job_id,
+            result=SwapFaceResult(
+                job_id=job_id,
+                status=ProcessingStatus.QUEUE,
+                status_name="queue",
+            ),
+        )
+        self._jobs[job_id] = job
+
+        task = asyncio.create_task(self._run(job, service, source_url, target_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[SwapJob]:
+        """Long-poll a job until it finishes or the timeout expires."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        deadline = time.monotonic() + timeout
+        while not job.done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await job.wait_for_change(remaining):
+                break
+        return job
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[SwapJob]:
+        """
+        Yield the job once immediately and again on every update until it finishes.
+
+        The job is also yielded every `heartbeat` seconds without changes so
+        streaming clients can detect dead connections.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        yield job
+        while not job.done:
+            await job.wait_for_change(heartbeat)
+            yield job
+
+    async def aclose(self) -> None:
+        """Cancel all running jobs."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _make_room(self) -> None:
+        """Evict the oldest finished job if the registry is full."""
+        if len(self._jobs) < self.max_jobs:
+            return
+
+        for job_id, job in self._jobs.items():
+            if job.done:
+                del self._jobs[job_id]
+                return
+
+        raise Icons8Error(
+            status_code=503,
+            detail="Too many face swap jobs in progress, try again later"
+        )
+
+    async def _run(
+        self,
+        job: SwapJob,
+        service: Icons8Service,
+        source_url: HttpUrl,
+        target_url: HttpUrl,
+    ) -> None:
+        """Run the swap and record every intermediate result on the job."""
+        try:
+            result = await service.run_swap(source_url, target_url, on_update=job.update)
+            job.update(result)
+        except Icons8Error as e:
+            job.update(self._failed(job), error=e.detail)
+        except asyncio.CancelledError:
+            job.update(self._failed(job), error="Face swap job was cancelled")
+            raise
+        except Exception as e:
+            logger.exception("Face swap job %s failed", job.id)
+            job.update(self._failed(job), error=str(e))
+
+    @staticmethod
+    def _failed(job: SwapJob) -> SwapFaceResult:
+        return job.result.model_copy(
+            update={"status": ProcessingStatus.ERROR, "status_name": "error"}
+        )
+
+
+_registry = SwapJobRegistry()
+
+
+def get_swap_job_registry() -> SwapJobRegistry:
+    """Dependency for the process-wide swap job registry."""
+    return _registry
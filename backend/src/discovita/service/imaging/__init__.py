@@ -0,0 +1,31 @@
+"""Image processing: type sniffing and upload normalization."""
+
+from .models import ImageError, NormalizedImage
+from .normalize import normalize_image, render_variant
+from .pool import ImageNormalizer, close_image_normalizer, get_image_normalizer
+from .sniff import SNIFF_BYTES, SUPPORTED_CONTENT_TYPES, sniff_image_type
+from .variants import (
+    VARIANT_FORMATS,
+    WIDTH_PRESETS,
+    Variant,
+    VariantService,
+    get_variant_service,
+)
+
+__all__ = [
+    "ImageError",
+    "ImageNormalizer",
+    "NormalizedImage",
+    "SNIFF_BYTES",
+    "SUPPORTED_CONTENT_TYPES",
+    "VARIANT_FORMATS",
+    "Variant",
+    "VariantService",
+    "WIDTH_PRESETS",
+    "close_image_normalizer",
+    "get_image_normalizer",
+    "get_variant_service",
+    "normalize_image",
+    "render_variant",
+    "sniff_image_type",
+]
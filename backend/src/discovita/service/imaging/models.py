@@ -0,0 +1,23 @@
+"""Models for image processing."""
+
+from pydantic import BaseModel
+
+class ImageError(Exception):
+    """Image rejected or could not be processed."""
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"Image error: {detail}")
+
+    def __reduce__(self):
+        # Raised in worker processes; keep both fields when pickled back
+        return (self.__class__, (self.status_code, self.detail))
+
+class NormalizedImage(BaseModel):
+    """An image after orientation, downscaling and re-encoding."""
+    content: bytes
+    content_type: str
+    extension: str
+    width: int
+    height: int
+    original_size: int
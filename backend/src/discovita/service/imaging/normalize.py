@@ -0,0 +1,129 @@
+"""CPU-bound image work: upload normalization and variant rendering."""
+
+import io
+from typing import Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ImageError, NormalizedImage
+from .sniff import SNIFF_BYTES, sniff_image_type
+
+# Output formats: Pillow format name -> (content type, file extension)
+OUTPUT_FORMATS = {
+    "JPEG": ("image/jpeg", ".jpg"),
+    "WEBP": ("image/webp", ".webp"),
+    "PNG": ("image/png", ".png"),
+}
+
+# Refuse to decode anything larger, regardless of file size (decompression bombs)
+MAX_INPUT_PIXELS = 50_000_000
+
+
+def normalize_image(
+    source: Union[bytes, str],
+    max_dimension: int = 2048,
+    output_format: str = "JPEG",
+    quality: int = 85,
+) -> NormalizedImage:
+    """
+    Normalize an uploaded image, given as bytes or as the path of a file.
+
+    - rejects content that is not a supported image (415)
+    - applies the EXIF orientation, so pixels are stored upright
+    - downscales to fit `max_dimension` on the longest side
+    - re-encodes in `output_format`, dropping all metadata
+
+    CPU-bound; run it in a worker process. Pass a path there, so the
+    original is read from disk by the worker instead of being copied
+    into it.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    stream = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    with stream:
+        if sniff_image_type(stream.read(SNIFF_BYTES)) is None:
+            raise ImageError(status_code=415, detail="File is not a supported image")
+        original_size = stream.seek(0, io.SEEK_END)
+        stream.seek(0)
+
+        try:
+            with Image.open(stream) as image:
+                width, height = image.size
+                if width * height > MAX_INPUT_PIXELS:
+                    raise ImageError(status_code=413, detail="Image dimensions are too large")
+
+                # JPEG can decode straight to a smaller scale, which is much faster
+                image.draft("RGB", (max_dimension, max_dimension))
+                upright = ImageOps.exif_transpose(image)
+                if max(upright.size) > max_dimension:
+                    upright.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+                output = encode_image(upright, output_format, quality)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+            raise ImageError(status_code=415, detail=f"Image could not be decoded: {e}")
+
+    content_type, extension = OUTPUT_FORMATS[output_format]
+    return NormalizedImage(
+        content=output,
+        content_type=content_type,
+        extension=extension,
+        width=upright.width,
+        height=upright.height,
+        original_size=original_size,
+    )
+
+
+def render_variant(content: bytes, width: int, output_format: str, quality: int) -> bytes:
+    """
+    Resize an image to `width` (never upscaling) and encode it.
+
+    CPU-bound; run it in a worker process.
+    """
+    if sniff_image_type(content[:SNIFF_BYTES]) is None:
+        raise ImageError(status_code=415, detail="Source is not a supported image")
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if image.width * image.height > MAX_INPUT_PIXELS:
+                raise ImageError(status_code=413, detail="Source image is too large")
+            # Both sides at least `width`, whichever ends up horizontal
+            image.draft("RGB", (width, width))
+            upright = ImageOps.exif_transpose(image)
+            if upright.width > width:
+                height = max(1, round(upright.height * width / upright.width))
+                upright = upright.resize((width, height), Image.LANCZOS)
+            return encode_image(upright, output_format, quality)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ImageError(status_code=415, detail=f"Source image could not be decoded: {e}")
+
+
+def encode_image(image: Image.Image, output_format: str, quality: int) -> bytes:
+    """Encode an image in one of OUTPUT_FORMATS, without metadata."""
+    image = _convert_mode(image, output_format)
+    buffer = io.BytesIO()
+    if output_format == "JPEG":
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    elif output_format == "WEBP":
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _convert_mode(image: Image.Image, output_format: str) -> Image.Image:
+    """Convert to a mode the output format supports."""
+    has_alpha = image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    if output_format == "JPEG":
+        if has_alpha:
+            # JPEG has no alpha channel: flatten onto white
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image if image.mode in ("RGB", "L") else image.convert("RGB")
+    if has_alpha:
+        return image if image.mode == "RGBA" else image.convert("RGBA")
+    return image if image.mode == "RGB" else image.convert("RGB")
@@ -0,0 +1,98 @@
+"""Process pool for CPU-bound image work."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, Union
+
+from .models import NormalizedImage
+from .normalize import normalize_image, render_variant
+from ...config import Settings
+
+
+class ImageNormalizer:
+    """
+    Normalizes images in a pool of worker processes.
+
+    Decoding and resizing hold the GIL for long stretches, so they run in
+    separate processes to keep the event loop and request threads free.
+    The pool is created on first use.
+    """
+
+    def __init__(
+        self,
+        max_dimension: int = 2048,
+        output_format: str = "JPEG",
+        quality: int = 85,
+        max_workers: Optional[int] = None,
+    ):
+        self.max_dimension = max_dimension
+        self.output_format = output_format
+        self.quality = quality
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def normalize(self, source: Union[bytes, str]) -> NormalizedImage:
+        """Normalize an image, given as bytes or a file path, in a worker process."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            partial(
+                normalize_image,
+                source,
+                max_dimension=self.max_dimension,
+                output_format=self.output_format,
+                quality=self.quality,
+            ),
+        )
+
+    async def render_variant(
+        self, content: bytes, width: int, output_format: str, quality: int
+    ) -> bytes:
+        """Resize and encode an image variant in a worker process."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            partial(render_variant, content, width, output_format, quality),
+        )
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_normalizer: Optional[ImageNormalizer] = None
+
+
+def get_image_normalizer(settings: Settings) -> ImageNormalizer:
+    """Return the process-wide image normalizer, creating it on first use."""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = ImageNormalizer(
+            max_dimension=settings.upload_max_dimension,
+            output_format=settings.upload_image_format,
+            quality=settings.upload_image_quality,
+            max_workers=settings.image_workers,
+        )
+    return _normalizer
+
+
+def close_image_normalizer() -> None:
+    """Shut down the shared image normalizer, if it was created."""
+    global _normalizer
+    if _normalizer is not None:
+        _normalizer.close()
+        _normalizer = None
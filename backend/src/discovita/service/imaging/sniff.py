@@ -0,0 +1,26 @@
+"""Image type detection from magic bytes."""
+
+from typing import Optional
+
+# Enough bytes to recognise every supported format
+SNIFF_BYTES = 16
+
+SUPPORTED_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp", "image/gif")
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """
+    Return the MIME type of an image from its first bytes.
+
+    Only formats that can be decoded here are recognised; anything else,
+    including files that merely claim an image content type, returns None.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return None
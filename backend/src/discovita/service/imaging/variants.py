@@ -0,0 +1,144 @@
+"""Resized image variants served from a local disk cache."""
+
+import hashlib
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from fastapi.concurrency import run_in_threadpool
+from httpx import AsyncClient, HTTPError
+from pydantic import BaseModel
+
+from .models import ImageError
+from .normalize import OUTPUT_FORMATS
+from .pool import ImageNormalizer, get_image_normalizer
+from ...config import Settings
+from ...utils.disk_cache import DiskLRUCache
+from ...utils.http import get_download_client
+from ...utils.singleflight import SingleFlight
+
+# Only these widths are rendered, so the cache holds a bounded set per image
+WIDTH_PRESETS = (160, 320, 640, 1024, 1600)
+# Request format name -> Pillow format name
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+VARIANT_QUALITY = 80
+MAX_SOURCE_BYTES = 30 * 1024 * 1024
+
+
+class Variant(BaseModel):
+    """An encoded image variant."""
+    content: bytes
+    content_type: str
+    etag: str
+
+
+class VariantService:
+    """
+    Serve resized variants of images hosted on allowed hosts.
+
+    Sources are expected to be immutable (content-addressed or never
+    overwritten), so a variant is identified by source URL, width and
+    format alone. That identity is also the strong ETag, which lets
+    conditional requests be answered without any I/O. Rendering happens in
+    the image worker pool and concurrent requests for the same variant
+    share one download and render.
+    """
+
+    def __init__(
+        self,
+        normalizer: ImageNormalizer,
+        cache: DiskLRUCache,
+        allowed_hosts: Iterable[str],
+        http_client: Optional[AsyncClient] = None,
+        quality: int = VARIANT_QUALITY,
+        max_source_bytes: int = MAX_SOURCE_BYTES,
+    ):
+        self.normalizer = normalizer
+        self.cache = cache
+        self.allowed_hosts = frozenset(allowed_hosts)
+        self._http_client = http_client
+        self.quality = quality
+        self.max_source_bytes = max_source_bytes
+        self._in_flight: SingleFlight[bytes] = SingleFlight()
+
+    @property
+    def http_client(self) -> AsyncClient:
+        return self._http_client or get_download_client()
+
+    def validate(self, url: str, width: int, fmt: str) -> None:
+        """Raise ImageError 400 for variants that are not served."""
+        parts = urlsplit(url)
+        if parts.scheme != "https" or parts.hostname not in self.allowed_hosts:
+            raise ImageError(status_code=400, detail="Image host is not allowed")
+        if width not in WIDTH_PRESETS:
+            raise ImageError(
+                status_code=400,
+                detail=f"Width must be one of {', '.join(map(str, WIDTH_PRESETS))}",
+            )
+        if fmt not in VARIANT_FORMATS:
+            raise ImageError(status_code=400, detail="Format must be webp or jpeg")
+
+    def variant_key(self, url: str, width: int, fmt: str) -> str:
+        """Cache key of a variant; also used as its ETag."""
+        identity = f"{url}|{width}|{fmt}|{self.quality}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    @staticmethod
+    def etag(key: str) -> str:
+        return f'"{key[:32]}"'
+
+    @staticmethod
+    def content_type(fmt: str) -> str:
+        return OUTPUT_FORMATS[VARIANT_FORMATS[fmt]][0]
+
+    async def get_variant(self, url: str, width: int, fmt: str) -> Variant:
+        """Return a variant from the disk cache, rendering it on a miss."""
+        self.validate(url, width, fmt)
+        key = self.variant_key(url, width, fmt)
+
+        content = await run_in_threadpool(self.cache.get, key)
+        if content is None:
+            content = await self._in_flight.do(
+                key, lambda: self._render_and_store(key, url, width, fmt)
+            )
+        return Variant(content=content, content_type=self.content_type(fmt), etag=self.etag(key))
+
+    async def _render_and_store(self, key: str, url: str, width: int, fmt: str) -> bytes:
+        source = await self._download(url)
+        content = await self.normalizer.render_variant(
+            source, width, VARIANT_FORMATS[fmt], self.quality
+        )
+        await run_in_threadpool(self.cache.set, key, content)
+        return content
+
+    async def _download(self, url: str) -> bytes:
+        chunks = []
+        received = 0
+        try:
+            # Only the first URL is validated, so redirects are never followed
+            async with self.http_client.stream("GET", url, follow_redirects=False) as response:
+                if response.status_code == 404:
+                    raise ImageError(status_code=404, detail="Source image not found")
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    if received > self.max_source_bytes:
+                        raise ImageError(status_code=413, detail="Source image is too large")
+                    chunks.append(chunk)
+        except HTTPError as e:
+            raise ImageError(status_code=502, detail=f"Could not fetch source image: {e}")
+        return b"".join(chunks)
+
+
+_variant_service: Optional[VariantService] = None
+
+
+def get_variant_service(settings: Settings) -> VariantService:
+    """Return the process-wide variant service, creating it on first use."""
+    global _variant_service
+    if _variant_service is None:
+        _variant_service = VariantService(
+            normalizer=get_image_normalizer(settings),
+            cache=DiskLRUCache(settings.variant_cache_dir, settings.variant_cache_max_bytes),
+            allowed_hosts=(settings.s3_bucket_host, *settings.variant_allowed_hosts),
+        )
+    return _variant_service
@@ -5,10 +5,12 @@ This module contains the main OpenAIService class which provides
 a simplified interface to OpenAI's API.
 """
 
+import httpx
 from openai import OpenAI
 from typing import Annotated, Optional
 import logging
 from ..utils.model_utils import check_dependency_versions
+from ....utils.singleflight import ThreadSingleFlight
 from .messages import MessageMixin
 from .chat.structured import StructuredCompletionMixin
 from .chat.generic import GenericChatCompletionMixin
@@ -40,6 +42,8 @@ class OpenAIService(
         self,
         api_key: Annotated[str, "The OpenAI API Key you wish to use"],
         organization: Optional[Annotated[str, "Your OpenAI organization ID (optional)"]] = None,
+        http_client: Optional[httpx.Client] = None,
+        in_flight: Optional[ThreadSingleFlight] = None,
     ):
         """
         Initialize the OpenAI helper with your API key and organization.
@@ -51,7 +55,33 @@ class OpenAIService(
         organization : str, optional
             Your OpenAI organization ID. If not provided, the default organization
             associated with your API key will be used.
+        http_client : httpx.Client, optional
+            HTTP client to send requests with. With the rate-limited client
+            from `get_shared_openai_http_client`, retries are left to its
+            scheduler and the OpenAI client does not retry on its own.
+        in_flight : ThreadSingleFlight, optional
+            Shares concurrent identical completion, vision and image calls,
+            usually the process-wide one from `get_openai_single_flight()`.
+            Call sites that need distinct results for identical requests
+            turn this off with `utils.singleflight.coalescing(False)`.
         """
-        self.client = OpenAI(api_key=api_key, organization=organization)
+        self.in_flight = in_flight
+        if http_client is None:
+            self.client = OpenAI(api_key=api_key, organization=organization)
+        else:
+            self.client = OpenAI(
+                api_key=api_key,
+                organization=organization,
+                http_client=http_client,
+                max_retries=0,
+            )
 
         check_dependency_versions()
+
+
+_in_flight: ThreadSingleFlight = ThreadSingleFlight()
+
+
+def get_openai_single_flight() -> ThreadSingleFlight:
+    """Process-wide coalescing of identical in-flight OpenAI calls."""
+    return _in_flight
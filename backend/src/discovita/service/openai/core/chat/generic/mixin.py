@@ -22,6 +22,7 @@ from openai.types.chat import (
     ChatCompletionToolChoiceOptionParam,
     ChatCompletionToolParam,
 )
+from discovita.utils.singleflight import coalesced
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -33,6 +34,7 @@ class GenericChatCompletionMixin:
     This includes basic text generation, streaming, and parameter handling.
     """
 
+    @coalesced
     def create_chat_completion(
         self,
         messages: List[ChatCompletionMessageParam],
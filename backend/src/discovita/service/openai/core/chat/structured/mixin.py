@@ -16,6 +16,7 @@ from typing import (
 )
 
 from discovita.service.openai.models.openai_compatibility import NOT_GIVEN, NotGiven
+from discovita.utils.singleflight import coalesced
 from openai.types.chat import (
     ChatCompletionMessageParam,
     ChatCompletionToolChoiceOptionParam,
@@ -36,6 +37,7 @@ class StructuredCompletionMixin:
     Mixin providing structured completion functionality for OpenAIService.
     """
 
+    @coalesced
     def create_structured_chat_completion(
         self,
         messages: List[ChatCompletionMessageParam],
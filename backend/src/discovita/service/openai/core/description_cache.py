@@ -0,0 +1,37 @@
+"""Cache of clean headshot descriptions."""
+
+from typing import Optional
+
+from ....utils.cache import TTLCache
+from ....utils.singleflight import SingleFlight
+
+
+class DescriptionCache:
+    """
+    Clean descriptions keyed by the content hash of the image.
+
+    Describing an image takes two model calls, so the same headshot (even
+    under another URL) is only described once. Concurrent requests for the
+    same image, such as a precompute started at upload time and the client's
+    own /describe call, share one description via `in_flight`.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 7 * 24 * 60 * 60):
+        self._descriptions: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.in_flight: SingleFlight[str] = SingleFlight()
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Return the cached description of an image, if any."""
+        return self._descriptions.get(content_hash)
+
+    def set(self, content_hash: str, description: str) -> None:
+        """Cache the description of an image."""
+        self._descriptions.set(content_hash, description)
+
+
+_cache = DescriptionCache()
+
+
+def get_description_cache() -> DescriptionCache:
+    """Dependency for the process-wide description cache."""
+    return _cache
@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Literal, Optional, Union
 
 from discovita.service.openai.models.image import ImageModel, ImageSize
 from discovita.service.openai.utils.image import encode_image
+from discovita.utils.singleflight import coalesced
 
 from .response import process_image_response
 from .utils import save_generated_image
@@ -25,6 +26,7 @@ class ImageGenerationMixin:
         """Encode an image for use with OpenAI's API."""
         return encode_image(image_path)
 
+    @coalesced
     def generate_image(
         self,
         prompt: str,
@@ -79,6 +81,7 @@ class ImageGenerationMixin:
             save_image_func=save_generated_image,
         )
 
+    @coalesced
     def describe_image_with_vision(
         self,
         image_url: str,
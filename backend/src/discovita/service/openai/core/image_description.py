@@ -1,14 +1,33 @@
 """Service for getting clean descriptions of headshot images."""
 
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from httpx import HTTPError
 from pydantic import AnyHttpUrl
 
 from .base import OpenAIService
+from .description_cache import DescriptionCache
+from ....models import BatchDescribeItemResult
+from ....utils.content_hash import ContentHasher, ContentHashError
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_MODEL = "gpt-4o"
+# Concurrent vision calls per batch
+MAX_BATCH_CONCURRENCY = 4
 
 
 class ImageDescriptionService:
     """Service for getting clean descriptions of headshot images."""
 
-    def __init__(self, open_ai_service: OpenAIService):
+    def __init__(
+        self,
+        open_ai_service: OpenAIService,
+        cache: Optional[DescriptionCache] = None,
+        hasher: Optional[ContentHasher] = None,
+    ):
         """
         Initialize the service with an OpenAIService instance.
 
@@ -16,13 +35,23 @@ class ImageDescriptionService:
         ----------
         open_ai_service : OpenAIService
             OpenAIService instance for making API calls
+        cache : DescriptionCache, optional
+            Cache of descriptions by image content hash
+        hasher : ContentHasher, optional
+            Content hasher used to build cache keys; required for caching
         """
         self.open_ai_service = open_ai_service
+        self.cache = cache
+        self.hasher = hasher
 
     async def get_clean_description(self, image_url: AnyHttpUrl) -> str:
         """
         Get a clean description of a headshot image.
 
+        Descriptions are cached by the image's content hash when a cache and
+        hasher are configured; concurrent calls for the same image share one
+        description.
+
         This is a two-step process:
         1. Get a detailed description using GPT-4 Vision
         2. Clean up the description using GPT-4o to remove irrelevant details
@@ -37,15 +66,44 @@ class ImageDescriptionService:
         str
             Clean, focused description of the person's physical appearance
         """
+        content_hash = await self._content_hash(image_url)
+        if content_hash is None:
+            return await self._describe(image_url)
+
+        cached = self.cache.get(content_hash)
+        if cached is not None:
+            return cached
+        return await self.cache.in_flight.do(
+            content_hash, lambda: self._describe_and_store(content_hash, image_url)
+        )
+
+    async def _content_hash(self, image_url: AnyHttpUrl) -> Optional[str]:
+        if self.cache is None or self.hasher is None:
+            return None
+        try:
+            return await self.hasher.hash_url(str(image_url))
+        except (HTTPError, ContentHashError) as e:
+            logger.warning("Could not hash %s, skipping description cache: %s", image_url, e)
+            return None
+
+    async def _describe_and_store(self, content_hash: str, image_url: AnyHttpUrl) -> str:
+        description = await self._describe(image_url)
+        self.cache.set(content_hash, description)
+        return description
+
+    async def _describe(self, image_url: AnyHttpUrl) -> str:
+        # The OpenAI client is synchronous; keep its calls off the event loop.
         # Step 1: Get initial description using the vision API
-        initial_description = self.open_ai_service.describe_image_with_vision(
+        initial_description = await asyncio.to_thread(
+            self.open_ai_service.describe_image_with_vision,
             str(image_url),
             "Describe this person's physical appearance in detail. Focus on "
             + "their facial features, hair, and any distinctive characteristics. In particular, race and gender can and should be included in the description.",
         )
 
         # Step 2: Clean up description using regular chat completion
-        clean_description = self.open_ai_service.get_completion(
+        clean_description = await asyncio.to_thread(
+            self._complete,
             f"""Clean up this description of a person by removing any irrelevant details about pose, background, or setting. 
             Keep only physical characteristics of the person that would be relevant for generating a new image of them.
             In particular, race and gender description should be retained.
@@ -54,3 +112,63 @@ class ImageDescriptionService:
         )
 
         return clean_description
+
+    def _complete(self, prompt: str) -> str:
+        response = self.open_ai_service.create_chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=CLEANUP_MODEL,
+        )
+        return str(response).strip()
+
+    async def describe_batch(
+        self,
+        image_urls: Sequence[AnyHttpUrl],
+        max_concurrency: int = MAX_BATCH_CONCURRENCY,
+    ) -> AsyncIterator[BatchDescribeItemResult]:
+        """
+        Describe many images, yielding one result per URL in completion order.
+
+        Duplicate URLs are described once, and so are different URLs with
+        the same content. Cached descriptions are yielded first; the other
+        images are described concurrently, at most `max_concurrency` at a
+        time. A failed image yields a result with an error.
+        """
+        urls = list(dict.fromkeys(str(url) for url in image_urls))
+        hashes = await asyncio.gather(*(self._content_hash(url) for url in urls))
+
+        # Images by content; URLs that could not be hashed stand on their own
+        groups: Dict[str, List[str]] = {}
+        for url, content_hash in zip(urls, hashes):
+            groups.setdefault(content_hash or url, []).append(url)
+
+        pending = {}
+        for key, group in groups.items():
+            cached = self.cache.get(key) if key in hashes else None
+            if cached is None:
+                pending[key] = group
+                continue
+            for url in group:
+                yield BatchDescribeItemResult(image_url=url, description=cached, cached=True)
+
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def describe_group(group: List[str]) -> List[BatchDescribeItemResult]:
+            try:
+                async with slots:
+                    description = await self.get_clean_description(group[0])
+            except Exception as e:
+                logger.warning("Could not describe %s: %s", group[0], e)
+                return [BatchDescribeItemResult(image_url=url, error=str(e)) for url in group]
+            return [
+                BatchDescribeItemResult(image_url=url, description=description)
+                for url in group
+            ]
+
+        tasks = [asyncio.create_task(describe_group(group)) for group in pending.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
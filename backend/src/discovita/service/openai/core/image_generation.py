@@ -1,13 +1,49 @@
 """Service for generating images using OpenAI."""
 
-from ..models.image_models import ImageResponse, SafeImageResponse
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional, Tuple
+
+from ..models.image_models import GeneratedImage, ImageResponse, SafeImageResponse
 from .base import OpenAIService
+from .prompt_safety import (
+    CleanedPromptCache,
+    is_content_policy_violation,
+    rewrite_prompt,
+    screen_prompt,
+)
+from ....models import RenderMode
+from ....utils.singleflight import coalescing
+
+log = logging.getLogger(__name__)
+
+MAX_VARIANTS = 4
+
+# DALL-E settings per render mode
+RENDER_SETTINGS = {
+    RenderMode.DRAFT: {"model": "dall-e-3", "size": "1024x1024", "quality": "standard"},
+    RenderMode.FINAL: {"model": "dall-e-3", "size": "1024x1024", "quality": "hd"},
+}
+
+# DALL-E 3 rewrites every prompt. This prefix (suggested in OpenAI's docs)
+# asks it to keep an accepted draft's revised prompt as it is, so the
+# final render shows the same scene.
+AS_IS_PREFIX = (
+    "I NEED to test how the tool works with extremely simple prompts. "
+    "DO NOT add any detail, just use it AS-IS: "
+)
 
 
 class ImageGenerationService:
     """Service for generating images using OpenAI."""
 
-    def __init__(self, open_ai_service: OpenAIService):
+    def __init__(
+        self,
+        open_ai_service: OpenAIService,
+        slots: Optional[asyncio.Semaphore] = None,
+        prompt_cache: Optional[CleanedPromptCache] = None,
+    ):
         """
         Initialize the service with an OpenAIService instance.
 
@@ -15,8 +51,61 @@ class ImageGenerationService:
         ----------
         open_ai_service : OpenAIService
             OpenAIService instance for making API calls
+        slots : asyncio.Semaphore, optional
+            Limits concurrent generations of the async methods; usually the
+            process-wide semaphore from `get_generation_slots()`
+        prompt_cache : CleanedPromptCache, optional
+            Rewrites of risky or rejected prompts, reused across requests
         """
         self.open_ai_service = open_ai_service
+        self.slots = slots or asyncio.Semaphore(MAX_VARIANTS)
+        self.prompt_cache = prompt_cache
+
+    def build_scene_prompt(
+        self,
+        setting: str,
+        outfit: str,
+        emotion: str,
+        user_description: str | None = None,
+        user_feedback: str | None = None,
+        previous_augmented_prompt: str | None = None,
+    ) -> str:
+        """
+        Build the DALL-E prompt for a scene.
+
+        With user feedback and a previous prompt, the previous prompt is
+        refined with the feedback; otherwise a new scene prompt is built.
+        """
+        # Build base prompt including user description if available
+        person_desc = (
+            f"a person with {user_description}" if user_description else "a person"
+        )
+        base_prompt = f"A photo of {person_desc} in {setting}, wearing {outfit}, expressing {emotion}. Make sure the scene prominently features a person with these physical characteristics. Make it a realistic, colored, photo-quality image."
+
+        if user_feedback and previous_augmented_prompt:
+            # If we have feedback and a previous prompt, use those for refinement
+            # Emphasize the user feedback by putting it first and making it a requirement
+            return f"""IMPORTANT REQUIREMENTS FROM USER: {user_feedback}
+
+Based on these requirements, generate a new version of this scene:
+{previous_augmented_prompt}
+
+The above description should be modified to strongly emphasize and incorporate the user's requirements."""
+        return base_prompt
+
+    def _generate(self, prompt: str, mode: RenderMode = RenderMode.FINAL) -> ImageResponse:
+        """Generate one image for a prompt."""
+        result = self.open_ai_service.generate_image(prompt=prompt, **RENDER_SETTINGS[mode])
+        return ImageResponse(
+            created=int(time.time()),
+            data=[
+                GeneratedImage(
+                    url=image_data.get("url", ""),
+                    revised_prompt=image_data.get("revised_prompt", ""),
+                )
+                for image_data in result or []
+            ],
+        )
 
     def generate_scene(
         self,
@@ -26,6 +115,7 @@ class ImageGenerationService:
         user_description: str | None = None,
         user_feedback: str | None = None,
         previous_augmented_prompt: str | None = None,
+        mode: RenderMode = RenderMode.FINAL,
     ) -> ImageResponse:
         """
         Generate a scene based on user input.
@@ -44,44 +134,23 @@ class ImageGenerationService:
             User feedback from a previous generation
         previous_augmented_prompt : str, optional
             The prompt used in the previous generation
+        mode : RenderMode
+            DRAFT for fast standard-quality previews, FINAL (default) for HD
 
         Returns
         -------
         ImageResponse
-            The generated image data
+            The generated image data; `data` is empty if nothing was generated
         """
-        # Build base prompt including user description if available
-        person_desc = (
-            f"a person with {user_description}" if user_description else "a person"
+        prompt = self.build_scene_prompt(
+            setting,
+            outfit,
+            emotion,
+            user_description,
+            user_feedback,
+            previous_augmented_prompt,
         )
-        base_prompt = f"A photo of {person_desc} in {setting}, wearing {outfit}, expressing {emotion}. Make sure the scene prominently features a person with these physical characteristics. Make it a realistic, colored, photo-quality image."
-
-        if user_feedback and previous_augmented_prompt:
-            # If we have feedback and a previous prompt, use those for refinement
-            # Emphasize the user feedback by putting it first and making it a requirement
-            prompt = f"""IMPORTANT REQUIREMENTS FROM USER: {user_feedback}
-
-Based on these requirements, generate a new version of this scene:
-{previous_augmented_prompt}
-
-The above description should be modified to strongly emphasize and incorporate the user's requirements."""
-        else:
-            prompt = base_prompt
-
-        # Generate the image using OpenAIService
-        result = self.open_ai_service.generate_image(
-            prompt=prompt, model="dall-e-3", size="1024x1024", quality="hd"
-        )
-
-        # Convert to expected response format
-        if result and len(result) > 0:
-            image_data = result[0]
-            return ImageResponse(
-                url=image_data.get("url", ""),
-                revised_prompt=image_data.get("revised_prompt", ""),
-            )
-
-        return ImageResponse(url="", revised_prompt="")
+        return self._generate(prompt, mode)
 
     def safe_generate_scene(
         self,
@@ -91,6 +160,7 @@ The above description should be modified to strongly emphasize and incorporate t
         user_description: str | None = None,
         user_feedback: str | None = None,
         previous_augmented_prompt: str | None = None,
+        mode: RenderMode = RenderMode.FINAL,
     ) -> SafeImageResponse:
         """
         Generate a scene based on user input with safety handling.
@@ -109,52 +179,209 @@ The above description should be modified to strongly emphasize and incorporate t
             User feedback from a previous generation
         previous_augmented_prompt : str, optional
             The prompt used in the previous generation
+        mode : RenderMode
+            DRAFT for fast standard-quality previews, FINAL (default) for HD
 
         Returns
         -------
         SafeImageResponse
             The generated image data with safety handling
         """
+        prompt = self.build_scene_prompt(
+            setting,
+            outfit,
+            emotion,
+            user_description,
+            user_feedback,
+            previous_augmented_prompt,
+        )
+        return self._safe_generate(prompt, mode)
+
+    def _safe_generate(
+        self, prompt: str, mode: RenderMode = RenderMode.FINAL
+    ) -> SafeImageResponse:
+        """
+        Generate one image for a prompt, reporting errors in the response.
+
+        Prompts that were rejected before, or that contain risky terms, are
+        rewritten before the first attempt. A content policy rejection is
+        rewritten and retried once. Rewrites are remembered per prompt.
+        """
+        cleaned = self._known_rewrite(prompt)
         try:
-            # Build base prompt including user description if available
-            person_desc = (
-                f"a person with {user_description}" if user_description else "a person"
-            )
-            base_prompt = f"A photo of {person_desc} in {setting}, wearing {outfit}, expressing {emotion}. Make sure the scene prominently features a person with these physical characteristics. Make it a realistic, colored, photo-quality image."
+            response = self._generate(cleaned or prompt, mode)
+        except Exception as e:
+            if cleaned is not None or not is_content_policy_violation(e):
+                # Handle any errors during generation
+                return self._failed(prompt, str(e), cleaned, is_content_policy_violation(e))
 
-            if user_feedback and previous_augmented_prompt:
-                # If we have feedback and a previous prompt, use those for refinement
-                # Emphasize the user feedback by putting it first and making it a requirement
-                prompt = f"""IMPORTANT REQUIREMENTS FROM USER: {user_feedback}
+            log.info("Prompt rejected by the content policy, retrying with a rewrite")
+            try:
+                cleaned = self._rewrite(prompt)
+                response = self._generate(cleaned, mode)
+            except Exception as retry_error:
+                return self._failed(prompt, str(retry_error), cleaned, True)
 
-Based on these requirements, generate a new version of this scene:
-{previous_augmented_prompt}
+        if not response.data:
+            return self._failed(prompt, "No image was generated", cleaned, False)
+        return SafeImageResponse(
+            success=True,
+            data=response,
+            original_prompt=prompt,
+            safety_violation=cleaned is not None,
+            cleaned_prompt=cleaned,
+        )
 
-The above description should be modified to strongly emphasize and incorporate the user's requirements."""
-            else:
-                prompt = base_prompt
+    def _known_rewrite(self, prompt: str) -> Optional[str]:
+        """A cached rewrite, or a fresh one if the prompt contains risky terms."""
+        if self.prompt_cache is not None:
+            cleaned = self.prompt_cache.get(prompt)
+            if cleaned is not None:
+                return cleaned
+
+        categories = screen_prompt(prompt)
+        if not categories:
+            return None
+        log.info("Prompt contains risky terms (%s), rewriting", ", ".join(categories))
+        try:
+            return self._rewrite(prompt)
+        except Exception as e:
+            log.warning("Could not rewrite prompt, using it unchanged: %s", e)
+            return None
+
+    def _rewrite(self, prompt: str) -> str:
+        cleaned = rewrite_prompt(self.open_ai_service, prompt)
+        if self.prompt_cache is not None:
+            self.prompt_cache.set(prompt, cleaned)
+        return cleaned
+
+    @staticmethod
+    def _failed(
+        prompt: str, error: str, cleaned: Optional[str], safety_violation: bool
+    ) -> SafeImageResponse:
+        return SafeImageResponse(
+            success=False,
+            error=error,
+            original_prompt=prompt,
+            safety_violation=safety_violation,
+            cleaned_prompt=cleaned,
+        )
 
-            # Generate the image using OpenAIService
-            result = self.open_ai_service.generate_image(
-                prompt=prompt, model="dall-e-3", size="1024x1024", quality="hd"
+    async def _safe_generate_in_slot(
+        self, prompt: str, mode: RenderMode = RenderMode.FINAL
+    ) -> SafeImageResponse:
+        """Run `_safe_generate` in a worker thread once a generation slot is free."""
+        async with self.slots:
+            call = asyncio.ensure_future(
+                asyncio.to_thread(self._safe_generate, prompt, mode)
             )
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                # The synchronous client cannot be interrupted; keep the slot
+                # until the call returns so the limit stays accurate.
+                await asyncio.wait([call])
+                raise
 
-            # Convert to expected response format
-            if result and len(result) > 0:
-                image_data = result[0]
-                return SafeImageResponse(
-                    success=True,
-                    url=image_data.get("url", ""),
-                    revised_prompt=image_data.get("revised_prompt", ""),
-                    error=None,
+    async def safe_generate_scene_async(
+        self,
+        setting: str,
+        outfit: str,
+        emotion: str,
+        user_description: str | None = None,
+        user_feedback: str | None = None,
+        previous_augmented_prompt: str | None = None,
+        mode: RenderMode = RenderMode.FINAL,
+    ) -> SafeImageResponse:
+        """
+        `safe_generate_scene` for async callers.
+
+        The call runs in a worker thread and waits for a free generation
+        slot, so it never blocks the event loop or exceeds the limit.
+        """
+        prompt = self.build_scene_prompt(
+            setting,
+            outfit,
+            emotion,
+            user_description,
+            user_feedback,
+            previous_augmented_prompt,
+        )
+        return await self._safe_generate_in_slot(prompt, mode)
+
+    async def render_final(self, accepted_prompt: str) -> SafeImageResponse:
+        """
+        Render an accepted draft in HD.
+
+        `accepted_prompt` is the draft's revised prompt. DALL-E is asked to
+        use it as it is, so the final image matches the accepted draft
+        instead of a fresh interpretation of the scene.
+        """
+        return await self._safe_generate_in_slot(
+            f"{AS_IS_PREFIX}{accepted_prompt}", RenderMode.FINAL
+        )
+
+    async def generate_scene_variants(
+        self,
+        count: int,
+        setting: str,
+        outfit: str,
+        emotion: str,
+        user_description: str | None = None,
+        user_feedback: str | None = None,
+        previous_augmented_prompt: str | None = None,
+        mode: RenderMode = RenderMode.FINAL,
+    ) -> AsyncIterator[Tuple[int, SafeImageResponse]]:
+        """
+        Generate `count` variants of a scene concurrently.
+
+        DALL-E 3 only returns one image per call, so this fans out `count`
+        calls for the same prompt and yields `(index, response)` pairs in
+        completion order. All calls share the generation slots. Closing the
+        iterator (e.g. once the user picked a variant) cancels variants
+        that have not started yet; calls already running finish in the
+        background because the client cannot interrupt them.
+        """
+        if not 1 <= count <= MAX_VARIANTS:
+            raise ValueError(f"count must be between 1 and {MAX_VARIANTS}")
+
+        prompt = self.build_scene_prompt(
+            setting,
+            outfit,
+            emotion,
+            user_description,
+            user_feedback,
+            previous_augmented_prompt,
+        )
+
+        async def variant(index: int) -> Tuple[int, SafeImageResponse]:
+            # Identical calls on purpose: each variant needs its own image
+            with coalescing(False):
+                return index, await self._safe_generate_in_slot(prompt, mode)
+
+        pending = {asyncio.create_task(variant(index)) for index in range(count)}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
 
-            return SafeImageResponse(
-                success=False, url="", revised_prompt="", error="No image was generated"
-            )
 
-        except Exception as e:
-            # Handle any errors during generation
-            return SafeImageResponse(
-                success=False, url="", revised_prompt="", error=str(e)
-            )
+_generation_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_generation_slots(limit: int) -> asyncio.Semaphore:
+    """
+    Process-wide semaphore bounding concurrent image generations.
+
+    Created on first use so it belongs to the running event loop.
+    """
+    global _generation_slots
+    if _generation_slots is None:
+        _generation_slots = asyncio.Semaphore(limit)
+    return _generation_slots
@@ -0,0 +1,110 @@
+"""Safety screening and rewriting of image generation prompts."""
+
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+import openai
+
+from .base import OpenAIService
+from ....utils.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+REWRITE_MODEL = "gpt-4o-mini"
+
+# Terms that commonly get DALL-E prompts rejected, by category. A match does
+# not mean the prompt is unsafe; it is rewritten before the first attempt
+# instead of spending a generation call on a likely rejection.
+RISKY_TERMS: Dict[str, List[str]] = {
+    "violence": [
+        "blood", "bloody", "gore", "gory", "gun", "guns", "rifle", "pistol",
+        "weapon", "weapons", "knife", "sword", "kill", "killing", "murder",
+        "corpse", "dead body", "explosion", "shooting",
+    ],
+    "sexual": [
+        "nude", "naked", "topless", "lingerie", "sexy", "seductive", "erotic",
+        "provocative",
+    ],
+    "drugs": ["cocaine", "heroin", "meth", "syringe", "smoking weed"],
+    "self-harm": ["suicide", "self-harm", "self harm"],
+    "hate": ["nazi", "swastika", "kkk"],
+}
+
+_RISKY_PATTERNS = {
+    category: re.compile(
+        r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE
+    )
+    for category, terms in RISKY_TERMS.items()
+}
+
+REWRITE_INSTRUCTIONS = """You rewrite prompts for an image generator that rejects unsafe content.
+Rewrite the prompt so it complies with the content policy: remove or soften violence,
+weapons, nudity, sexual content, drugs, self-harm and hateful symbols, and keep everything
+else (setting, outfit, emotion and the person's appearance) as close to the original as possible.
+Reply with the rewritten prompt only."""
+
+
+def screen_prompt(prompt: str) -> List[str]:
+    """Categories of risky terms found in a prompt; empty if none."""
+    return [
+        category for category, pattern in _RISKY_PATTERNS.items() if pattern.search(prompt)
+    ]
+
+
+def is_content_policy_violation(error: Exception) -> bool:
+    """Whether an OpenAI error is a content policy rejection."""
+    if not isinstance(error, openai.BadRequestError):
+        return False
+    return error.code == "content_policy_violation" or "safety system" in str(error)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Cache key for a prompt: case and whitespace do not matter."""
+    return " ".join(prompt.lower().split())
+
+
+class CleanedPromptCache:
+    """
+    Rewritten versions of prompts that were risky or rejected.
+
+    Keyed by the normalized original, so a prompt that was rejected once
+    goes straight to its rewrite the next time. Image generation runs in
+    worker threads, hence the lock.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 7 * 24 * 60 * 60):
+        self._prompts: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cleaned version of a prompt, if known."""
+        with self._lock:
+            return self._prompts.get(normalize_prompt(prompt))
+
+    def set(self, prompt: str, cleaned: str) -> None:
+        """Remember the cleaned version of a prompt."""
+        with self._lock:
+            self._prompts.set(normalize_prompt(prompt), cleaned)
+
+
+def rewrite_prompt(open_ai_service: OpenAIService, prompt: str) -> str:
+    """Ask a chat model for a policy-compliant version of a prompt."""
+    cleaned = open_ai_service.create_chat_completion(
+        messages=[
+            {"role": "system", "content": REWRITE_INSTRUCTIONS},
+            {"role": "user", "content": prompt},
+        ],
+        model=REWRITE_MODEL,
+        temperature=0.2,
+    )
+    return str(cleaned).strip()
+
+
+_cache = CleanedPromptCache()
+
+
+def get_cleaned_prompt_cache() -> CleanedPromptCache:
+    """Dependency for the process-wide cleaned prompt cache."""
+    return _cache
@@ -0,0 +1,26 @@
+"""Client-side rate limiting of OpenAI requests."""
+
+from .http import close_shared_openai_http_client, get_shared_openai_http_client
+from .scheduler import (
+    Priority,
+    RateLimitScheduler,
+    RateLimitTimeout,
+    TokenBucket,
+    current_priority,
+    in_background,
+    request_priority,
+)
+from .transport import RateLimitedTransport
+
+__all__ = [
+    "Priority",
+    "RateLimitScheduler",
+    "RateLimitTimeout",
+    "RateLimitedTransport",
+    "TokenBucket",
+    "close_shared_openai_http_client",
+    "current_priority",
+    "get_shared_openai_http_client",
+    "in_background",
+    "request_priority",
+]
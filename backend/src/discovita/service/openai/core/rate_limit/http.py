@@ -0,0 +1,52 @@
+"""Shared, rate-limited HTTP client for the OpenAI API."""
+
+from typing import Optional
+
+import httpx
+
+from .scheduler import RateLimitScheduler
+from .transport import RateLimitedTransport
+from .....config import Settings
+from .....utils.resilience import ResilientTransport, get_upstream, idempotent_requests
+
+# OpenAI calls can take a minute (HD images, long completions)
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Completions have no side effects, so a slow one can be sent again for the
+# price of a few tokens. Image generations are not hedged: each one is
+# billed in full and takes long enough that a hedge would usually fire.
+UPSTREAM = get_upstream("openai", hedge=idempotent_requests("/chat/completions"))
+
+_client: Optional[httpx.Client] = None
+
+
+def get_shared_openai_http_client(settings: Settings) -> httpx.Client:
+    """
+    Process-wide HTTP client for OpenAI, created on first use.
+
+    Every OpenAIService built with it shares one scheduler, so limits hold
+    across requests and background work. Its keepalive connections are
+    reused by all of them as well. Slow completions are hedged and an
+    unhealthy API fails fast (see `utils.resilience`).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        scheduler = RateLimitScheduler(
+            requests_per_minute=settings.openai_requests_per_minute,
+            tokens_per_minute=settings.openai_tokens_per_minute,
+            image_requests_per_minute=settings.openai_image_requests_per_minute,
+        )
+        # Outside the rate limiter, so a hedge waits for capacity as well
+        _client = httpx.Client(
+            transport=ResilientTransport(UPSTREAM, RateLimitedTransport(scheduler)),
+            timeout=DEFAULT_TIMEOUT,
+        )
+    return _client
+
+
+def close_shared_openai_http_client() -> None:
+    """Close the shared client. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,230 @@
+"""Token-bucket scheduling of OpenAI requests against rate limits."""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Order in which queued requests get capacity; lower goes first."""
+    INTERACTIVE = 0  # A user is waiting on this response (coach turns)
+    NORMAL = 1
+    BACKGROUND = 2  # Speculative work (precompute, pre-generation)
+
+
+_priority: ContextVar[Priority] = ContextVar("openai_request_priority", default=Priority.NORMAL)
+
+
+def current_priority() -> Priority:
+    """Priority of OpenAI requests made from the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Run OpenAI requests in this block at `priority`.
+
+    The priority is a context variable, so it follows `asyncio.to_thread`
+    into worker threads.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+async def in_background(awaitable: Awaitable[T]) -> T:
+    """Await `awaitable` with background priority, e.g. inside a spawned task."""
+    with request_priority(Priority.BACKGROUND):
+        return await awaitable
+
+
+class TokenBucket:
+    """
+    Capacity that refills continuously to `capacity` over `period` seconds.
+
+    Not thread-safe; the scheduler guards it with its lock.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.period = period
+        self.level = capacity
+        self.blocked_until = 0.0
+        self._updated: Optional[float] = None
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken; 0 if it can be taken now."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def observe(self, limit: float, remaining: float, now: float) -> None:
+        """Adopt the limit and remaining capacity reported by the provider."""
+        self._refill(now)
+        if limit > 0:
+            self.capacity = limit
+        self.level = min(self.level, remaining, self.capacity)
+
+    def block(self, seconds: float, now: float) -> None:
+        """Hand out nothing for `seconds`, e.g. after a 429."""
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class ModelLimits:
+    """Request and token buckets of one model, with its queue of waiters."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float]):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.waiters: List[Tuple[int, int]] = []
+
+    def wait_time(self, tokens: float, now: float) -> float:
+        wait = self.requests.wait_time(1, now)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def take(self, tokens: float, now: float) -> None:
+        self.requests.take(1, now)
+        if self.tokens is not None:
+            self.tokens.take(tokens, now)
+
+
+class RateLimitTimeout(Exception):
+    """No capacity became available within the queue timeout."""
+
+
+class RateLimitScheduler:
+    """
+    Admit OpenAI requests at the rate the provider allows.
+
+    Every model has a requests-per-minute bucket and, for chat models, a
+    tokens-per-minute bucket. A request reserves one request and its
+    estimated tokens before it is sent; when there is no capacity it waits
+    in a per-model queue ordered by `Priority`, then arrival. Buckets start
+    from the configured defaults and follow the `x-ratelimit-*` headers of
+    every response. Thread-safe: OpenAI calls run in worker threads.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 30_000,
+        image_requests_per_minute: float = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.image_requests_per_minute = image_requests_per_minute
+        self.clock = clock
+        self._models: Dict[str, ModelLimits] = {}
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+
+    def _limits(self, model: str) -> ModelLimits:
+        limits = self._models.get(model)
+        if limits is None:
+            if model.startswith("dall-e") or model.startswith("gpt-image"):
+                limits = ModelLimits(self.image_requests_per_minute, None)
+            else:
+                limits = ModelLimits(self.requests_per_minute, self.tokens_per_minute)
+            self._models[model] = limits
+        return limits
+
+    def acquire(
+        self,
+        model: str,
+        tokens: float = 0,
+        priority: Priority = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Block until a request with `tokens` estimated tokens may be sent.
+
+        Raises RateLimitTimeout if that takes longer than `timeout` seconds.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            limits = self._limits(model)
+            ticket = (int(priority), next(self._sequence))
+            heapq.heappush(limits.waiters, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    wait = None
+                    if limits.waiters[0] == ticket:
+                        wait = limits.wait_time(tokens, now)
+                        if wait == 0:
+                            limits.take(tokens, now)
+                            heapq.heappop(limits.waiters)
+                            return
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"No {model} capacity within {timeout}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+            except BaseException:
+                if ticket in limits.waiters:
+                    limits.waiters.remove(ticket)
+                    heapq.heapify(limits.waiters)
+                raise
+            finally:
+                # The next waiter may now be at the head of the queue
+                self._condition.notify_all()
+
+    def observe(
+        self,
+        model: str,
+        requests: Optional[Tuple[float, float]] = None,
+        tokens: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        """Record (limit, remaining) pairs reported by the provider."""
+        with self._condition:
+            limits = self._limits(model)
+            now = self.clock()
+            if requests is not None:
+                limits.requests.observe(*requests, now)
+            if tokens is not None and limits.tokens is not None:
+                limits.tokens.observe(*tokens, now)
+            self._condition.notify_all()
+
+    def block(self, model: str, seconds: float) -> None:
+        """Pause all requests to `model` for `seconds`."""
+        with self._condition:
+            limits = self._limits(model)
+            now = self.clock()
+            limits.requests.block(seconds, now)
+            if limits.tokens is not None:
+                limits.tokens.block(seconds, now)
+            self._condition.notify_all()
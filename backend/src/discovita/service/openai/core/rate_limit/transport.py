@@ -0,0 +1,169 @@
+"""httpx transport that routes OpenAI requests through the rate limit scheduler."""
+
+import json
+import logging
+import random
+import re
+import time
+from typing import Callable, Optional, Tuple
+
+import httpx
+
+from .scheduler import RateLimitScheduler, RateLimitTimeout, current_priority
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size: OpenAI's rule of thumb is four characters per token
+CHARS_PER_TOKEN = 4
+# Reserved for an image in a vision prompt (a high-detail 1024px image)
+IMAGE_INPUT_TOKENS = 765
+# Completion size assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1024
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in an OpenAI reset header such as `6m0s`, `1.5s` or `20ms`."""
+    parts = _DURATION.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _limit_pair(headers: httpx.Headers, kind: str) -> Optional[Tuple[float, float]]:
+    try:
+        return (
+            float(headers[f"x-ratelimit-limit-{kind}"]),
+            float(headers[f"x-ratelimit-remaining-{kind}"]),
+        )
+    except (KeyError, ValueError):
+        return None
+
+
+def retry_delay(headers: httpx.Headers) -> Optional[float]:
+    """Server-suggested wait before retrying, in seconds."""
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    resets = [
+        parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+        for kind in ("requests", "tokens")
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def estimate_request(request: httpx.Request) -> Tuple[str, float]:
+    """The model a request is for and the tokens it may use."""
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+
+    if "/images/" in request.url.path:
+        return body.get("model") or "dall-e-2", 0
+
+    prompt_tokens = 0
+    for message in body.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            prompt_tokens += len(content) / CHARS_PER_TOKEN
+        elif isinstance(content, list):
+            for part in content:
+                if not isinstance(part, dict):
+                    continue
+                if part.get("type") == "image_url":
+                    prompt_tokens += IMAGE_INPUT_TOKENS
+                else:
+                    prompt_tokens += len(str(part.get("text", ""))) / CHARS_PER_TOKEN
+
+    completion_tokens = (
+        body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    )
+    return body.get("model") or "unknown", prompt_tokens + completion_tokens * (body.get("n") or 1)
+
+
+def _is_quota_error(response: httpx.Response) -> bool:
+    """A 429 for an exhausted quota, which waiting does not fix."""
+    return b"insufficient_quota" in response.content
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    Send OpenAI requests only when the scheduler admits them.
+
+    Each request first reserves its estimated tokens with the scheduler at
+    the priority of the calling context. The `x-ratelimit-*` headers of
+    every response update the scheduler's buckets. A 429 pauses the model
+    for the time the server asks for and the request is retried with
+    jittered exponential backoff, so concurrent callers do not retry in
+    lockstep. Use with `max_retries=0` on the OpenAI client.
+    """
+
+    def __init__(
+        self,
+        scheduler: RateLimitScheduler,
+        transport: Optional[httpx.BaseTransport] = None,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        queue_timeout: Optional[float] = 120.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.scheduler = scheduler
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue_timeout = queue_timeout
+        self.sleep = sleep
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = estimate_request(request)
+        priority = current_priority()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.scheduler.acquire(model, tokens, priority, timeout=self.queue_timeout)
+            except RateLimitTimeout as e:
+                raise httpx.PoolTimeout(str(e), request=request) from e
+
+            response = self.transport.handle_request(request)
+            self.scheduler.observe(
+                model,
+                requests=_limit_pair(response.headers, "requests"),
+                tokens=_limit_pair(response.headers, "tokens"),
+            )
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            response.read()
+            if _is_quota_error(response):
+                return response
+            response.close()
+
+            server_delay = retry_delay(response.headers)
+            if server_delay:
+                self.scheduler.block(model, server_delay)
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            logger.warning(
+                "OpenAI rate limit hit for %s (attempt %d), retrying in %.1fs",
+                model, attempt + 1, (server_delay or 0) + delay,
+            )
+            self.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self.transport.close()
@@ -0,0 +1,11 @@
+"""Identity image pipeline module initialization."""
+
+from .models import PipelineError, PipelineEvent, PipelineStep
+from .pipeline import IdentityImagePipeline
+
+__all__ = [
+    "IdentityImagePipeline",
+    "PipelineError",
+    "PipelineEvent",
+    "PipelineStep",
+]
@@ -0,0 +1,41 @@
+"""Models for the identity image pipeline."""
+
+from enum import Enum
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+
+class PipelineStep(str, Enum):
+    """Steps of the identity image pipeline."""
+    LIBRARY = "library"
+    DESCRIBE = "describe"
+    LANDMARKS = "landmarks"
+    GENERATE = "generate"
+    MIRROR = "mirror"
+    SWAP = "swap"
+
+
+class PipelineEvent(BaseModel):
+    """
+    Progress event of a pipeline run.
+
+    `event` is `step` (a step started or finished), `swap` (face swap job
+    status), `result` (final images) or `error` (the run failed).
+    """
+    event: str
+    data: Dict[str, Any]
+
+    @classmethod
+    def step(cls, step: PipelineStep, status: str, **data: Any) -> "PipelineEvent":
+        """Event for a step changing status."""
+        return cls(event="step", data={"step": step.value, "status": status, **data})
+
+
+class PipelineError(Exception):
+    """A pipeline step failed."""
+    def __init__(self, step: PipelineStep, status_code: int, detail: str):
+        self.step = step
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"Pipeline step {step.value} failed: {detail}")
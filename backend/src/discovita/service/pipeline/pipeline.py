@@ -0,0 +1,235 @@
+"""Server-side identity image pipeline: describe, generate, mirror, swap."""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Tuple
+
+from httpx import HTTPError
+from pydantic import AnyHttpUrl
+
+from .models import PipelineError, PipelineEvent, PipelineStep
+from ..assets import AssetError, AssetMirror
+from ..icons8.icons8_service import Icons8Service
+from ..icons8.models import Icons8Error, ImageFaces
+from ..openai.core.image_description import ImageDescriptionService
+from ..openai.core.image_generation import ImageGenerationService
+from ..openai.models.image_models import GeneratedImage
+from ..scenes import SceneLibrary, SceneMatch
+from ...models import IdentityImageRequest
+from ...utils.content_hash import ContentHasher
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[Optional[PipelineEvent]], None]
+
+
+class IdentityImagePipeline:
+    """
+    Turn a headshot and a scene request into a face-swapped identity image.
+
+    The steps form a small DAG:
+
+        describe -> generate -> mirror -> swap
+        landmarks (of the headshot) ---->/
+
+    The headshot's face landmarks are looked up while the scene is being
+    described and generated, so a headshot without a face fails the run
+    early and the swap does not have to detect its face again. Descriptions
+    and landmarks come from the content-hash caches when the headshot was
+    uploaded with `precompute=true`. The generated image is mirrored to the
+    asset store before the swap because DALL-E URLs expire after an hour.
+
+    When a precomputed library scene matches the request closely, describe,
+    generate and mirror are skipped and the headshot is swapped onto the
+    library scene, whose landmarks are already known.
+    """
+
+    def __init__(
+        self,
+        description_service: ImageDescriptionService,
+        generation_service: ImageGenerationService,
+        icons8_service: Icons8Service,
+        mirror: AssetMirror,
+        hasher: Optional[ContentHasher] = None,
+        library: Optional[SceneLibrary] = None,
+    ):
+        self.description_service = description_service
+        self.generation_service = generation_service
+        self.icons8_service = icons8_service
+        self.mirror = mirror
+        self.hasher = hasher
+        self.library = library
+
+    async def run(self, request: IdentityImageRequest) -> AsyncIterator[PipelineEvent]:
+        """
+        Run the pipeline, yielding progress events.
+
+        The last event is either `result` or `error`. Closing the iterator
+        early (e.g. the client disconnected) cancels the run.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self._run(request, events.put_nowait))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self, request: IdentityImageRequest, emit: Emit) -> None:
+        try:
+            emit(await self._execute(request, emit))
+        except PipelineError as e:
+            emit(PipelineEvent(
+                event="error",
+                data={"step": e.step.value, "status_code": e.status_code, "detail": e.detail},
+            ))
+        except Exception as e:
+            logger.exception("Identity image pipeline failed")
+            emit(PipelineEvent(event="error", data={"status_code": 500, "detail": str(e)}))
+        finally:
+            emit(None)
+
+    async def _execute(self, request: IdentityImageRequest, emit: Emit) -> PipelineEvent:
+        match = self._match_library(request)
+        if match is not None:
+            return await self._execute_from_library(request, match, emit)
+
+        landmarks = asyncio.create_task(self._find_faces(request.headshot_url, emit))
+        scene = asyncio.create_task(self._create_scene(request, emit))
+        try:
+            _, (description, image, scene_url) = await asyncio.gather(landmarks, scene)
+        except BaseException:
+            landmarks.cancel()
+            scene.cancel()
+            raise
+
+        swapped_url = await self._swap(request.headshot_url, scene_url, emit)
+        return PipelineEvent(event="result", data={
+            "url": swapped_url,
+            "sceneUrl": scene_url,
+            "description": description,
+            "augmentedPrompt": image.revised_prompt,
+            "librarySceneId": None,
+        })
+
+    def _match_library(self, request: IdentityImageRequest) -> Optional[SceneMatch]:
+        """
+        A library scene for the request.
+
+        Library scenes show a generic person, so requests that describe the
+        user's appearance are always generated, as are refinements.
+        """
+        if (
+            self.library is None
+            or not request.useLibrary
+            or request.userFeedback
+            or request.userDescription
+        ):
+            return None
+        return self.library.match(request.setting, request.outfit, request.emotion)
+
+    async def _execute_from_library(
+        self, request: IdentityImageRequest, match: SceneMatch, emit: Emit
+    ) -> PipelineEvent:
+        scene = match.scene
+        self.library.prime(scene)
+        emit(PipelineEvent.step(
+            PipelineStep.LIBRARY, "done",
+            sceneId=scene.id, score=round(match.score, 3), url=scene.url,
+        ))
+
+        await self._find_faces(request.headshot_url, emit)
+        swapped_url = await self._swap(request.headshot_url, scene.url, emit)
+        return PipelineEvent(event="result", data={
+            "url": swapped_url,
+            "sceneUrl": scene.url,
+            "description": None,
+            "augmentedPrompt": scene.prompt,
+            "librarySceneId": scene.id,
+        })
+
+    @asynccontextmanager
+    async def _step(self, step: PipelineStep, emit: Emit) -> AsyncIterator[None]:
+        """Announce a step and map upstream failures to PipelineError."""
+        emit(PipelineEvent.step(step, "started"))
+        try:
+            yield
+        except (Icons8Error, AssetError) as e:
+            raise PipelineError(step, e.status_code, e.detail) from e
+        except HTTPError as e:
+            raise PipelineError(step, 502, f"Upstream request failed: {e}") from e
+
+    async def _find_faces(self, headshot_url: AnyHttpUrl, emit: Emit) -> ImageFaces:
+        async with self._step(PipelineStep.LANDMARKS, emit):
+            faces = await self.icons8_service.get_image_faces(headshot_url)
+            if not faces.faces:
+                raise PipelineError(PipelineStep.LANDMARKS, 422, "No faces detected in headshot")
+            emit(PipelineEvent.step(PipelineStep.LANDMARKS, "done", faces=len(faces.faces)))
+        return faces
+
+    async def _create_scene(
+        self, request: IdentityImageRequest, emit: Emit
+    ) -> Tuple[str, GeneratedImage, str]:
+        description = await self._describe(request, emit)
+        image = await self._generate(request, description, emit)
+        scene_url = await self._mirror(image.url, emit)
+        return description, image, scene_url
+
+    async def _describe(self, request: IdentityImageRequest, emit: Emit) -> str:
+        if request.userDescription:
+            return request.userDescription
+
+        async with self._step(PipelineStep.DESCRIBE, emit):
+            description = await self.description_service.get_clean_description(
+                request.headshot_url
+            )
+            emit(PipelineEvent.step(PipelineStep.DESCRIBE, "done", description=description))
+        return description
+
+    async def _generate(
+        self, request: IdentityImageRequest, description: str, emit: Emit
+    ) -> GeneratedImage:
+        async with self._step(PipelineStep.GENERATE, emit):
+            response = await self.generation_service.safe_generate_scene_async(
+                setting=request.setting,
+                outfit=request.outfit,
+                emotion=request.emotion,
+                user_description=description,
+                user_feedback=request.userFeedback,
+                previous_augmented_prompt=request.previousAugmentedPrompt,
+                mode=request.mode,
+            )
+            if not response.success:
+                status_code = 422 if response.safety_violation else 500
+                raise PipelineError(PipelineStep.GENERATE, status_code, response.error or "Generation failed")
+            image = response.data.data[0]
+            emit(PipelineEvent.step(
+                PipelineStep.GENERATE, "done", augmentedPrompt=image.revised_prompt
+            ))
+        return image
+
+    async def _mirror(self, url: str, emit: Emit) -> str:
+        async with self._step(PipelineStep.MIRROR, emit):
+            asset = await self.mirror.mirror(url)
+            if self.hasher is not None:
+                self.hasher.remember(asset.url, asset.sha256)
+            emit(PipelineEvent.step(PipelineStep.MIRROR, "done", url=asset.url))
+        return asset.url
+
+    async def _swap(self, headshot_url: AnyHttpUrl, scene_url: str, emit: Emit) -> str:
+        async with self._step(PipelineStep.SWAP, emit):
+            result = await self.icons8_service.run_swap(
+                headshot_url,
+                scene_url,
+                on_update=lambda update: emit(
+                    PipelineEvent(event="swap", data=update.to_frontend_response())
+                ),
+            )
+            url = str(result.processed.url)
+            emit(PipelineEvent.step(PipelineStep.SWAP, "done", url=url))
+        return url
@@ -1,6 +1,14 @@
 """S3 module initialization."""
 
-from .models import FileUploadRequest
-from .service import S3Service
+from .models import FileUploadRequest, PresignedUpload, S3UploadError, UploadResult
+from .service import S3Service, close_shared_s3_service, get_shared_s3_service
 
-__all__ = ["FileUploadRequest", "S3Service"]
+__all__ = [
+    "FileUploadRequest",
+    "PresignedUpload",
+    "S3UploadError",
+    "S3Service",
+    "UploadResult",
+    "close_shared_s3_service",
+    "get_shared_s3_service",
+]
@@ -1,5 +1,7 @@
 """Models for S3 operations."""
 
+from typing import Dict
+
 from pydantic import BaseModel
 
 class FileUploadRequest(BaseModel):
@@ -7,3 +9,25 @@ class FileUploadRequest(BaseModel):
     filename: str
     content_type: str
     content: bytes
+
+class UploadResult(BaseModel):
+    """Result of storing a file in S3."""
+    url: str
+    key: str
+    sha256: str
+    deduplicated: bool = False
+
+class PresignedUpload(BaseModel):
+    """Presigned POST that lets a client upload straight to S3."""
+    url: str
+    fields: Dict[str, str]
+    key: str
+    expires_in: int
+    max_bytes: int
+
+class S3UploadError(Exception):
+    """Upload rejected or not found."""
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"S3 upload error: {detail}")
@@ -1,16 +1,54 @@
 """S3 service implementation."""
 
+import hashlib
+import io
+import logging
+import threading
 import uuid
 from pathlib import Path
+from typing import BinaryIO, NoReturn, Optional
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
 from botocore.config import Config
-from .models import FileUploadRequest
+from botocore.exceptions import ClientError
+from .models import FileUploadRequest, PresignedUpload, S3UploadError, UploadResult
+from ..imaging.sniff import SNIFF_BYTES, sniff_image_type
 from ...config import Settings
+from ...utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+HASH_CHUNK_SIZE = 1 * MB
+
+# Direct uploads are staged under their own prefix so completion can only
+# be requested for objects created through a presigned POST. Completion
+# moves them to their content-addressed key.
+DIRECT_UPLOAD_PREFIX = "uploads/direct/"
+DIRECT_UPLOAD_DIGEST_FIELD = "x-amz-meta-sha256"
+DIRECT_UPLOAD_MAX_BYTES = 20 * MB
+PRESIGNED_UPLOAD_EXPIRES_IN = 15 * 60
+
+# Files above the threshold are sent as a multipart upload. Parts are read
+# from the file as they are sent, so at most `max_concurrency` parts are
+# held in memory; smaller files are streamed straight from the file object.
+DEFAULT_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * MB,
+    multipart_chunksize=8 * MB,
+    max_concurrency=4,
+)
+# Not exposed by boto3's constructor; s3transfer defaults to 10 parts.
+DEFAULT_TRANSFER_CONFIG.max_in_memory_upload_chunks = DEFAULT_TRANSFER_CONFIG.max_concurrency
 
 class S3Service:
     """Service for S3 operations."""
     
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        transfer_config: TransferConfig = DEFAULT_TRANSFER_CONFIG,
+        known_keys_max_entries: int = 10_000,
+    ) -> None:
         self.client = boto3.client(
             's3',
             aws_access_key_id=settings.aws_access_key_id,
@@ -19,23 +57,235 @@ class S3Service:
         )
         self.bucket = settings.s3_bucket
         self.region = settings.aws_region
+        self.transfer_config = transfer_config
+        # One transfer manager (and its thread pool) for all uploads
+        self.transfer_manager = create_transfer_manager(self.client, transfer_config)
+        # Keys known to exist in the bucket, so repeat uploads skip the HEAD
+        self._known_keys: TTLCache[str, bool] = TTLCache(max_entries=known_keys_max_entries)
+        self._known_keys_lock = threading.Lock()
+
+    @staticmethod
+    def _hash_fileobj(fileobj: BinaryIO) -> str:
+        """SHA-256 of the rest of the file, read in chunks; the position is restored."""
+        start = fileobj.tell()
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+        fileobj.seek(start)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _content_key(digest: str, original_filename: str) -> str:
+        """Content-addressed key: identical bytes always map to the same key."""
+        extension = Path(original_filename).suffix.lower()
+        return f"uploads/{digest}{extension}"
 
-    def _generate_unique_filename(self, original_filename: str) -> str:
-        """Generate a unique filename while preserving the original extension."""
-        extension = Path(original_filename).suffix
-        random_name = str(uuid.uuid4())
-        return f"{random_name}{extension}"
+    def _object_exists(self, key: str) -> bool:
+        with self._known_keys_lock:
+            if key in self._known_keys:
+                return True
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if not _is_not_found(e):
+                # Without s3:ListBucket, HEAD on a missing key is a 403, so
+                # any other error only means the key is not known to exist
+                logger.warning("Could not check for s3://%s/%s: %s", self.bucket, key, e)
+            return False
+        self._remember_key(key)
+        return True
+
+    def _remember_key(self, key: str) -> None:
+        with self._known_keys_lock:
+            self._known_keys.set(key, True)
+
+    def _public_url(self, key: str) -> str:
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
 
     def upload(self, request: FileUploadRequest) -> str:
-        """Upload a file to S3 and return its public URL."""
-        unique_filename = self._generate_unique_filename(request.filename)
-        key = f"uploads/{unique_filename}"
-        
-        self.client.put_object(
+        """Upload in-memory file content to S3 and return its public URL."""
+        return self.upload_fileobj(
+            io.BytesIO(request.content), request.filename, request.content_type
+        ).url
+
+    def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: str,
+        sha256: Optional[str] = None,
+    ) -> UploadResult:
+        """
+        Stream a seekable file object to S3 under a content-addressed key.
+
+        The file is hashed in chunks, then uploaded as `uploads/<sha256><ext>`
+        unless that object already exists, so re-uploading the same bytes
+        returns the same URL without a second PUT. Callers that hashed the
+        bytes while writing the file pass `sha256` to skip the second pass.
+        The file is never loaded into memory as a whole; large files use a
+        multipart upload. This call blocks, so async handlers should run it
+        in a thread pool.
+        """
+        digest = sha256.lower() if sha256 else self._hash_fileobj(fileobj)
+        key = self._content_key(digest, filename)
+
+        if self._object_exists(key):
+            return UploadResult(
+                url=self._public_url(key), key=key, sha256=digest, deduplicated=True
+            )
+
+        future = self.transfer_manager.upload(
+            fileobj, self.bucket, key, extra_args={"ContentType": content_type}
+        )
+        future.result()
+        self._remember_key(key)
+
+        return UploadResult(url=self._public_url(key), key=key, sha256=digest)
+
+    def find_existing_upload(self, digest: str, filename: str) -> Optional[str]:
+        """Public URL of content that was already uploaded, if any."""
+        key = self._content_key(digest.lower(), filename)
+        return self._public_url(key) if self._object_exists(key) else None
+
+    def create_presigned_upload(
+        self,
+        filename: str,
+        content_type: str,
+        digest: Optional[str] = None,
+        max_bytes: int = DIRECT_UPLOAD_MAX_BYTES,
+        expires_in: int = PRESIGNED_UPLOAD_EXPIRES_IN,
+    ) -> PresignedUpload:
+        """
+        Create a presigned POST for uploading one image straight to S3.
+
+        The policy pins the key and Content-Type and limits the size to
+        `max_bytes`, so S3 itself rejects anything else. A declared SHA-256
+        `digest` is pinned as object metadata and checked on completion.
+        After uploading, the client calls `complete_presigned_upload` with
+        the key.
+        """
+        if not content_type.startswith("image/"):
+            raise S3UploadError(status_code=415, detail="Only image uploads are supported")
+
+        extension = Path(filename).suffix.lower()
+        key = f"{DIRECT_UPLOAD_PREFIX}{uuid.uuid4()}{extension}"
+        fields = {"Content-Type": content_type}
+        if digest:
+            fields[DIRECT_UPLOAD_DIGEST_FIELD] = digest.lower()
+        presigned = self.client.generate_presigned_post(
             Bucket=self.bucket,
             Key=key,
-            Body=request.content,
-            ContentType=request.content_type
+            Fields=fields,
+            Conditions=[
+                *({name: value} for name, value in fields.items()),
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_in,
         )
-        
-        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+        return PresignedUpload(
+            url=presigned["url"],
+            fields=presigned["fields"],
+            key=key,
+            expires_in=expires_in,
+            max_bytes=max_bytes,
+        )
+
+    def complete_presigned_upload(
+        self, key: str, max_bytes: int = DIRECT_UPLOAD_MAX_BYTES
+    ) -> UploadResult:
+        """
+        Check an object uploaded with a presigned POST and store it by content.
+
+        The object must be at most `max_bytes`, start with the magic bytes
+        of a supported image, and match the SHA-256 declared for it, if
+        any; otherwise it is deleted. It is then moved to its
+        content-addressed key, the same `uploads/<sha256><ext>` that
+        `upload_fileobj` uses, so `find_existing_upload` finds it.
+        """
+        if not key.startswith(DIRECT_UPLOAD_PREFIX) or "/" in key[len(DIRECT_UPLOAD_PREFIX):]:
+            raise S3UploadError(status_code=400, detail="Not a direct upload key")
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise S3UploadError(status_code=404, detail="Upload not found")
+            raise
+
+        if head["ContentLength"] > max_bytes:
+            self._reject(key, 413, "Uploaded file is too large")
+
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        sha256 = hashlib.sha256()
+        try:
+            header = body.read(SNIFF_BYTES)
+            content_type = sniff_image_type(header)
+            if content_type is None:
+                self._reject(key, 415, "Only image uploads are supported")
+            sha256.update(header)
+            for chunk in body.iter_chunks(HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        finally:
+            body.close()
+        digest = sha256.hexdigest()
+
+        declared = head.get("Metadata", {}).get("sha256")
+        if declared is not None and declared != digest:
+            self._reject(key, 422, "Uploaded file does not match its SHA-256")
+
+        content_key = self._content_key(digest, key)
+        deduplicated = self._object_exists(content_key)
+        if not deduplicated:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=content_key,
+                CopySource={"Bucket": self.bucket, "Key": key},
+                ContentType=content_type,
+                MetadataDirective="REPLACE",
+            )
+            self._remember_key(content_key)
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+        return UploadResult(
+            url=self._public_url(content_key),
+            key=content_key,
+            sha256=digest,
+            deduplicated=deduplicated,
+        )
+
+    def _reject(self, key: str, status_code: int, detail: str) -> NoReturn:
+        """Delete a direct upload that failed its checks."""
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        raise S3UploadError(status_code=status_code, detail=detail)
+
+    def close(self) -> None:
+        """Wait for pending uploads and stop the transfer threads."""
+        self.transfer_manager.shutdown()
+
+
+def _is_not_found(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+_shared_service: Optional[S3Service] = None
+
+
+def get_shared_s3_service(settings: Settings) -> S3Service:
+    """
+    Return the process-wide S3 service, creating it on first use.
+
+    boto3 clients are thread-safe and keep a connection pool, so every
+    request can share one client and transfer manager.
+    """
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = S3Service(settings)
+    return _shared_service
+
+
+def close_shared_s3_service() -> None:
+    """Shut down the shared S3 service, if it was created."""
+    global _shared_service
+    if _shared_service is not None:
+        _shared_service.close()
+        _shared_service = None
@@ -0,0 +1,18 @@
+"""Scene library module initialization."""
+
+from .builder import SceneBuildError, SceneLibraryBuilder
+from .index import SceneIndex
+from .library import SceneLibrary, get_shared_scene_library
+from .models import LibraryScene, SceneCombination, SceneLibraryManifest, SceneMatch
+
+__all__ = [
+    "LibraryScene",
+    "SceneBuildError",
+    "SceneCombination",
+    "SceneIndex",
+    "SceneLibrary",
+    "SceneLibraryBuilder",
+    "SceneLibraryManifest",
+    "SceneMatch",
+    "get_shared_scene_library",
+]
@@ -0,0 +1,87 @@
+"""Offline generation of library scenes."""
+
+import asyncio
+import logging
+from typing import Iterable, List
+
+from .models import LibraryScene, SceneCombination
+from ..assets import AssetMirror
+from ..icons8.icons8_service import Icons8Service
+from ..openai.core.image_generation import ImageGenerationService
+from ...models import RenderMode
+
+logger = logging.getLogger(__name__)
+
+
+class SceneBuildError(Exception):
+    """A library scene could not be built."""
+    def __init__(self, combination: SceneCombination, detail: str):
+        self.combination = combination
+        self.detail = detail
+        super().__init__(
+            f"{combination.setting} / {combination.outfit} / {combination.emotion}: {detail}"
+        )
+
+
+class SceneLibraryBuilder:
+    """
+    Render, store and analyze scenes for the library.
+
+    Each scene is generated in HD without a user description, mirrored to
+    the asset store and run through Icons8 face detection. Scenes without a
+    detectable face cannot be swapped onto and are rejected. Generation runs
+    concurrently under the generation service's slots.
+    """
+
+    def __init__(
+        self,
+        generation_service: ImageGenerationService,
+        icons8_service: Icons8Service,
+        mirror: AssetMirror,
+    ):
+        self.generation_service = generation_service
+        self.icons8_service = icons8_service
+        self.mirror = mirror
+
+    async def build_scene(self, combination: SceneCombination) -> LibraryScene:
+        """Build one library scene. Raises SceneBuildError."""
+        response = await self.generation_service.safe_generate_scene_async(
+            setting=combination.setting,
+            outfit=combination.outfit,
+            emotion=combination.emotion,
+            mode=RenderMode.FINAL,
+        )
+        if not response.success:
+            raise SceneBuildError(combination, response.error or "Generation failed")
+        image = response.data.data[0]
+
+        asset = await self.mirror.mirror(image.url)
+        faces = await self.icons8_service.get_image_faces(asset.url)
+        if not faces.faces:
+            raise SceneBuildError(combination, "No faces detected in scene")
+
+        return LibraryScene(
+            id=asset.sha256[:16],
+            setting=combination.setting,
+            outfit=combination.outfit,
+            emotion=combination.emotion,
+            url=asset.url,
+            sha256=asset.sha256,
+            prompt=image.revised_prompt,
+            faces=faces,
+        )
+
+    async def build(self, combinations: Iterable[SceneCombination]) -> List[LibraryScene]:
+        """Build scenes for all combinations, skipping (and logging) failures."""
+        combinations = list(combinations)
+        results = await asyncio.gather(
+            *(self.build_scene(combination) for combination in combinations),
+            return_exceptions=True,
+        )
+        scenes = []
+        for combination, result in zip(combinations, results):
+            if isinstance(result, BaseException):
+                logger.warning("Skipping library scene %s: %s", combination, result)
+            else:
+                scenes.append(result)
+        return scenes
@@ -0,0 +1,116 @@
+"""Attribute and lexical index over library scenes."""
+
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .models import LibraryScene, SceneMatch
+
+# How much each attribute counts towards the similarity score
+FIELD_WEIGHTS = {"setting": 0.5, "outfit": 0.3, "emotion": 0.2}
+# Similarity each attribute needs on its own before the scene is scored, so
+# a close setting and outfit cannot make up for a different emotion
+FIELD_MIN_SIMILARITY = {"setting": 0.25, "outfit": 0.5, "emotion": 0.5}
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "in", "on", "at", "of", "with", "and", "or", "to", "for",
+    "by", "from", "into", "wearing", "very", "some", "their", "his", "her",
+})
+
+Terms = FrozenSet[str]
+SceneKey = Tuple[Terms, Terms, Terms]
+
+
+def terms(text: str) -> Terms:
+    """Content words of an attribute, lowercased and roughly singularized."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words
+        if word not in STOPWORDS
+    )
+
+
+def similarity(a: Terms, b: Terms) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SceneIndex:
+    """
+    Find the library scene closest to a (setting, outfit, emotion) request.
+
+    Requests with the same content words as a scene match it exactly. Other
+    requests are scored against the scenes sharing at least one setting term
+    (found through an inverted index), by the weighted Jaccard similarity of
+    each attribute's terms. A scene is only scored if every attribute is at
+    least as similar as its `FIELD_MIN_SIMILARITY`.
+    """
+
+    def __init__(self, scenes: Iterable[LibraryScene] = ()):
+        self._scenes: List[LibraryScene] = []
+        self._keys: List[SceneKey] = []
+        self._exact: Dict[SceneKey, int] = {}
+        self._by_setting_term: Dict[str, Set[int]] = defaultdict(set)
+        for scene in scenes:
+            self.add(scene)
+
+    def __len__(self) -> int:
+        return len(self._scenes)
+
+    @property
+    def scenes(self) -> List[LibraryScene]:
+        """Indexed scenes in insertion order."""
+        return list(self._scenes)
+
+    def __contains__(self, key: SceneKey) -> bool:
+        return key in self._exact
+
+    def add(self, scene: LibraryScene) -> None:
+        """Index a scene. The first scene for a set of attributes wins."""
+        key = self.key(scene.setting, scene.outfit, scene.emotion)
+        if key in self._exact:
+            return
+        position = len(self._scenes)
+        self._scenes.append(scene)
+        self._keys.append(key)
+        self._exact[key] = position
+        for term in key[0]:
+            self._by_setting_term[term].add(position)
+
+    @staticmethod
+    def key(setting: str, outfit: str, emotion: str) -> SceneKey:
+        return (terms(setting), terms(outfit), terms(emotion))
+
+    def match(
+        self, setting: str, outfit: str, emotion: str, min_score: float
+    ) -> Optional[SceneMatch]:
+        """Best scene scoring at least `min_score`, or None."""
+        key = self.key(setting, outfit, emotion)
+        position = self._exact.get(key)
+        if position is not None:
+            return SceneMatch(self._scenes[position], 1.0)
+
+        candidates: Set[int] = set()
+        for term in key[0]:
+            candidates |= self._by_setting_term.get(term, set())
+
+        best: Optional[SceneMatch] = None
+        for position in candidates:
+            score = self._score(key, self._keys[position])
+            if score is not None and score >= min_score and (best is None or score > best.score):
+                best = SceneMatch(self._scenes[position], score)
+        return best
+
+    @staticmethod
+    def _score(request: SceneKey, scene: SceneKey) -> Optional[float]:
+        """Weighted similarity, or None if any attribute is below its minimum."""
+        score = 0.0
+        for field, request_terms, scene_terms in zip(FIELD_WEIGHTS, request, scene):
+            field_similarity = similarity(request_terms, scene_terms)
+            if field_similarity < FIELD_MIN_SIMILARITY[field]:
+                return None
+            score += FIELD_WEIGHTS[field] * field_similarity
+        return score
@@ -0,0 +1,107 @@
+"""Library of person-neutral scenes rendered ahead of time."""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .index import SceneIndex
+from .models import LibraryScene, SceneLibraryManifest, SceneMatch
+from ..icons8.cache import LandmarkCache, get_landmark_cache
+from ...config import Settings
+from ...utils.content_hash import ContentHasher, get_content_hasher
+
+logger = logging.getLogger(__name__)
+
+
+class SceneLibrary:
+    """
+    Precomputed scenes that can be served by a face swap alone.
+
+    Scenes are stored in the asset store together with their sha256 and
+    Icons8 face detection. `prime` seeds the content hasher and landmark
+    cache with them, so swapping onto a library scene neither downloads it
+    nor detects its face again.
+    """
+
+    def __init__(
+        self,
+        scenes: Iterable[LibraryScene] = (),
+        min_score: float = 0.75,
+        hasher: Optional[ContentHasher] = None,
+        landmark_cache: Optional[LandmarkCache] = None,
+    ):
+        self.index = SceneIndex(scenes)
+        self.min_score = min_score
+        self.hasher = hasher
+        self.landmark_cache = landmark_cache
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def scenes(self) -> List[LibraryScene]:
+        return self.index.scenes
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "SceneLibrary":
+        """Load a library manifest. A missing file gives an empty library."""
+        try:
+            manifest = SceneLibraryManifest.model_validate_json(Path(path).read_bytes())
+        except FileNotFoundError:
+            logger.warning("Scene library %s not found, starting empty", path)
+            return cls(**kwargs)
+        library = cls(manifest.scenes, **kwargs)
+        logger.info("Loaded %d library scenes from %s", len(library), path)
+        return library
+
+    @staticmethod
+    def save(scenes: List[LibraryScene], path: str) -> None:
+        """Write a library manifest atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        manifest = SceneLibraryManifest(scenes=scenes)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(manifest.model_dump_json(indent=2))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def match(self, setting: str, outfit: str, emotion: str) -> Optional[SceneMatch]:
+        """The closest library scene, if it is close enough to serve."""
+        return self.index.match(setting, outfit, emotion, self.min_score)
+
+    def prime(self, scene: LibraryScene) -> None:
+        """Make the scene's content hash and face detection known to the caches."""
+        if self.hasher is not None:
+            self.hasher.remember(scene.url, scene.sha256)
+        if self.landmark_cache is not None:
+            self.landmark_cache.set(scene.sha256, scene.faces)
+
+
+_library: Optional[SceneLibrary] = None
+
+
+def get_shared_scene_library(settings: Settings) -> SceneLibrary:
+    """
+    Process-wide scene library, loaded from `SCENE_LIBRARY_PATH` on first use.
+
+    Without a configured path the library is empty and every request is
+    generated.
+    """
+    global _library
+    if _library is None:
+        kwargs = dict(
+            min_score=settings.scene_library_min_score,
+            hasher=get_content_hasher(settings),
+            landmark_cache=get_landmark_cache(),
+        )
+        if settings.scene_library_path:
+            _library = SceneLibrary.load(settings.scene_library_path, **kwargs)
+        else:
+            _library = SceneLibrary(**kwargs)
+    return _library
@@ -0,0 +1,37 @@
+"""Models for the precomputed scene library."""
+
+from dataclasses import dataclass
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from ..icons8.models import ImageFaces
+
+
+class SceneCombination(BaseModel):
+    """Scene attributes a library scene is generated for."""
+    setting: str = Field(..., min_length=1)
+    outfit: str = Field(..., min_length=1)
+    emotion: str = Field(..., min_length=1)
+
+
+class LibraryScene(SceneCombination):
+    """A person-neutral scene rendered ahead of time."""
+    id: str
+    url: str  # Asset store URL, never a DALL-E URL
+    sha256: str
+    prompt: str  # DALL-E's revised prompt
+    faces: ImageFaces  # Icons8 face detection of the scene
+
+
+class SceneLibraryManifest(BaseModel):
+    """On-disk format of a scene library."""
+    version: int = 1
+    scenes: List[LibraryScene] = Field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class SceneMatch:
+    """A library scene matching a request, with its similarity score (0-1)."""
+    scene: LibraryScene
+    score: float
@@ -0,0 +1,59 @@
+"""Fire-and-forget background tasks."""
+
+import asyncio
+import logging
+from typing import Awaitable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskSet:
+    """
+    Bounded set of best-effort background tasks.
+
+    Tasks are referenced until they finish so they are not garbage collected
+    mid-flight, and their exceptions are logged instead of being lost. When
+    `max_tasks` are already running new work is dropped: background tasks
+    are speculative and must never queue up behind real requests.
+    """
+
+    def __init__(self, max_tasks: int = 100):
+        self.max_tasks = max_tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, coro: Awaitable, name: str) -> Optional[asyncio.Task]:
+        """Start `coro` in the background. Returns None if it was dropped."""
+        if len(self._tasks) >= self.max_tasks:
+            logger.warning("Dropping background task %s: %d tasks running", name, len(self._tasks))
+            coro.close()
+            return None
+
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        return task
+
+    async def aclose(self) -> None:
+        """Cancel all running tasks."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Background task %s failed: %r", task.get_name(), task.exception()
+            )
+
+
+_tasks = BackgroundTaskSet()
+
+
+def get_background_tasks() -> BackgroundTaskSet:
+    """Dependency for the process-wide background task set."""
+    return _tasks
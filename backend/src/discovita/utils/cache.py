@@ -0,0 +1,57 @@
+"""In-memory caches."""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        """Remove an entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
@@ -0,0 +1,108 @@
+"""Content hashing of remote files."""
+
+import hashlib
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from httpx import AsyncClient
+
+from .cache import TTLCache
+from .http import get_download_client
+from .singleflight import SingleFlight
+from ..config import Settings
+
+CHUNK_SIZE = 64 * 1024
+
+# Where DALL-E serves generated images
+OPENAI_IMAGE_HOSTS = ("oaidalleapiprodscus.blob.core.windows.net",)
+
+
+class ContentHashError(Exception):
+    """A URL the hasher will not download."""
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(f"Content hash error: {detail}")
+
+
+class ContentHasher:
+    """
+    Compute SHA-256 digests of files behind URLs.
+
+    The body is streamed and hashed chunk by chunk, never held in memory as a
+    whole. Digests are memoized per URL, and concurrent requests for the same
+    URL share a single download. URLs come from clients, so with
+    `allowed_hosts` only HTTPS URLs on those hosts are downloaded.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[AsyncClient] = None,
+        max_entries: int = 4096,
+        ttl: float = 24 * 60 * 60,
+        allowed_hosts: Optional[Iterable[str]] = None,
+    ):
+        self._http_client = http_client
+        self.allowed_hosts = frozenset(allowed_hosts) if allowed_hosts is not None else None
+        self._digests: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._in_flight: SingleFlight[str] = SingleFlight()
+
+    @property
+    def http_client(self) -> AsyncClient:
+        return self._http_client or get_download_client()
+
+    def remember(self, url: str, digest: str) -> None:
+        """Record a digest that is already known, e.g. for freshly uploaded files."""
+        self._digests.set(url, digest)
+
+    async def hash_url(self, url: str) -> str:
+        """
+        Return the hex SHA-256 digest of the content at `url`.
+
+        Raises ContentHashError for URLs that may not be downloaded, unless
+        their digest was remembered.
+        """
+        digest = self._digests.get(url)
+        if digest is not None:
+            return digest
+        self.validate(url)
+        return await self._in_flight.do(url, lambda: self._download_and_hash(url))
+
+    def validate(self, url: str) -> None:
+        """Raise ContentHashError unless `url` is on an allowed host."""
+        if self.allowed_hosts is None:
+            return
+        parts = urlsplit(url)
+        if parts.scheme != "https" or parts.hostname not in self.allowed_hosts:
+            raise ContentHashError(f"Host of {url} is not allowed")
+
+    async def _download_and_hash(self, url: str) -> str:
+        sha256 = hashlib.sha256()
+        # Only the first URL is validated, so redirects are never followed
+        async with self.http_client.stream("GET", url, follow_redirects=False) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        self._digests.set(url, digest)
+        return digest
+
+
+_hasher: Optional[ContentHasher] = None
+
+
+def get_content_hasher(settings: Settings) -> ContentHasher:
+    """
+    Return the process-wide content hasher, creating it on first use.
+
+    It downloads from the S3 bucket, DALL-E and `VARIANT_ALLOWED_HOSTS`.
+    """
+    global _hasher
+    if _hasher is None:
+        _hasher = ContentHasher(
+            allowed_hosts=(
+                settings.s3_bucket_host,
+                *OPENAI_IMAGE_HOSTS,
+                *settings.variant_allowed_hosts,
+            ),
+        )
+    return _hasher
@@ -0,0 +1,108 @@
+"""Size-capped LRU cache of files on local disk."""
+
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+_SAFE_KEY = re.compile(r"[0-9A-Za-z_-]+")
+
+
+class DiskLRUCache:
+    """
+    Cache of byte blobs stored as files in one directory.
+
+    When the total size exceeds `max_bytes`, the least recently used files
+    are deleted. The index is rebuilt from the directory on start-up, using
+    file modification times, which are refreshed on every hit. Writes are
+    atomic, so a crash never leaves a partial file behind. Thread-safe.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._sizes
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes, or None if missing."""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            self._sizes.move_to_end(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Store bytes under `key`, evicting least recently used files if over the cap."""
+        path = self._path(key)
+        tmp_path = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            evicted = self._evict_locked()
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        self._forget(key)
+        self._path(key).unlink(missing_ok=True)
+
+    def _path(self, key: str) -> Path:
+        if not _SAFE_KEY.fullmatch(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return self.directory / key
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _evict_locked(self) -> list:
+        evicted = []
+        # Always keep the newest entry, even if it alone exceeds the cap
+        while self._total_bytes > self.max_bytes and len(self._sizes) > 1:
+            old_key, size = self._sizes.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(old_key)
+        return evicted
+
+    def _load(self) -> None:
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)  # left over from an interrupted write
+            elif path.is_file() and _SAFE_KEY.fullmatch(path.name):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total_bytes += size
+        for old_key in self._evict_locked():
+            self._path(old_key).unlink(missing_ok=True)
@@ -0,0 +1,30 @@
+"""Shared HTTP client for downloading third-party content."""
+
+from typing import Optional
+from httpx import AsyncClient, Limits, Timeout
+
+_download_client: Optional[AsyncClient] = None
+
+def get_download_client() -> AsyncClient:
+    """
+    Get the process-wide client used to fetch images by URL.
+
+    Redirects are not followed: a redirect from an allowed host could
+    otherwise point a download at any other host.
+    """
+    global _download_client
+    if _download_client is None or _download_client.is_closed:
+        _download_client = AsyncClient(
+            http2=True,
+            follow_redirects=False,
+            limits=Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=Timeout(30.0, connect=10.0)
+        )
+    return _download_client
+
+async def close_download_client() -> None:
+    """Close the shared download client. Called on application shutdown."""
+    global _download_client
+    if _download_client is not None:
+        await _download_client.aclose()
+        _download_client = None
@@ -3,7 +3,8 @@ Logger module with custom log levels and formatting.
 
 This module provides colored console output with automatic context information,
 optional file logging, and custom log levels (FINE, SUCCESS, STEP) in addition 
-to standard Python logging levels.
+to standard Python logging levels. It also provides the application's
+queue-based logging pipeline.
 """
 
 from .logger import (
@@ -15,6 +16,8 @@ from .logger import (
     ConsoleFormatter,
     LogFileFormatter,
 )
+from .pipeline import JsonLinesFormatter, configure_app_logging
+from .queue import NonBlockingQueueHandler, start_queue_logging
 
 __all__ = [
     "configure_logging",
@@ -24,4 +27,8 @@ __all__ = [
     "CONTEXT_DISPLAY",
     "ConsoleFormatter",
     "LogFileFormatter",
+    "JsonLinesFormatter",
+    "configure_app_logging",
+    "NonBlockingQueueHandler",
+    "start_queue_logging",
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
-import inspect
+import ast
 import logging
 import os
+import re
 import shutil
+from functools import lru_cache
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
@@ -83,126 +85,90 @@ class ConsoleFormatter(logging.Formatter):
         logging.ERROR: "\x1b[31mERROR\x1b[0m:\t  %(message)s",  # Red Level
         logging.CRITICAL: "\x1b[31;1mCRITICAL\x1b[0m: %(message)s",  # Bold Red Level
     }
+    default_format = "%(levelname)s: %(message)s"
+    datefmt = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, context_display=None):
+        super().__init__()
+        self.context_display = (
+            CONTEXT_DISPLAY if context_display is None else context_display
+        )
+        # Build one Formatter per level up front instead of on every record
+        self.formatters = {
+            level: logging.Formatter(fmt, datefmt=self.datefmt)
+            for level, fmt in self.level_formats.items()
+        }
+        # Add a separator line before SUCCESS messages
+        self.formatters[SUCCESS_LEVEL] = logging.Formatter(
+            "\x1b[32m" + "─" * 80 + "\x1b[0m\n" + self.level_formats[SUCCESS_LEVEL],
+            datefmt=self.datefmt,
+        )
+        self.default_formatter = logging.Formatter(
+            self.default_format, datefmt=self.datefmt
+        )
+        try:
+            self.terminal_width = shutil.get_terminal_size().columns
+        except (AttributeError, ValueError):
+            self.terminal_width = 80  # Default if can't determine
 
     def get_context_info(self, record):
         """
-        Extract context information (file, class, function) for the log record.
+        Build context information (file, class, function) for the log record.
 
-        Returns formatted context string based on CONTEXT_DISPLAY setting.
+        Uses the caller location the logging module already stored on the
+        record; the class name is looked up from the source file's syntax
+        tree, which is parsed once per file.
+
+        Returns formatted context string based on the context display setting.
         """
         # Default - no context
-        if CONTEXT_DISPLAY == "none":
+        if self.context_display == "none":
             return ""
 
-        # Start with empty context parts
-        context_parts = []
-
-        # Get the calling frame
-        frame = inspect.currentframe()
-        # Go back through the call stack to find the actual logging call
-        # Skip logging internal functions
-        found_logging_call = False
-        while frame:
-            frame_info = inspect.getframeinfo(frame)
-            frame_name = frame_info.function
-            frame_module = frame_info.filename
-
-            # Skip logging module frames
-            if "logging" in frame_module and frame_name in (
-                "_log",
-                "debug",
-                "info",
-                "warning",
-                "error",
-                "critical",
-                "fine",
-                "step",
-                "success",
-            ):
-                found_logging_call = True
-            elif found_logging_call:
-                # This is likely the actual calling frame
-                break
-
-            frame = frame.f_back
-
-        if not frame:
-            return ""  # Couldn't determine context
-
-        # Extract context information from the frame
-        frame_info = inspect.getframeinfo(frame)
-        module_path = frame_info.filename
-        module_name = Path(module_path).name
-        function_name = frame_info.function
-        line_number = frame_info.lineno
-
-        # Try to determine class name if it's a method call
-        class_name = None
-        if "self" in frame.f_locals:
-            try:
-                class_name = frame.f_locals["self"].__class__.__name__
-            except (AttributeError, KeyError):
-                pass
+        module_name = record.filename
+        function_name = record.funcName
+        line_number = record.lineno
+        class_name = find_class_name(record.pathname, function_name, line_number)
 
         # Format context based on display setting
-        if CONTEXT_DISPLAY == "function":
+        context = ""
+        if self.context_display == "function":
             if function_name != "<module>":
-                context_parts.append(f"{function_name}()")
+                context = f"{function_name}()"
 
-        elif CONTEXT_DISPLAY == "class_function":
+        elif self.context_display == "class_function":
             if class_name:
-                context_parts.append(f"{class_name}.{function_name}()")
+                context = f"{class_name}.{function_name}()"
             elif function_name != "<module>":
-                context_parts.append(f"{function_name}()")
+                context = f"{function_name}()"
 
-        elif CONTEXT_DISPLAY == "full":
+        elif self.context_display == "full":
             if class_name:
-                context_parts.append(
-                    f"{class_name}.{function_name}() in {module_name}:{line_number}"
-                )
+                context = f"{class_name}.{function_name}() in {module_name}:{line_number}"
             elif function_name != "<module>":
-                context_parts.append(
-                    f"{function_name}() in {module_name}:{line_number}"
-                )
+                context = f"{function_name}() in {module_name}:{line_number}"
             else:
-                context_parts.append(f"{module_name}:{line_number}")
+                context = f"{module_name}:{line_number}"
 
-        # Combine the context parts
-        if context_parts:
-            return (
-                f"\x1b[90m[{' '.join(context_parts)}]\x1b[0m"  # Grey color for context
-            )
+        if context:
+            return f"\x1b[90m[{context}]\x1b[0m"  # Grey color for context
         return ""
 
     def format(self, record):
-        log_fmt = self.level_formats.get(record.levelno, "%(levelname)s: %(message)s")
-        if record.levelno == SUCCESS_LEVEL:
-            # Add a separator line before SUCCESS messages
-            log_fmt = "\x1b[32m" + "─" * 80 + "\x1b[0m\n" + log_fmt
-
-        # Format the main message
-        formatter = logging.Formatter(log_fmt, datefmt="%Y-%m-%d %H:%M:%S")
+        formatter = self.formatters.get(record.levelno, self.default_formatter)
         formatted_message = formatter.format(record)
 
         # Get context info if enabled
-        if CONTEXT_DISPLAY != "none":
+        if self.context_display != "none":
             context_info = self.get_context_info(record)
             if context_info:
-                # Get terminal width
-                try:
-                    terminal_width = shutil.get_terminal_size().columns
-                except (AttributeError, ValueError):
-                    terminal_width = 80  # Default if can't determine
-
-                # Format with context info right-aligned
-                message_length = len(
-                    formatted_message.strip("\x1b[]0123456789;m")
-                )  # Strip ANSI codes
+                # Format with context info right-aligned on the last line
+                last_line = formatted_message.rsplit("\n", 1)[-1]
                 padding = max(
                     1,
-                    terminal_width
-                    - message_length
-                    - len(context_info.strip("\x1b[]0123456789;m"))
+                    self.terminal_width
+                    - visible_length(last_line)
+                    - visible_length(context_info)
                     - 2,
                 )
                 formatted_message = f"{formatted_message}{' ' * padding}{context_info}"
@@ -210,6 +176,48 @@ class ConsoleFormatter(logging.Formatter):
         return formatted_message
 
 
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def visible_length(text):
+    """Length of text as shown in the terminal, ignoring ANSI color codes."""
+    return len(_ANSI_ESCAPE.sub("", text))
+
+
+@lru_cache(maxsize=256)
+def _method_ranges(pathname):
+    """
+    Map function names to the classes that define them in a source file.
+
+    Returns {function name: [(first line, last line, class name), ...]}.
+    Files that cannot be read or parsed map to an empty dict.
+    """
+    try:
+        tree = ast.parse(Path(pathname).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, ValueError, UnicodeDecodeError):
+        return {}
+
+    ranges = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                ranges.setdefault(item.name, []).append(
+                    (item.lineno, item.end_lineno, node.name)
+                )
+    return ranges
+
+
+def find_class_name(pathname, function_name, line_number):
+    """Name of the class whose method `function_name` contains the line, if any."""
+    best = None
+    for first, last, class_name in _method_ranges(pathname).get(function_name, ()):
+        if first <= line_number <= last and (best is None or first > best[0]):
+            best = (first, class_name)
+    return best[1] if best else None
+
+
 # ------------------------------------------------------
 #              Define detailed log format
 # ------------------------------------------------------
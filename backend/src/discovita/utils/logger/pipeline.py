@@ -0,0 +1,97 @@
+"""
+Application-wide logging pipeline.
+
+Every record from every logger goes through one non-blocking queue on the
+root logger. A single listener thread formats the records and writes them
+to the console, a rotating log file and, optionally, a rotating JSON-lines
+file. Request threads and the event loop never touch a file or the console.
+"""
+
+import json
+import logging
+import os
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import List, Optional
+
+from .queue import start_queue_logging
+
+APP_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra`.
+_STANDARD_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "taskName"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_app_logging(
+    log_dir: str = "logs",
+    log_filename: str = "face_swap.log",
+    level: int = logging.INFO,
+    json_lines: Optional[bool] = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+) -> QueueListener:
+    """
+    Install the queue-based logging pipeline on the root logger.
+
+    Args:
+        log_dir: Directory for log files
+        log_filename: Name of the plain-text log file
+        level: Root log level
+        json_lines: Also write `<log_filename stem>.jsonl`; defaults to the
+            LOG_JSON environment variable
+        max_bytes: Size at which log files are rotated
+        backup_count: Number of rotated files to keep
+
+    Returns:
+        The started QueueListener. Call `stop()` on shutdown to flush it.
+    """
+    if json_lines is None:
+        json_lines = os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes")
+
+    log_path = Path(log_dir)
+    log_path.mkdir(exist_ok=True, parents=True)
+    text_format = logging.Formatter(APP_LOG_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(text_format)
+
+    file_handler = RotatingFileHandler(
+        log_path / log_filename, maxBytes=max_bytes, backupCount=backup_count
+    )
+    file_handler.setFormatter(text_format)
+
+    sinks: List[logging.Handler] = [console_handler, file_handler]
+    if json_lines:
+        json_handler = RotatingFileHandler(
+            log_path / f"{Path(log_filename).stem}.jsonl",
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+        )
+        json_handler.setFormatter(JsonLinesFormatter())
+        sinks.append(json_handler)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    return start_queue_logging(root_logger, sinks)
@@ -0,0 +1,73 @@
+"""
+Queue-based logging handlers.
+
+Records are put on an in-memory queue by the calling thread or coroutine and
+written by a background listener thread, so log I/O never blocks the caller.
+"""
+
+import copy
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Sequence
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and defers formatting to the listener.
+
+    The standard QueueHandler formats every record (merging args into the
+    message) in the calling thread. Here the record is passed through as-is,
+    so expensive or lazy arguments are only rendered by the listener thread.
+    When the queue is full, records are dropped and counted rather than
+    blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    QueueListener whose shutdown waits for room in a full queue.
+
+    The standard listener enqueues its stop sentinel with `put_nowait`, which
+    raises when a burst has filled the queue. Blocking here is safe: the
+    listener thread is still draining the queue.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def start_queue_logging(
+    logger: logging.Logger,
+    handlers: Sequence[logging.Handler],
+    max_queue_size: int = 10_000,
+) -> QueueListener:
+    """
+    Route a logger's records through a queue to the given handlers.
+
+    Args:
+        logger: Logger to attach the queue handler to
+        handlers: Handlers that do the actual I/O on the listener thread
+        max_queue_size: Records buffered before new ones are dropped
+
+    Returns:
+        The started QueueListener; call `stop()` on shutdown to flush it.
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+    listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
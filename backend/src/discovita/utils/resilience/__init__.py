@@ -0,0 +1,26 @@
+"""Hedged requests, circuit breakers and metrics for upstream HTTP calls."""
+
+from .breaker import CircuitBreaker, CircuitState
+from .transport import AsyncResilientTransport, ResilientTransport, circuit_open_response
+from .upstream import (
+    LatencyTracker,
+    Upstream,
+    UpstreamMetrics,
+    get_upstream,
+    idempotent_requests,
+    upstream_snapshots,
+)
+
+__all__ = [
+    "AsyncResilientTransport",
+    "CircuitBreaker",
+    "CircuitState",
+    "LatencyTracker",
+    "ResilientTransport",
+    "Upstream",
+    "UpstreamMetrics",
+    "circuit_open_response",
+    "get_upstream",
+    "idempotent_requests",
+    "upstream_snapshots",
+]
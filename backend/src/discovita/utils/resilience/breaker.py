@@ -0,0 +1,107 @@
+"""Circuit breaker that fails fast while an upstream is unhealthy."""
+
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"  # Requests flow normally
+    OPEN = "open"  # Requests fail fast without being sent
+    HALF_OPEN = "half_open"  # One probe request decides whether to close again
+
+
+class CircuitBreaker:
+    """
+    Track the outcomes of recent calls and open when too many fail.
+
+    The breaker opens once at least `min_calls` of the last `window` calls
+    were recorded and `failure_threshold` of them failed. While open,
+    `allow()` returns False for `reset_timeout` seconds; after that a single
+    probe is let through. Its success closes the breaker, its failure opens
+    it again. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_threshold: float = 0.5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._reset_due():
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def _reset_due(self) -> bool:
+        return self.clock() - self._opened_at >= self.reset_timeout
+
+    def _transition(self, state: CircuitState) -> None:
+        if state != self._state:
+            logger.warning("Circuit for %s is now %s", self.name, state.value)
+        self._state = state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now. Every allowed call must be recorded."""
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.OPEN:
+                if not self._reset_due():
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call that `allow()` let through."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._outcomes.clear()
+                    self._transition(CircuitState.CLOSED)
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                self._state == CircuitState.CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_threshold
+            ):
+                self._open()
+
+    def cancel(self) -> None:
+        """Release a call that `allow()` let through without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def _open(self) -> None:
+        self._opened_at = self.clock()
+        self._transition(CircuitState.OPEN)
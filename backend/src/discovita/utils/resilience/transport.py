@@ -0,0 +1,190 @@
+"""httpx transports that hedge slow requests and fail fast on open circuits."""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+import httpx
+
+from .upstream import Upstream
+
+CIRCUIT_OPEN_HEADER = "x-circuit-open"
+
+
+def circuit_open_response(upstream: Upstream, request: httpx.Request) -> httpx.Response:
+    """
+    503 returned in place of a request while the upstream's circuit is open.
+
+    A response rather than an exception, so each client's existing error
+    handling for upstream failures applies (Icons8Error, the OpenAI SDK's
+    status errors, `raise_for_status`).
+    """
+    return httpx.Response(
+        503,
+        headers={CIRCUIT_OPEN_HEADER: "1", "retry-after": str(int(upstream.breaker.reset_timeout))},
+        json={"error": f"{upstream.name} is unavailable, try again later"},
+        request=request,
+    )
+
+
+def is_success(response: Optional[httpx.Response]) -> bool:
+    return response is not None and response.status_code < 500
+
+
+def _record_error(upstream: Upstream, request: httpx.Request, error: BaseException, seconds: float) -> None:
+    if isinstance(error, httpx.TransportError) and not isinstance(error, httpx.PoolTimeout):
+        upstream.record(request, False, seconds)
+    else:
+        # A cancelled caller or a wait for a local connection pool slot
+        # says nothing about the upstream
+        upstream.breaker.cancel()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """
+    Wrap a sync transport with the upstream's circuit breaker and hedging.
+
+    Hedgeable requests that take longer than the route's hedge delay are
+    sent a second time from a worker thread; the first successful response
+    is returned and the other is closed when it arrives.
+    """
+
+    def __init__(self, upstream: Upstream, transport: Optional[httpx.BaseTransport] = None, max_workers: int = 32):
+        self.upstream = upstream
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, request: httpx.Request) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix=f"hedge-{self.upstream.name}"
+            )
+        # Copy the context so the request keeps its rate limit priority
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self.transport.handle_request, request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstream
+        if not upstream.breaker.allow():
+            upstream.record_short_circuit()
+            return circuit_open_response(upstream, request)
+
+        start = time.monotonic()
+        delay = upstream.hedge_delay(request)
+        try:
+            if delay is None:
+                response, hedged, hedge_won = self.transport.handle_request(request), False, False
+            else:
+                response, hedged, hedge_won = self._hedged(request, delay)
+        except BaseException as e:
+            _record_error(upstream, request, e, time.monotonic() - start)
+            raise
+        upstream.record(request, is_success(response), time.monotonic() - start, hedged, hedge_won)
+        return response
+
+    def _hedged(self, request: httpx.Request, delay: float) -> Tuple[httpx.Response, bool, bool]:
+        attempts = [self._submit(request)]
+        done, _ = wait(attempts, timeout=delay)
+        if not done:
+            attempts.append(self._submit(request))
+
+        pending = set(attempts)
+        winner: Optional[Future] = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in attempts:
+                if attempt in done and attempt.exception() is None and is_success(attempt.result()):
+                    winner = attempt
+                    break
+        # Without a success the primary's outcome stands
+        winner = winner or attempts[0]
+
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.add_done_callback(_close_response)
+        return winner.result(), len(attempts) > 1, winner is not attempts[0]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.transport.close()
+
+
+def _close_response(attempt: Future) -> None:
+    if not attempt.cancelled() and attempt.exception() is None:
+        attempt.result().close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Wrap an async transport with the upstream's circuit breaker and hedging.
+
+    Hedgeable requests that take longer than the route's hedge delay are
+    sent a second time; the first successful response is returned and the
+    other request is cancelled.
+    """
+
+    def __init__(self, upstream: Upstream, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.upstream = upstream
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstream
+        if not upstream.breaker.allow():
+            upstream.record_short_circuit()
+            return circuit_open_response(upstream, request)
+
+        start = time.monotonic()
+        delay = upstream.hedge_delay(request)
+        try:
+            if delay is None:
+                response = await self.transport.handle_async_request(request)
+                hedged = hedge_won = False
+            else:
+                response, hedged, hedge_won = await self._hedged(request, delay)
+        except BaseException as e:
+            _record_error(upstream, request, e, time.monotonic() - start)
+            raise
+        upstream.record(request, is_success(response), time.monotonic() - start, hedged, hedge_won)
+        return response
+
+    async def _hedged(self, request: httpx.Request, delay: float) -> Tuple[httpx.Response, bool, bool]:
+        attempts: List[asyncio.Task] = [
+            asyncio.ensure_future(self.transport.handle_async_request(request))
+        ]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                attempts.append(asyncio.ensure_future(self.transport.handle_async_request(request)))
+
+            pending = set(attempts)
+            winner: Optional[asyncio.Task] = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in attempts:
+                    if attempt in done and attempt.exception() is None and is_success(attempt.result()):
+                        winner = attempt
+                        break
+            winner = winner or attempts[0]
+        except BaseException:
+            winner = None
+            raise
+        finally:
+            for attempt in attempts:
+                if attempt is not winner:
+                    await _discard(attempt)
+        return winner.result(), len(attempts) > 1, winner is not attempts[0]
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+async def _discard(attempt: asyncio.Task) -> None:
+    """Cancel a losing attempt, or close its response if it already has one."""
+    attempt.cancel()
+    await asyncio.wait([attempt])
+    if not attempt.cancelled() and attempt.exception() is None:
+        await attempt.result().aclose()
@@ -0,0 +1,180 @@
+"""Per-upstream resilience state: circuit breaker, latencies and metrics."""
+
+import re
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from .breaker import CircuitBreaker
+
+HedgePredicate = Callable[[httpx.Request], bool]
+
+_ID_SEGMENT = re.compile(r"/[^/]*\d[^/]*")
+
+
+def route_of(request: httpx.Request) -> str:
+    """
+    Latency bucket of a request: its method and path, with id-like segments
+    (any segment containing a digit) collapsed so `/process_image/<job id>`
+    calls share one bucket.
+    """
+    return f"{request.method} {_ID_SEGMENT.sub('/{id}', request.url.path)}"
+
+
+def idempotent_requests(*post_paths: str) -> HedgePredicate:
+    """Hedge GET and HEAD requests, and POSTs to paths ending in `post_paths`."""
+
+    def hedge(request: httpx.Request) -> bool:
+        if request.method in ("GET", "HEAD"):
+            return True
+        return request.method == "POST" and request.url.path.endswith(post_paths)
+
+    return hedge
+
+
+def never(request: httpx.Request) -> bool:
+    return False
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful calls of one route."""
+
+    def __init__(self, size: int = 256):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class UpstreamMetrics:
+    """Counters of one upstream since the process started."""
+    requests: int = 0  # Calls made, hedges not counted separately
+    failures: int = 0  # Calls that raised or returned a 5xx
+    short_circuited: int = 0  # Calls failed fast by the open breaker
+    hedged: int = 0  # Calls that sent a hedge request
+    hedge_wins: int = 0  # Hedged calls answered by the hedge
+
+
+class Upstream:
+    """
+    Shared resilience state of one upstream service.
+
+    Every client of the service shares its circuit breaker and its latency
+    history, from which the hedge delay of each route is derived: a hedge
+    is sent once a call has taken longer than the route's p95 latency.
+    Hedges are limited to `max_hedge_ratio` of all calls, so a slow
+    upstream is not sent twice the traffic.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        hedge: HedgePredicate = never,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_quantile: float = 0.95,
+        min_samples: int = 20,
+        min_hedge_delay: float = 0.05,
+        max_hedge_ratio: float = 0.1,
+    ):
+        self.name = name
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(name)
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.metrics = UpstreamMetrics()
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, route: str) -> LatencyTracker:
+        tracker = self._latencies.get(route)
+        if tracker is None:
+            tracker = self._latencies[route] = LatencyTracker()
+        return tracker
+
+    def hedge_delay(self, request: httpx.Request) -> Optional[float]:
+        """Seconds after which to hedge `request`; None to not hedge it."""
+        if not self.hedge(request):
+            return None
+        with self._lock:
+            if self.metrics.hedged + 1 > self.max_hedge_ratio * (self.metrics.requests + 1):
+                return None
+            tracker = self._tracker(route_of(request))
+            if len(tracker) < self.min_samples:
+                return None
+            return max(self.min_hedge_delay, tracker.percentile(self.hedge_quantile) or 0.0)
+
+    def record(
+        self,
+        request: httpx.Request,
+        success: bool,
+        seconds: float,
+        hedged: bool = False,
+        hedge_won: bool = False,
+    ) -> None:
+        """Record the outcome of a call that the breaker let through."""
+        self.breaker.record(success)
+        with self._lock:
+            self.metrics.requests += 1
+            self.metrics.hedged += hedged
+            self.metrics.hedge_wins += hedge_won
+            if success:
+                self._tracker(route_of(request)).add(seconds)
+            else:
+                self.metrics.failures += 1
+
+    def record_short_circuit(self) -> None:
+        with self._lock:
+            self.metrics.short_circuited += 1
+
+    def snapshot(self) -> dict:
+        """Metrics, breaker state and per-route latency percentiles."""
+        with self._lock:
+            routes = {
+                route: {
+                    "p50": tracker.percentile(0.5),
+                    "p95": tracker.percentile(0.95),
+                    "samples": len(tracker),
+                }
+                for route, tracker in self._latencies.items()
+            }
+            return {
+                "name": self.name,
+                "circuit": self.breaker.state.value,
+                **asdict(self.metrics),
+                "routes": routes,
+            }
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str, hedge: HedgePredicate = never) -> Upstream:
+    """Process-wide state of the upstream `name`, created on first use."""
+    with _upstreams_lock:
+        upstream = _upstreams.get(name)
+        if upstream is None:
+            upstream = _upstreams[name] = Upstream(name, hedge=hedge)
+        return upstream
+
+
+def upstream_snapshots() -> List[dict]:
+    """Snapshots of every upstream used so far."""
+    with _upstreams_lock:
+        upstreams = list(_upstreams.values())
+    return [upstream.snapshot() for upstream in upstreams]
@@ -0,0 +1,164 @@
+"""Coalescing of concurrent identical calls."""
+
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterator, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SingleFlight(Generic[T]):
+    """
+    Share one in-flight call between concurrent callers using the same key.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result (or exception). The call runs in its
+    own task, so a caller that is cancelled does not cancel it for the others.
+    `coalesced` counts the callers that joined a call already in flight.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` unless a call for `key` is already in flight, then await it."""
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the exception so an unobserved failure is not logged as
+        # "exception was never retrieved" when every caller was cancelled.
+        if not call.cancelled():
+            call.exception()
+
+
+class ThreadSingleFlight(Generic[T]):
+    """
+    `SingleFlight` for blocking calls made from several threads.
+
+    The first caller for a key runs the call in its own thread; callers
+    arriving while it runs block until it finishes and get the same result
+    (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn` unless a call for `key` is already in flight, then wait for it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_coalescing: ContextVar[bool] = ContextVar("coalescing", default=True)
+
+
+def coalescing_enabled() -> bool:
+    """Whether identical calls made from the current context may be coalesced."""
+    return _coalescing.get()
+
+
+@contextmanager
+def coalescing(enabled: bool) -> Iterator[None]:
+    """
+    Turn coalescing of identical calls on or off for this block.
+
+    Call sites that want distinct results for identical requests, such as
+    several variants of one image prompt, turn it off. The setting is a
+    context variable, so it follows `asyncio.to_thread` into worker threads.
+    """
+    token = _coalescing.set(enabled)
+    try:
+        yield
+    finally:
+        _coalescing.reset(token)
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    return str(value)
+
+
+def request_key(*parts: Any, **params: Any) -> str:
+    """
+    Canonical hash of a request's parameters.
+
+    Keyword order does not matter, and Pydantic models, classes (e.g. a
+    `response_format`) and bytes are hashed by value.
+    """
+    canonical = json.dumps(
+        [parts, params], sort_keys=True, separators=(",", ":"), default=_canonical
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def coalesced(method: F) -> F:
+    """
+    Coalesce concurrent identical calls of a blocking method.
+
+    Calls are shared through the instance's `in_flight` ThreadSingleFlight,
+    keyed by the method and its arguments. Without one, when coalescing is
+    turned off for the calling context, or for streaming calls, the method
+    simply runs.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        in_flight = getattr(self, "in_flight", None)
+        if in_flight is None or kwargs.get("stream") or not coalescing_enabled():
+            return method(self, *args, **kwargs)
+        key = request_key(method.__qualname__, *args, **kwargs)
+        return in_flight.do(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper  # type: ignore[return-value]
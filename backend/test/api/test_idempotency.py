@@ -0,0 +1,102 @@
+"""Tests for Idempotency-Key replay of expensive requests."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from discovita.api.idempotency import IdempotencyMiddleware, MemoryIdempotencyStore
+from pydantic import BaseModel
+
+pytestmark = pytest.mark.asyncio
+
+
+class WorkRequest(BaseModel):
+    value: int
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+
+def make_client(counter: Counter, store=None) -> httpx.AsyncClient:
+    app = FastAPI()
+
+    @app.post("/work")
+    async def work(request: WorkRequest) -> dict:
+        counter.calls += 1
+        await counter.release.wait()
+        if request.value < 0:
+            raise HTTPException(status_code=500, detail="Upstream failed")
+        return {"result": request.value * 2, "call": counter.calls}
+
+    @app.post("/other")
+    async def other(request: WorkRequest) -> dict:
+        counter.calls += 1
+        return {"call": counter.calls}
+
+    app.add_middleware(
+        IdempotencyMiddleware, store=store or MemoryIdempotencyStore(), paths=["/work"], wait_timeout=5
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def test_retry_replays_the_stored_response() -> None:
+    counter = Counter()
+    async with make_client(counter) as client:
+        first = await client.post("/work", json={"value": 2}, headers={"Idempotency-Key": "abc"})
+        retry = await client.post("/work", json={"value": 2}, headers={"Idempotency-Key": "abc"})
+
+    assert first.json() == retry.json() == {"result": 4, "call": 1}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert counter.calls == 1
+
+
+async def test_retry_waits_for_the_request_in_progress() -> None:
+    counter = Counter()
+    counter.release.clear()
+    async with make_client(counter) as client:
+        headers = {"Idempotency-Key": "abc"}
+        first = asyncio.create_task(client.post("/work", json={"value": 3}, headers=headers))
+        await asyncio.sleep(0.05)
+        retry = asyncio.create_task(client.post("/work", json={"value": 3}, headers=headers))
+        await asyncio.sleep(0.05)
+        counter.release.set()
+        responses = await asyncio.gather(first, retry)
+
+    assert [response.json() for response in responses] == [{"result": 6, "call": 1}] * 2
+    assert counter.calls == 1
+
+
+async def test_server_errors_are_not_stored() -> None:
+    counter = Counter()
+    async with make_client(counter) as client:
+        for _ in range(2):
+            response = await client.post("/work", json={"value": -1}, headers={"Idempotency-Key": "abc"})
+            assert response.status_code == 500
+
+    assert counter.calls == 2
+
+
+async def test_key_reused_for_a_different_request_is_rejected() -> None:
+    counter = Counter()
+    async with make_client(counter) as client:
+        await client.post("/work", json={"value": 1}, headers={"Idempotency-Key": "abc"})
+        response = await client.post("/work", json={"value": 2}, headers={"Idempotency-Key": "abc"})
+
+    assert response.status_code == 422
+    assert counter.calls == 1
+
+
+async def test_requests_without_key_or_on_other_paths_always_run() -> None:
+    counter = Counter()
+    async with make_client(counter) as client:
+        await client.post("/work", json={"value": 1})
+        await client.post("/work", json={"value": 1})
+        await client.post("/other", json={"value": 1}, headers={"Idempotency-Key": "abc"})
+        await client.post("/other", json={"value": 1}, headers={"Idempotency-Key": "abc"})
+
+    assert counter.calls == 4
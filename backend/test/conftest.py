@@ -0,0 +1,11 @@
+"""Fixtures shared by all test packages."""
+
+import pytest
+
+from fixtures.image_generation import FakeGenerationService
+
+
+@pytest.fixture
+def generation_service() -> FakeGenerationService:
+    """Image generation double that succeeds and records its calls."""
+    return FakeGenerationService()
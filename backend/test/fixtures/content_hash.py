@@ -0,0 +1,11 @@
+"""Content hasher double for cache tests."""
+
+
+class FakeHasher:
+    """Hasher double mapping URLs to fixed digests."""
+
+    def __init__(self, digests: dict):
+        self.digests = digests
+
+    async def hash_url(self, url: str) -> str:
+        return self.digests[url]
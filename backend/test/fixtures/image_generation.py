@@ -0,0 +1,42 @@
+"""Image generation double for pipeline, scene library and coach tests."""
+
+from discovita.service.openai.models.image_models import (
+    GeneratedImage,
+    ImageResponse,
+    SafeImageResponse,
+)
+
+DALLE_URL = "https://dalle.example.com/scene.png"
+
+
+class FakeGenerationService:
+    """
+    Generation double that records its calls.
+
+    Every scene is generated at DALLE_URL, with a revised prompt naming its
+    setting. Generation fails when `fail` is set or the setting is
+    "blocked"; `safety_violation` marks the failure as a safety rejection.
+    """
+
+    def __init__(self, fail: bool = False, safety_violation: bool = False):
+        self.fail = fail
+        self.safety_violation = safety_violation
+        self.calls = []
+
+    @property
+    def descriptions(self) -> list:
+        return [call.get("user_description") for call in self.calls]
+
+    async def safe_generate_scene_async(self, **kwargs) -> SafeImageResponse:
+        self.calls.append(kwargs)
+        if self.fail or kwargs["setting"] == "blocked":
+            return SafeImageResponse(
+                success=False,
+                error="Blocked",
+                original_prompt="prompt",
+                safety_violation=self.safety_violation,
+            )
+        image = GeneratedImage(url=DALLE_URL, revised_prompt=f"A person in {kwargs['setting']}")
+        return SafeImageResponse(
+            success=True, data=ImageResponse(created=0, data=[image]), original_prompt="prompt"
+        )
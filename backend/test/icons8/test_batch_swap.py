@@ -0,0 +1,116 @@
+"""Tests for batch face swaps."""
+
+import httpx
+import pytest
+from discovita.service.icons8.icons8_service import Icons8Service
+from discovita.service.icons8.models import (
+    FaceSwapResponse,
+    GetBboxResponse,
+    Icons8Error,
+    ProcessedImage,
+    ProcessStatus,
+)
+
+pytestmark = pytest.mark.asyncio
+
+SOURCE_URL = "https://example.com/source.jpg"
+FACE = {"bbox": [10, 10, 200, 200, 0.9], "landmarks": [1.0, 2.0]}
+
+
+class FakeBatchClient:
+    """Client double where each target job takes a configurable number of polls."""
+
+    def __init__(self, faces_by_url: dict, polls_by_target: dict, failing_targets=()):
+        self.faces_by_url = faces_by_url
+        self.polls_by_target = polls_by_target
+        self.failing_targets = set(failing_targets)
+        self.landmark_calls = []
+        self.submitted = []
+
+    async def get_landmarks(self, urls):
+        self.landmark_calls.append(urls)
+        return GetBboxResponse.model_validate(
+            [{"img_url": url, "faces": self.faces_by_url.get(url, [])} for url in urls]
+        )
+
+    async def submit_face_swap(self, source_url, source_face, target_url, target_face):
+        self.submitted.append(str(target_url))
+        if str(target_url) in self.failing_targets:
+            raise httpx.ReadTimeout("Icons8 did not answer")
+        return FaceSwapResponse(id=str(target_url), status=ProcessStatus.QUEUE, status_name="queue")
+
+    async def get_job_status(self, job_id):
+        self.polls_by_target[job_id] -= 1
+        if self.polls_by_target[job_id] > 0:
+            return FaceSwapResponse(id=job_id, status=ProcessStatus.PROCESSING, status_name="processing")
+        return FaceSwapResponse(
+            id=job_id,
+            status=ProcessStatus.READY,
+            status_name="ready",
+            processed=ProcessedImage(width=1, height=1, type="jpeg", url=job_id + "?swapped"),
+        )
+
+
+def make_service(client) -> Icons8Service:
+    service = Icons8Service(client)
+    service.polling_interval = 0.01
+    return service
+
+
+async def test_batch_uses_one_landmark_call_and_yields_in_completion_order() -> None:
+    """Faster jobs are streamed first and landmarks are fetched once."""
+    slow, fast = "https://example.com/slow.jpg", "https://example.com/fast.jpg"
+    client = FakeBatchClient(
+        faces_by_url={SOURCE_URL: [FACE], slow: [FACE], fast: [FACE]},
+        polls_by_target={slow: 5, fast: 1},
+    )
+
+    results = await make_service(client).swap_faces_batch(SOURCE_URL, [slow, fast, slow])
+    items = [item async for item in results]
+
+    assert client.landmark_calls == [[SOURCE_URL, slow, fast]]
+    assert [item.target_url for item in items] == [fast, slow]
+    assert all(item.status == "complete" for item in items)
+    assert items[0].url == fast + "?swapped"
+
+
+async def test_target_without_face_is_reported_per_item() -> None:
+    """A target without faces fails on its own without stopping the batch."""
+    good, empty = "https://example.com/good.jpg", "https://example.com/empty.jpg"
+    client = FakeBatchClient(
+        faces_by_url={SOURCE_URL: [FACE], good: [FACE]},
+        polls_by_target={good: 1},
+    )
+
+    results = await make_service(client).swap_faces_batch(SOURCE_URL, [good, empty])
+    items = {item.target_url: item async for item in results}
+
+    assert items[good].status == "complete"
+    assert items[empty].status == "error"
+    assert client.submitted == [good]
+
+
+async def test_transport_error_fails_only_its_target() -> None:
+    """A timeout submitting one target does not end the batch."""
+    good, slow = "https://example.com/good.jpg", "https://example.com/timeout.jpg"
+    client = FakeBatchClient(
+        faces_by_url={SOURCE_URL: [FACE], good: [FACE], slow: [FACE]},
+        polls_by_target={good: 2},
+        failing_targets=[slow],
+    )
+
+    results = await make_service(client).swap_faces_batch(SOURCE_URL, [slow, good])
+    items = {item.target_url: item async for item in results}
+
+    assert items[slow].status == "error"
+    assert items[good].status == "complete"
+
+
+async def test_source_without_face_fails_before_streaming() -> None:
+    """A source image without faces is rejected up front."""
+    target = "https://example.com/target.jpg"
+    client = FakeBatchClient(faces_by_url={target: [FACE]}, polls_by_target={})
+
+    with pytest.raises(Icons8Error) as exc_info:
+        await make_service(client).swap_faces_batch(SOURCE_URL, [target])
+    assert exc_info.value.status_code == 422
@@ -0,0 +1,53 @@
+"""Tests for coalescing identical in-flight Icons8 swaps."""
+
+import asyncio
+
+import pytest
+from discovita.service.icons8.icons8_service import Icons8Service
+from discovita.utils.singleflight import SingleFlight, coalescing
+
+from .test_result_cache import CountingClient
+
+pytestmark = pytest.mark.asyncio
+
+SOURCE_URL = "https://example.com/source.jpg"
+TARGET_URL = "https://example.com/target.jpg"
+
+
+def make_service(client: CountingClient, in_flight: SingleFlight) -> Icons8Service:
+    service = Icons8Service(client, in_flight=in_flight)
+    service.polling_interval = 0
+    return service
+
+
+async def test_identical_swaps_share_one_job() -> None:
+    client = CountingClient()
+    client.release.clear()
+    in_flight = SingleFlight()
+    service = make_service(client, in_flight)
+
+    swaps = [asyncio.create_task(service.swap_faces(SOURCE_URL, TARGET_URL)) for _ in range(3)]
+    await asyncio.sleep(0)
+    client.release.set()
+    results = await asyncio.gather(*swaps)
+
+    assert results == [{"url": "https://example.com/result.jpg", "status": "complete"}] * 3
+    assert client.submissions == 1
+    assert in_flight.coalesced == 2
+
+
+async def test_coalescing_can_be_turned_off_per_call_site() -> None:
+    client = CountingClient()
+    client.release.clear()
+    service = make_service(client, SingleFlight())
+
+    async def swap():
+        with coalescing(False):
+            return await service.swap_faces(SOURCE_URL, TARGET_URL)
+
+    swaps = [asyncio.create_task(swap()) for _ in range(2)]
+    await asyncio.sleep(0)
+    client.release.set()
+    await asyncio.gather(*swaps)
+
+    assert client.submissions == 2
@@ -2,6 +2,7 @@
 
 import pytest
 from discovita.service.icons8.client.client import Icons8Client
+from discovita.service.icons8.models import Icons8Error
 from .mock_response import MockLandmarksResponse
 
 pytestmark = pytest.mark.asyncio
@@ -31,9 +32,10 @@ async def test_no_faces_error() -> None:
     # Monkey patch the client's post method
     setattr(client.client, "post", mock_post)
     
-    # Verify assertion error is raised
-    with pytest.raises(AssertionError, match="No faces detected in source image"):
+    # Verify the request is rejected as unprocessable
+    with pytest.raises(Icons8Error, match="No faces detected in source image") as exc_info:
         await client.swap_faces(
             source_url="https://example.com/source.jpg",
             target_url="https://example.com/target.jpg"
         )
+    assert exc_info.value.status_code == 422
@@ -0,0 +1,43 @@
+"""Tests for the shared Icons8 HTTP client."""
+
+import pytest
+from discovita.service.icons8.client.client import Icons8Client
+from discovita.service.icons8.client.http import (
+    close_shared_http_clients,
+    get_shared_http_client,
+)
+
+pytestmark = pytest.mark.asyncio
+
+BASE_URL = "https://api.icons8.com"
+
+
+async def test_shared_client_is_reused_until_closed() -> None:
+    """The same pooled client is returned until shutdown closes it."""
+    first = get_shared_http_client(BASE_URL)
+    assert get_shared_http_client(BASE_URL) is first
+
+    await close_shared_http_clients()
+
+    assert first.is_closed
+    second = get_shared_http_client(BASE_URL)
+    assert second is not first
+    await close_shared_http_clients()
+
+
+async def test_icons8_client_does_not_close_shared_client() -> None:
+    """Closing an Icons8Client leaves an injected shared client open."""
+    shared = get_shared_http_client(BASE_URL)
+    async with Icons8Client(api_key="test-key", base_url=BASE_URL, http_client=shared) as client:
+        assert client.client is shared
+
+    assert not shared.is_closed
+    await close_shared_http_clients()
+
+
+async def test_icons8_client_closes_owned_client() -> None:
+    """A client created without a shared pool owns and closes its own."""
+    async with Icons8Client(api_key="test-key", base_url=BASE_URL) as client:
+        owned = client.client
+
+    assert owned.is_closed
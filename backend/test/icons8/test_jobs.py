@@ -0,0 +1,132 @@
+"""Tests for the asynchronous face swap job registry."""
+
+import asyncio
+
+import pytest
+from discovita.service.icons8.icons8_service import Icons8Service
+from discovita.service.icons8.jobs import SwapJobRegistry
+from discovita.service.icons8.models import (
+    FaceSwapResponse,
+    Icons8Error,
+    ProcessedImage,
+    ProcessStatus,
+)
+
+pytestmark = pytest.mark.asyncio
+
+SOURCE_URL = "https://example.com/source.jpg"
+TARGET_URL = "https://example.com/target.jpg"
+
+
+class FakeIcons8Client:
+    """Client double that reports READY after a number of status checks."""
+
+    def __init__(self, polls_until_ready: int = 1, fail: bool = False):
+        self.polls_until_ready = polls_until_ready
+        self.fail = fail
+        self.release = asyncio.Event()
+
+    async def swap_faces(self, source_url: str, target_url: str) -> FaceSwapResponse:
+        if self.fail:
+            raise Icons8Error(status_code=400, detail="Bad image")
+        return FaceSwapResponse(id="icons8-id", status=ProcessStatus.QUEUE, status_name="queue")
+
+    async def get_job_status(self, job_id: str) -> FaceSwapResponse:
+        await self.release.wait()
+        self.polls_until_ready -= 1
+        if self.polls_until_ready > 0:
+            return FaceSwapResponse(id=job_id, status=ProcessStatus.PROCESSING, status_name="processing")
+        return FaceSwapResponse(
+            id=job_id,
+            status=ProcessStatus.READY,
+            status_name="ready",
+            processed=ProcessedImage(
+                width=800, height=600, type="jpeg", url="https://example.com/result.jpg"
+            ),
+        )
+
+
+def make_service(client: FakeIcons8Client) -> Icons8Service:
+    service = Icons8Service(client)
+    service.polling_interval = 0
+    return service
+
+
+async def test_job_completes_and_keeps_registry_id() -> None:
+    """A submitted job is processing until Icons8 reports READY."""
+    registry = SwapJobRegistry()
+    client = FakeIcons8Client(polls_until_ready=2)
+    job = registry.submit(make_service(client), SOURCE_URL, TARGET_URL)
+
+    assert job.to_frontend_response() == {"job_id": job.id, "url": "", "status": "processing"}
+
+    client.release.set()
+    finished = await registry.wait(job.id, timeout=1)
+
+    assert finished is job
+    assert finished.result.job_id == job.id
+    assert finished.to_frontend_response() == {
+        "job_id": job.id,
+        "url": "https://example.com/result.jpg",
+        "status": "complete",
+    }
+
+
+async def test_long_poll_times_out_while_processing() -> None:
+    """Waiting returns the in-progress job once the timeout expires."""
+    registry = SwapJobRegistry()
+    job = registry.submit(make_service(FakeIcons8Client()), SOURCE_URL, TARGET_URL)
+
+    result = await registry.wait(job.id, timeout=0.05)
+
+    assert result is job
+    assert result.to_frontend_response()["status"] == "processing"
+    await registry.aclose()
+
+
+async def test_failed_job_reports_error() -> None:
+    """Icons8 errors are recorded on the job instead of being raised."""
+    registry = SwapJobRegistry()
+    job = registry.submit(make_service(FakeIcons8Client(fail=True)), SOURCE_URL, TARGET_URL)
+
+    await registry.wait(job.id, timeout=1)
+
+    assert job.to_frontend_response()["status"] == "error"
+    assert job.error == "Bad image"
+
+
+async def test_watch_yields_every_update() -> None:
+    """Watching a job yields its initial state and each change until it finishes."""
+    registry = SwapJobRegistry()
+    client = FakeIcons8Client(polls_until_ready=2)
+    client.release.set()
+    job = registry.submit(make_service(client), SOURCE_URL, TARGET_URL)
+
+    statuses = [item.to_frontend_response()["status"] async for item in registry.watch(job.id)]
+
+    assert statuses[0] == "processing"
+    assert statuses[-1] == "complete"
+
+
+async def test_full_registry_evicts_finished_jobs_first() -> None:
+    """Finished jobs make room for new ones; running jobs are never evicted."""
+    registry = SwapJobRegistry(max_jobs=1)
+    finished_client = FakeIcons8Client()
+    finished_client.release.set()
+    first = registry.submit(make_service(finished_client), SOURCE_URL, TARGET_URL)
+    await registry.wait(first.id, timeout=1)
+
+    second = registry.submit(make_service(FakeIcons8Client()), SOURCE_URL, TARGET_URL)
+    assert registry.get(first.id) is None
+    assert registry.get(second.id) is second
+
+    with pytest.raises(Icons8Error) as exc_info:
+        registry.submit(make_service(FakeIcons8Client()), SOURCE_URL, TARGET_URL)
+    assert exc_info.value.status_code == 503
+    await registry.aclose()
+
+
+async def test_unknown_job_returns_none() -> None:
+    """Unknown job ids are reported as missing."""
+    registry = SwapJobRegistry()
+    assert await registry.wait("missing", timeout=0) is None
@@ -0,0 +1,102 @@
+"""Tests for cached face landmark lookups."""
+
+import asyncio
+
+import pytest
+from discovita.service.icons8.cache import LandmarkCache
+from discovita.service.icons8.icons8_service import Icons8Service
+from discovita.service.icons8.models import (
+    FaceSwapResponse,
+    GetBboxResponse,
+    Icons8Error,
+    ProcessedImage,
+    ProcessStatus,
+)
+from fixtures.content_hash import FakeHasher
+
+pytestmark = pytest.mark.asyncio
+
+SOURCE_URL = "https://example.com/source.jpg"
+TARGET_URL = "https://example.com/target.jpg"
+FACE = {"bbox": [10, 10, 200, 200, 0.99], "landmarks": [0.0] * 10}
+
+
+class LandmarkClient:
+    """Client double that counts face detections and submitted swaps."""
+
+    def __init__(self, faceless: tuple = ()):
+        self.faceless = faceless
+        self.detections = []
+        self.submissions = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def get_landmarks(self, urls):
+        self.detections.extend(urls)
+        await self.release.wait()
+        return GetBboxResponse.model_validate([
+            {"img_url": url, "faces": [] if url in self.faceless else [FACE]}
+            for url in urls
+        ])
+
+    async def submit_face_swap(self, source_url, source_face, target_url, target_face):
+        self.submissions += 1
+        return FaceSwapResponse(id="job", status=ProcessStatus.QUEUE, status_name="queue")
+
+    async def get_job_status(self, job_id: str) -> FaceSwapResponse:
+        return FaceSwapResponse(
+            id=job_id,
+            status=ProcessStatus.READY,
+            status_name="ready",
+            processed=ProcessedImage(
+                width=800, height=600, type="jpeg", url="https://example.com/result.jpg"
+            ),
+        )
+
+
+def make_service(client: LandmarkClient, cache: LandmarkCache) -> Icons8Service:
+    digests = {SOURCE_URL: "a" * 64, TARGET_URL: "b" * 64}
+    service = Icons8Service(client, hasher=FakeHasher(digests), landmark_cache=cache)
+    service.polling_interval = 0
+    return service
+
+
+async def test_precomputed_landmarks_are_reused_by_swap() -> None:
+    """Landmarks looked up ahead of time are not detected again when swapping."""
+    client = LandmarkClient()
+    service = make_service(client, LandmarkCache())
+
+    await service.get_image_faces(SOURCE_URL)
+    result = await service.swap_faces(SOURCE_URL, TARGET_URL)
+
+    assert result["status"] == "complete"
+    assert client.detections == [SOURCE_URL, TARGET_URL]
+    assert client.submissions == 1
+
+
+async def test_concurrent_lookups_share_one_detection() -> None:
+    """Concurrent lookups of the same image make a single Icons8 request."""
+    client = LandmarkClient()
+    client.release.clear()
+    service = make_service(client, LandmarkCache())
+
+    lookups = [asyncio.create_task(service.get_image_faces(SOURCE_URL)) for _ in range(5)]
+    await asyncio.sleep(0)
+    client.release.set()
+    results = await asyncio.gather(*lookups)
+
+    assert client.detections == [SOURCE_URL]
+    assert all(len(faces.faces) == 1 for faces in results)
+
+
+async def test_faceless_source_fails_before_submitting() -> None:
+    """An image without faces is rejected with 422 and no swap is submitted."""
+    client = LandmarkClient(faceless=(SOURCE_URL,))
+    service = make_service(client, LandmarkCache())
+
+    with pytest.raises(Icons8Error) as exc_info:
+        await service.swap_faces(SOURCE_URL, TARGET_URL)
+
+    assert exc_info.value.status_code == 422
+    assert exc_info.value.detail == "No faces detected in source image"
+    assert client.submissions == 0
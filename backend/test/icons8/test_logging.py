@@ -0,0 +1,70 @@
+"""Tests for Icons8 traffic logging."""
+
+import logging
+
+import pytest
+from discovita.service.icons8.client import logging as icons8_logging
+from discovita.service.icons8.client.logging import LazyBody, log_response
+
+from .mock_response import MockRequest, MockSwapResponse
+
+URL = "https://api.icons8.com/process_image?token=secret-key"
+
+
+@pytest.fixture
+def icons8_logger():
+    logger = icons8_logging.logger
+    previous = logger.level
+    yield logger
+    logger.setLevel(previous)
+
+
+def test_bodies_are_not_read_when_debug_is_disabled(icons8_logger, capsys) -> None:
+    """Successful calls cost nothing when DEBUG logging is off."""
+    icons8_logger.setLevel(logging.INFO)
+
+    class ExplodingResponse(MockSwapResponse):
+        @property
+        def text(self):
+            raise AssertionError("body should not be decoded")
+
+        @text.setter
+        def text(self, value):
+            pass
+
+    log_response(ExplodingResponse({"id": "1"}, url=URL), "Job status check")
+
+    assert capsys.readouterr().out == ""
+
+
+def test_record_is_structured_and_redacted(icons8_logger, caplog) -> None:
+    """Records carry structured fields and never include the API token."""
+    icons8_logger.setLevel(logging.DEBUG)
+    response = MockSwapResponse({"id": "1"}, url=URL)
+    response.request = MockRequest(url=URL, method="POST", content=b'{"a": 1}')
+
+    with caplog.at_level(logging.DEBUG, logger=icons8_logger.name):
+        log_response(response, "Face swap request")
+
+    record = caplog.records[-1]
+    assert record.icons8["status_code"] == 200
+    assert record.icons8["url"] == "https://api.icons8.com/process_image"
+    assert "secret-key" not in record.getMessage()
+    assert '{"a": 1}' in record.getMessage()
+
+
+def test_errors_are_logged_even_when_sampled_out(icons8_logger, caplog) -> None:
+    """Error responses bypass sampling and are logged at WARNING."""
+    icons8_logger.setLevel(logging.INFO)
+
+    with caplog.at_level(logging.INFO, logger=icons8_logger.name):
+        log_response(MockSwapResponse({"error": "x"}, status_code=500, url=URL), "Job status check", sample_rate=0)
+        log_response(MockSwapResponse({"id": "1"}, url=URL), "Job status check", sample_rate=0)
+
+    assert [record.levelno for record in caplog.records] == [logging.WARNING]
+
+
+def test_lazy_body_is_size_capped() -> None:
+    """Long bodies are truncated when rendered."""
+    rendered = str(LazyBody(lambda: "x" * 100, limit=10))
+    assert rendered == "xxxxxxxxxx... [90 more chars]"
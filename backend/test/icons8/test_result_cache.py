@@ -0,0 +1,109 @@
+"""Tests for the face swap result cache."""
+
+import asyncio
+
+import pytest
+from discovita.service.icons8.cache import SwapResultCache
+from discovita.service.icons8.icons8_service import Icons8Service
+from discovita.service.icons8.models import FaceSwapResponse, ProcessedImage, ProcessStatus
+from fixtures.content_hash import FakeHasher
+
+pytestmark = pytest.mark.asyncio
+
+SOURCE_URL = "https://example.com/source.jpg"
+TARGET_URL = "https://example.com/target.jpg"
+
+
+class CountingClient:
+    """Client double that counts submitted swap jobs."""
+
+    def __init__(self):
+        self.submissions = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def swap_faces(self, source_url: str, target_url: str) -> FaceSwapResponse:
+        self.submissions += 1
+        await self.release.wait()
+        return FaceSwapResponse(id="job", status=ProcessStatus.QUEUE, status_name="queue")
+
+    async def get_job_status(self, job_id: str) -> FaceSwapResponse:
+        return FaceSwapResponse(
+            id=job_id,
+            status=ProcessStatus.READY,
+            status_name="ready",
+            processed=ProcessedImage(
+                width=800, height=600, type="jpeg", url="https://example.com/result.jpg"
+            ),
+        )
+
+
+def make_service(client: CountingClient, cache: SwapResultCache, digests: dict) -> Icons8Service:
+    service = Icons8Service(client, result_cache=cache, hasher=FakeHasher(digests))
+    service.polling_interval = 0
+    return service
+
+
+async def test_same_content_is_served_from_cache() -> None:
+    """A pair with identical content hashes is only swapped once, even under new URLs."""
+    client = CountingClient()
+    cache = SwapResultCache()
+    digests = {
+        SOURCE_URL: "a",
+        TARGET_URL: "b",
+        "https://cdn.example.com/source-copy.jpg": "a",
+    }
+    service = make_service(client, cache, digests)
+
+    first = await service.swap_faces(SOURCE_URL, TARGET_URL)
+    second = await service.swap_faces("https://cdn.example.com/source-copy.jpg", TARGET_URL)
+
+    assert first == second == {"url": "https://example.com/result.jpg", "status": "complete"}
+    assert client.submissions == 1
+
+
+async def test_different_target_is_not_a_hit() -> None:
+    """The cache key covers both inputs."""
+    client = CountingClient()
+    service = make_service(
+        client,
+        SwapResultCache(),
+        {SOURCE_URL: "a", TARGET_URL: "b", "https://example.com/other.jpg": "c"},
+    )
+
+    await service.swap_faces(SOURCE_URL, TARGET_URL)
+    await service.swap_faces(SOURCE_URL, "https://example.com/other.jpg")
+
+    assert client.submissions == 2
+
+
+async def test_concurrent_duplicates_are_coalesced() -> None:
+    """Identical swaps in flight at the same time share one Icons8 job."""
+    client = CountingClient()
+    client.release.clear()
+    service = make_service(client, SwapResultCache(), {SOURCE_URL: "a", TARGET_URL: "b"})
+
+    swaps = [asyncio.create_task(service.swap_faces(SOURCE_URL, TARGET_URL)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    client.release.set()
+    results = await asyncio.gather(*swaps)
+
+    assert client.submissions == 1
+    assert all(result["status"] == "complete" for result in results)
+
+
+async def test_rehost_replaces_cached_url() -> None:
+    """Processed images are re-hosted before they are cached and returned."""
+    async def rehost(processed):
+        return processed.model_copy(update={"url": "https://bucket.example.com/mirrored.jpg"})
+
+    client = CountingClient()
+    service = make_service(
+        client, SwapResultCache(rehost=rehost), {SOURCE_URL: "a", TARGET_URL: "b"}
+    )
+
+    first = await service.swap_faces(SOURCE_URL, TARGET_URL)
+    second = await service.swap_faces(SOURCE_URL, TARGET_URL)
+
+    assert first["url"] == second["url"] == "https://bucket.example.com/mirrored.jpg"
+    assert client.submissions == 1
@@ -0,0 +1,122 @@
+"""Tests for mirroring expiring URLs into an asset store."""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+from discovita.models import ProcessedImageResult
+from discovita.service.assets import AssetError, AssetMirror, LocalAssetStore
+from discovita.service.assets import mirror as mirror_module
+
+pytestmark = pytest.mark.asyncio
+
+ASSETS_URL = "https://assets.example.com"
+IMAGE = b"\x89PNG generated image"
+
+
+class ImageHost:
+    """Transport serving images and counting requests per URL."""
+
+    def __init__(self):
+        self.requests = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(str(request.url))
+        await self.release.wait()
+        if request.url.path == "/missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200, content=IMAGE, headers={"content-type": "image/png"})
+
+
+@pytest.fixture
+def host() -> ImageHost:
+    return ImageHost()
+
+
+@pytest.fixture
+def store(tmp_path) -> LocalAssetStore:
+    return LocalAssetStore(str(tmp_path), base_url=ASSETS_URL)
+
+
+@pytest.fixture
+def mirror(store, host) -> AssetMirror:
+    return AssetMirror(store, http_client=httpx.AsyncClient(transport=httpx.MockTransport(host)))
+
+
+async def test_mirror_stores_content_under_its_hash(mirror, store) -> None:
+    asset = await mirror.mirror("https://dalle.example.com/a.png?sig=1")
+
+    assert asset.url == f"{ASSETS_URL}/{asset.sha256}.png"
+    assert asset.content_type == "image/png"
+    with open(os.path.join(store.directory, f"{asset.sha256}.png"), "rb") as f:
+        assert f.read() == IMAGE
+
+
+async def test_concurrent_mirrors_of_a_url_share_one_download(mirror, host) -> None:
+    host.release.clear()
+    mirrors = [asyncio.create_task(mirror.mirror("https://dalle.example.com/a.png")) for _ in range(3)]
+    await asyncio.sleep(0)
+    host.release.set()
+    assets = await asyncio.gather(*mirrors)
+
+    assert len({asset.url for asset in assets}) == 1
+    assert host.requests == ["https://dalle.example.com/a.png"]
+
+    await mirror.mirror("https://dalle.example.com/a.png")
+    assert len(host.requests) == 1
+
+
+async def test_same_content_under_two_urls_is_stored_once(mirror, store) -> None:
+    first = await mirror.mirror("https://dalle.example.com/a.png")
+    second = await mirror.mirror("https://icons8.example.com/b.png")
+
+    assert first.url == second.url
+    assert os.listdir(store.directory) == [f"{first.sha256}.png"]
+
+
+async def test_oversized_download_is_rejected(mirror, store, monkeypatch) -> None:
+    monkeypatch.setattr(mirror_module, "MAX_ASSET_BYTES", 4)
+
+    with pytest.raises(AssetError) as exc_info:
+        await mirror.mirror("https://dalle.example.com/a.png")
+
+    assert exc_info.value.status_code == 413
+    assert not os.path.exists(store.directory) or os.listdir(store.directory) == []
+
+
+async def test_stable_url_falls_back_to_the_original(mirror) -> None:
+    url = "https://dalle.example.com/missing.png"
+    assert await mirror.stable_url(url) == url
+
+
+async def test_store_failures_are_asset_errors(host) -> None:
+    """A failing store does not break callers that can use the original URL."""
+    class FailingStore(LocalAssetStore):
+        def put(self, fileobj, sha256, content_type):
+            raise ClientError({"Error": {"Code": "AccessDenied"}}, "PutObject")
+
+    mirror = AssetMirror(
+        FailingStore("unused"), http_client=httpx.AsyncClient(transport=httpx.MockTransport(host))
+    )
+    url = "https://dalle.example.com/a.png"
+
+    with pytest.raises(AssetError) as exc_info:
+        await mirror.mirror(url)
+    assert exc_info.value.status_code == 502
+    assert await mirror.stable_url(url) == url
+
+
+async def test_rehost_points_swap_result_at_the_mirror(mirror) -> None:
+    processed = ProcessedImageResult(
+        width=1024, height=1024, type="jpeg", url="https://icons8.example.com/result.jpg"
+    )
+
+    rehosted = await mirror.rehost(processed)
+
+    assert str(rehosted.url).startswith(ASSETS_URL)
+    assert rehosted.width == 1024
+
@@ -0,0 +1,26 @@
+"""Tests for the local asset store."""
+
+import os
+
+from discovita.service.assets import LocalAssetStore
+
+IMAGE = b"\x89PNG generated image"
+
+
+def test_local_store_without_base_url_returns_paths(tmp_path) -> None:
+    asset = LocalAssetStore(str(tmp_path / "assets")).put_bytes(IMAGE, "image/png")
+
+    assert asset.url == str(tmp_path / "assets" / f"{asset.sha256}.png")
+    assert os.listdir(tmp_path / "assets") == [f"{asset.sha256}.png"]
+
+
+def test_storing_the_same_content_twice_keeps_one_file(tmp_path) -> None:
+    store = LocalAssetStore(str(tmp_path), base_url="https://assets.example.com/")
+
+    first = store.put_bytes(IMAGE, "image/png")
+    second = store.put_bytes(IMAGE, "image/png")
+    other = store.put_bytes(b"another image", "image/jpeg")
+
+    assert first == second
+    assert first.url == f"https://assets.example.com/{first.sha256}.png"
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{first.sha256}.png", f"{other.sha256}.jpg"])
@@ -0,0 +1,176 @@
+"""Tests for coach hooks and background identity image generation."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from discovita.api.routes import coach as coach_routes
+from discovita.service.coach.hooks import CoachStateHook
+from discovita.service.coach.models import (
+    CoachState,
+    CoachingState,
+    Identity,
+    Message,
+    UserProfile,
+)
+from discovita.service.coach.models.action import Action, ActionType, Param
+from discovita.service.coach.models.identity import IdentityCategory
+from discovita.service.coach.models.llm import CoachLLMResponse
+from discovita.service.coach.models.state import IdentityState
+from discovita.service.coach.pregeneration import (
+    IdentityImagePregenerator,
+    IdentityImageStore,
+)
+from discovita.service.coach.prompt.manager import PromptManager
+from discovita.service.coach.service import CoachService
+from discovita.service.openai.core.base import OpenAIService
+from discovita.service.pipeline import PipelineEvent
+from discovita.utils.background import BackgroundTaskSet
+
+pytestmark = pytest.mark.asyncio
+
+IDENTITY_ID = "identity-1"
+HEADSHOT_URL = "https://example.com/headshot.jpg"
+
+
+def make_state(identity_state: IdentityState, **metadata) -> CoachState:
+    return CoachState(
+        current_state=CoachingState.IDENTITY_REFINEMENT,
+        user_profile=UserProfile(name="Sam"),
+        identities=[Identity(
+            id=IDENTITY_ID,
+            description="Creative Visionary",
+            state=identity_state,
+            category=IdentityCategory.PASSIONS,
+        )],
+        conversation_history=[Message(role="coach", content="Welcome!")],
+        metadata=metadata,
+    )
+
+
+def make_coach(*actions: Action) -> CoachService:
+    open_ai_service = MagicMock(spec=OpenAIService)
+    parsed = CoachLLMResponse(message="Well done!", actions=list(actions))
+    open_ai_service.create_structured_chat_completion.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))]
+    )
+    prompt_manager = MagicMock(spec=PromptManager)
+    prompt_manager.get_prompt.return_value = "system prompt"
+    return CoachService(open_ai_service, prompt_manager)
+
+
+def complete_refinement() -> Action:
+    return Action(
+        type=ActionType.ACCEPT_IDENTITY_REFINEMENT,
+        params=[Param(name="id", value=IDENTITY_ID)],
+    )
+
+
+class FakePipeline:
+    """Pipeline double that finishes when released."""
+
+    def __init__(self):
+        self.requests = []
+        self.release = asyncio.Event()
+
+    async def run(self, request):
+        self.requests.append(request)
+        await self.release.wait()
+        yield PipelineEvent(event="result", data={
+            "url": "https://example.com/swapped.jpg",
+            "sceneUrl": "https://example.com/scene.png",
+            "augmentedPrompt": "A person in a studio",
+        })
+
+
+class FakeMirror:
+    async def stable_url(self, url: str) -> str:
+        return "https://assets.example.com/scene.png"
+
+
+class RecordingHook(CoachStateHook):
+    def __init__(self):
+        self.transitions = []
+
+    def on_identity_transition(self, transition, state) -> None:
+        self.transitions.append((transition.identity.id, transition.previous, transition.identity.state))
+
+
+async def test_hooks_see_identity_transitions() -> None:
+    hook = RecordingHook()
+    coach = make_coach(complete_refinement())
+
+    await coach.process_message("I love it", make_state(IdentityState.ACCEPTED), hooks=[hook])
+
+    assert hook.transitions == [
+        (IDENTITY_ID, IdentityState.ACCEPTED, IdentityState.REFINEMENT_COMPLETE)
+    ]
+
+
+async def test_failing_hook_does_not_fail_the_message() -> None:
+    class BrokenHook(CoachStateHook):
+        def on_response(self, state) -> None:
+            raise RuntimeError("boom")
+
+    coach = make_coach()
+
+    result = await coach.process_message("Hi", make_state(IdentityState.ACCEPTED), hooks=[BrokenHook()])
+
+    assert result.message == "Well done!"
+
+
+async def test_pipeline_is_only_built_when_pregeneration_is_enabled(monkeypatch) -> None:
+    async def build_identity_pipeline(settings):
+        raise AssertionError("the pipeline should not be built")
+
+    monkeypatch.setattr(coach_routes, "build_identity_pipeline", build_identity_pipeline)
+    settings = SimpleNamespace(coach_pregenerate_images=False)
+
+    assert await coach_routes.get_coach_hooks(settings, IdentityImageStore()) == []
+
+
+async def test_completed_refinement_is_swapped_in_background() -> None:
+    pipeline = FakePipeline()
+    store = IdentityImageStore()
+    tasks = BackgroundTaskSet()
+    hooks = [IdentityImagePregenerator(pipeline, store, tasks)]
+    coach = make_coach(complete_refinement())
+    state = make_state(IdentityState.ACCEPTED, headshot_url=HEADSHOT_URL)
+
+    result = await coach.process_message("I love it", state, hooks=hooks)
+
+    assert result.state.metadata["identity_images"][IDENTITY_ID]["status"] == "pending"
+    assert len(tasks) == 1
+
+    pipeline.release.set()
+    await asyncio.sleep(0.01)
+
+    image = store.get(IDENTITY_ID)
+    assert image.status == "ready"
+    assert image.imageUrl == "https://example.com/swapped.jpg"
+    assert str(pipeline.requests[0].headshot_url) == HEADSHOT_URL
+    assert "Creative Visionary" in pipeline.requests[0].setting
+
+    # The next response carries the finished image, and nothing is regenerated
+    result = await make_coach().process_message("Thanks", result.state, hooks=hooks)
+    assert result.state.metadata["identity_images"][IDENTITY_ID]["status"] == "ready"
+    assert len(pipeline.requests) == 1
+
+
+async def test_without_headshot_only_the_scene_is_generated(generation_service) -> None:
+    pipeline = FakePipeline()
+    pipeline.generation_service = generation_service
+    pipeline.mirror = FakeMirror()
+    store = IdentityImageStore()
+    pregenerator = IdentityImagePregenerator(pipeline, store, BackgroundTaskSet())
+
+    await make_coach(complete_refinement()).process_message(
+        "Done", make_state(IdentityState.ACCEPTED), hooks=[pregenerator]
+    )
+    await asyncio.sleep(0.01)
+
+    assert pipeline.requests == []
+    image = store.get(IDENTITY_ID)
+    assert image.status == "ready"
+    assert image.imageUrl == "https://assets.example.com/scene.png"
@@ -0,0 +1,118 @@
+"""Tests for upload image normalization."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from discovita.service.imaging import (
+    ImageError,
+    ImageNormalizer,
+    normalize_image,
+    sniff_image_type,
+)
+
+pytestmark = pytest.mark.asyncio
+
+EXIF_ORIENTATION = 0x0112
+
+
+def encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def decode(content: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(content))
+
+
+@pytest.mark.parametrize(
+    "fmt, content_type",
+    [("JPEG", "image/jpeg"), ("PNG", "image/png"), ("WEBP", "image/webp"), ("GIF", "image/gif")],
+)
+async def test_sniffs_supported_formats(fmt: str, content_type: str) -> None:
+    content = encode(Image.new("RGB", (4, 4)), fmt)
+    assert sniff_image_type(content[:16]) == content_type
+
+
+async def test_rejects_non_images_by_content() -> None:
+    """A text file is rejected no matter what it claims to be."""
+    assert sniff_image_type(b"<html><body>hi") is None
+    with pytest.raises(ImageError) as exc_info:
+        normalize_image(b"<html><body>hi</body></html>")
+    assert exc_info.value.status_code == 415
+
+
+async def test_truncated_image_is_rejected() -> None:
+    content = encode(Image.new("RGB", (64, 64), "red"), "PNG")
+    with pytest.raises(ImageError) as exc_info:
+        normalize_image(content[:40])
+    assert exc_info.value.status_code == 415
+
+
+async def test_downscales_and_reencodes() -> None:
+    """Large images are fit into the maximum dimension and stored as JPEG."""
+    content = encode(Image.new("RGB", (3000, 1500), "blue"), "PNG")
+
+    normalized = normalize_image(content, max_dimension=1000)
+
+    assert (normalized.width, normalized.height) == (1000, 500)
+    assert normalized.content_type == "image/jpeg"
+    assert normalized.extension == ".jpg"
+    assert decode(normalized.content).size == (1000, 500)
+    assert normalized.original_size == len(content)
+
+
+async def test_applies_exif_orientation_and_drops_metadata() -> None:
+    """Rotated photos are stored upright, without the EXIF block."""
+    image = Image.new("RGB", (200, 100), "green")
+    exif = image.getexif()
+    exif[EXIF_ORIENTATION] = 6  # rotate 90 degrees clockwise on display
+    content = encode(image, "JPEG", exif=exif)
+
+    normalized = normalize_image(content)
+
+    result = decode(normalized.content)
+    assert result.size == (100, 200)
+    assert EXIF_ORIENTATION not in result.getexif()
+
+
+async def test_transparency_is_flattened_for_jpeg_and_kept_for_webp() -> None:
+    content = encode(Image.new("RGBA", (10, 10), (255, 0, 0, 0)), "PNG")
+
+    jpeg = decode(normalize_image(content).content)
+    webp = decode(normalize_image(content, output_format="WEBP").content)
+
+    assert jpeg.mode == "RGB"
+    assert jpeg.getpixel((5, 5))[:3] == (255, 255, 255)
+    assert webp.mode == "RGBA"
+
+
+async def test_normalizer_runs_in_worker_process() -> None:
+    """Results and errors both come back from the process pool."""
+    normalizer = ImageNormalizer(max_dimension=50, max_workers=1)
+    try:
+        normalized = await normalizer.normalize(encode(Image.new("RGB", (400, 200)), "PNG"))
+        assert (normalized.width, normalized.height) == (50, 25)
+
+        with pytest.raises(ImageError) as exc_info:
+            await normalizer.normalize(b"not an image at all")
+        assert exc_info.value.status_code == 415
+    finally:
+        normalizer.close()
+
+
+async def test_normalizer_reads_from_file_path(tmp_path) -> None:
+    """A path is opened by the worker; the original is not passed to it."""
+    path = tmp_path / "upload"
+    content = encode(Image.new("RGB", (400, 200)), "PNG")
+    path.write_bytes(content)
+    normalizer = ImageNormalizer(max_dimension=50, max_workers=1)
+    try:
+        normalized = await normalizer.normalize(str(path))
+    finally:
+        normalizer.close()
+
+    assert (normalized.width, normalized.height) == (50, 25)
+    assert normalized.original_size == len(content)
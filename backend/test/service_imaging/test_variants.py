@@ -0,0 +1,150 @@
+"""Tests for resized image variants."""
+
+import asyncio
+import io
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from discovita.api.routes import images
+from discovita.service.imaging import ImageError, VariantService, render_variant
+from discovita.utils.disk_cache import DiskLRUCache
+
+pytestmark = pytest.mark.asyncio
+
+HOST = "bucket.s3.us-east-1.amazonaws.com"
+SOURCE_URL = f"https://{HOST}/uploads/abc.jpg"
+
+
+def source_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), "orange").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class InlineNormalizer:
+    """Renders in the calling process and counts renders."""
+
+    def __init__(self):
+        self.renders = 0
+
+    async def render_variant(self, content, width, output_format, quality):
+        self.renders += 1
+        await asyncio.sleep(0)
+        return render_variant(content, width, output_format, quality)
+
+
+def make_service(tmp_path, downloads: list) -> VariantService:
+    content = source_image()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        downloads.append(str(request.url))
+        if request.url.path.endswith("missing.jpg"):
+            return httpx.Response(404)
+        if request.url.path.endswith("redirect.jpg"):
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return httpx.Response(200, content=content)
+
+    return VariantService(
+        normalizer=InlineNormalizer(),
+        cache=DiskLRUCache(str(tmp_path), max_bytes=10 * 1024 * 1024),
+        allowed_hosts=[HOST],
+        http_client=httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), follow_redirects=True
+        ),
+    )
+
+
+async def test_renders_width_and_format(tmp_path) -> None:
+    service = make_service(tmp_path, [])
+
+    variant = await service.get_variant(SOURCE_URL, 320, "webp")
+
+    assert variant.content_type == "image/webp"
+    image = Image.open(io.BytesIO(variant.content))
+    assert (image.format, image.size) == ("WEBP", (320, 213))
+
+
+async def test_second_request_is_served_from_disk(tmp_path) -> None:
+    downloads = []
+    service = make_service(tmp_path, downloads)
+
+    first = await service.get_variant(SOURCE_URL, 160, "jpeg")
+    second = await service.get_variant(SOURCE_URL, 160, "jpeg")
+
+    assert second.content == first.content
+    assert second.etag == first.etag
+    assert len(downloads) == 1
+
+
+async def test_concurrent_requests_share_one_render(tmp_path) -> None:
+    downloads = []
+    service = make_service(tmp_path, downloads)
+
+    results = await asyncio.gather(*(service.get_variant(SOURCE_URL, 640, "webp") for _ in range(5)))
+
+    assert len({result.content for result in results}) == 1
+    assert len(downloads) == 1
+    assert service.normalizer.renders == 1
+
+
+async def test_small_images_are_not_upscaled(tmp_path) -> None:
+    service = make_service(tmp_path, [])
+    variant = await service.get_variant(SOURCE_URL, 1600, "jpeg")
+    assert Image.open(io.BytesIO(variant.content)).size == (1200, 800)
+
+
+@pytest.mark.parametrize(
+    "url, width, fmt",
+    [
+        ("https://evil.example.com/a.jpg", 320, "webp"),
+        (f"http://{HOST}/uploads/abc.jpg", 320, "webp"),
+        (SOURCE_URL, 333, "webp"),
+        (SOURCE_URL, 320, "gif"),
+    ],
+)
+async def test_rejects_unserved_variants(tmp_path, url: str, width: int, fmt: str) -> None:
+    downloads = []
+    service = make_service(tmp_path, downloads)
+    with pytest.raises(ImageError) as exc_info:
+        await service.get_variant(url, width, fmt)
+    assert exc_info.value.status_code == 400
+    assert downloads == []
+
+
+async def test_missing_source_is_not_found(tmp_path) -> None:
+    service = make_service(tmp_path, [])
+    with pytest.raises(ImageError) as exc_info:
+        await service.get_variant(f"https://{HOST}/uploads/missing.jpg", 320, "webp")
+    assert exc_info.value.status_code == 404
+
+
+async def test_route_sets_etag_and_honours_if_none_match(tmp_path) -> None:
+    service = make_service(tmp_path, [])
+    app = FastAPI()
+    app.include_router(images.router)
+    app.dependency_overrides[images.get_variants] = lambda: service
+    client = TestClient(app)
+    params = {"url": SOURCE_URL, "width": 320, "format": "jpeg"}
+
+    response = client.get("/images/variant", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    etag = response.headers["etag"]
+
+    cached = client.get("/images/variant", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+async def test_redirects_off_allowed_hosts_are_not_followed(tmp_path) -> None:
+    downloads = []
+    service = make_service(tmp_path, downloads)
+    url = f"https://{HOST}/uploads/redirect.jpg"
+    with pytest.raises(ImageError) as exc_info:
+        await service.get_variant(url, 320, "webp")
+    assert exc_info.value.status_code == 502
+    assert downloads == [url]
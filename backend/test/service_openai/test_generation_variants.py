@@ -0,0 +1,79 @@
+"""Tests for concurrent scene variant generation."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from discovita.service.openai.core.image_generation import ImageGenerationService
+
+pytestmark = pytest.mark.asyncio
+
+SCENE = {"setting": "a beach", "outfit": "linen", "emotion": "calm"}
+
+
+class FakeOpenAIService:
+    """OpenAI double that tracks how many generations run at once."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate_image(self, prompt: str, **kwargs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.prompts.append(prompt)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return [{"url": f"https://example.com/{call}.png", "revised_prompt": "revised"}]
+
+
+async def test_variants_share_one_prompt_and_run_concurrently() -> None:
+    open_ai_service = FakeOpenAIService()
+    service = ImageGenerationService(open_ai_service, slots=asyncio.Semaphore(4))
+
+    results = [item async for item in service.generate_scene_variants(3, **SCENE)]
+
+    assert sorted(index for index, _ in results) == [0, 1, 2]
+    assert all(response.success for _, response in results)
+    assert len({response.data.data[0].url for _, response in results}) == 3
+    assert len(set(open_ai_service.prompts)) == 1
+    assert open_ai_service.max_running == 3
+
+
+async def test_variants_respect_generation_slots() -> None:
+    """Variants never exceed the shared concurrency limit."""
+    open_ai_service = FakeOpenAIService()
+    service = ImageGenerationService(open_ai_service, slots=asyncio.Semaphore(2))
+
+    results = [item async for item in service.generate_scene_variants(4, **SCENE)]
+
+    assert len(results) == 4
+    assert open_ai_service.max_running == 2
+
+
+async def test_closing_early_cancels_variants_not_started() -> None:
+    open_ai_service = FakeOpenAIService()
+    service = ImageGenerationService(open_ai_service, slots=asyncio.Semaphore(1))
+
+    variants = service.generate_scene_variants(4, **SCENE)
+    await variants.__anext__()
+    await variants.aclose()
+    await asyncio.sleep(0.2)
+
+    assert open_ai_service.calls < 4
+
+
+async def test_variant_count_is_bounded() -> None:
+    service = ImageGenerationService(FakeOpenAIService())
+
+    with pytest.raises(ValueError):
+        await service.generate_scene_variants(5, **SCENE).__anext__()
@@ -0,0 +1,100 @@
+"""Tests for cached headshot descriptions."""
+
+import asyncio
+import threading
+
+import pytest
+from discovita.service.openai.core.description_cache import DescriptionCache
+from discovita.service.openai.core.image_description import ImageDescriptionService
+from fixtures.content_hash import FakeHasher
+
+pytestmark = pytest.mark.asyncio
+
+IMAGE_URL = "https://example.com/headshot.jpg"
+COPY_URL = "https://example.com/copy-of-headshot.jpg"
+OTHER_URL = "https://example.com/other.jpg"
+
+
+class FakeOpenAIService:
+    """OpenAI double that counts vision calls and blocks until released."""
+
+    def __init__(self):
+        self.vision_calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def describe_image_with_vision(self, image_url: str, prompt: str) -> str:
+        self.vision_calls += 1
+        self.release.wait(timeout=5)
+        return f"raw description of {image_url}"
+
+    def create_chat_completion(self, messages, model: str) -> str:
+        if "other" in messages[0]["content"]:
+            raise RuntimeError("Vision failed")
+        return " clean description\n"
+
+
+def make_service(open_ai_service: FakeOpenAIService) -> ImageDescriptionService:
+    hasher = FakeHasher({IMAGE_URL: "a" * 64, COPY_URL: "a" * 64, OTHER_URL: "b" * 64})
+    return ImageDescriptionService(open_ai_service, cache=DescriptionCache(), hasher=hasher)
+
+
+async def test_same_content_is_described_once() -> None:
+    """The same image under another URL is served from the cache."""
+    open_ai_service = FakeOpenAIService()
+    service = make_service(open_ai_service)
+
+    assert await service.get_clean_description(IMAGE_URL) == "clean description"
+    assert await service.get_clean_description(COPY_URL) == "clean description"
+    assert open_ai_service.vision_calls == 1
+
+
+async def test_concurrent_requests_share_one_description() -> None:
+    """A precompute and a client request in flight together make one model call."""
+    open_ai_service = FakeOpenAIService()
+    open_ai_service.release.clear()
+    service = make_service(open_ai_service)
+
+    requests = [asyncio.create_task(service.get_clean_description(IMAGE_URL)) for _ in range(3)]
+    # The event loop keeps running while the model call blocks in a thread.
+    await asyncio.sleep(0.05)
+    open_ai_service.release.set()
+
+    assert await asyncio.gather(*requests) == ["clean description"] * 3
+    assert open_ai_service.vision_calls == 1
+
+
+async def test_without_cache_every_call_is_described() -> None:
+    open_ai_service = FakeOpenAIService()
+    service = ImageDescriptionService(open_ai_service)
+
+    await service.get_clean_description(IMAGE_URL)
+    await service.get_clean_description(IMAGE_URL)
+    assert open_ai_service.vision_calls == 2
+
+
+async def test_batch_describes_each_image_once() -> None:
+    """Duplicate URLs and copies of the same image share one description."""
+    open_ai_service = FakeOpenAIService()
+    service = make_service(open_ai_service)
+
+    results = [
+        result async for result in service.describe_batch([IMAGE_URL, COPY_URL, IMAGE_URL])
+    ]
+
+    assert sorted(result.image_url for result in results) == [COPY_URL, IMAGE_URL]
+    assert all(result.description == "clean description" for result in results)
+    assert open_ai_service.vision_calls == 1
+
+
+async def test_batch_serves_cache_hits_first_and_reports_errors() -> None:
+    open_ai_service = FakeOpenAIService()
+    service = make_service(open_ai_service)
+    await service.get_clean_description(IMAGE_URL)
+
+    results = [result async for result in service.describe_batch([OTHER_URL, COPY_URL])]
+
+    assert results[0].image_url == COPY_URL and results[0].cached
+    assert results[1].image_url == OTHER_URL
+    assert results[1].description is None
+    assert results[1].error == "Vision failed"
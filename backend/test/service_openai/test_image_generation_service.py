@@ -1,13 +1,11 @@
 """Tests for ImageGenerationService in OpenAI service."""
 
-import time
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 from discovita.service.openai.core.base import OpenAIService
 from discovita.service.openai.core.image_generation import ImageGenerationService
 from discovita.service.openai.models.image_models import (
-    GeneratedImage,
     ImageResponse,
     SafeImageResponse,
 )
@@ -22,49 +20,7 @@ class TestImageGenerationService:
         self.mock_client = MagicMock(spec=OpenAIService)
 
         # Create image generation service with mock client
-        self.service = ImageGenerationService(client=self.mock_client)
-
-        # Patch the ImageResponse and SafeImageResponse creation in the service
-        # so we can test the logic without validation errors
-        patch_target = "discovita.service.openai.core.image_generation.ImageResponse"
-        self.image_response_patcher = patch(patch_target)
-        self.mock_image_response = self.image_response_patcher.start()
-
-        # Make the mock return a properly configured ImageResponse
-        def mock_image_response_side_effect(**kwargs):
-            # Create a proper image response with all required fields
-            generated_image = GeneratedImage(
-                url=kwargs.get("url", ""),
-                revised_prompt=kwargs.get("revised_prompt", ""),
-            )
-            return ImageResponse(created=int(time.time()), data=[generated_image])
-
-        self.mock_image_response.side_effect = mock_image_response_side_effect
-
-        # Also patch SafeImageResponse
-        safe_patch_target = (
-            "discovita.service.openai.core.image_generation.SafeImageResponse"
-        )
-        self.safe_image_patcher = patch(safe_patch_target)
-        self.mock_safe_image_response = self.safe_image_patcher.start()
-
-        # Make the mock return a properly configured SafeImageResponse
-        def mock_safe_image_side_effect(**kwargs):
-            # Create a proper safe image response with all required fields
-            return SafeImageResponse(
-                success=kwargs.get("success", False),
-                url=kwargs.get("url", ""),
-                revised_prompt=kwargs.get("revised_prompt", ""),
-                error=kwargs.get("error", None),
-                original_prompt="Test prompt",  # Required field
-            )
-
-        self.mock_safe_image_response.side_effect = mock_safe_image_side_effect
-
-    def teardown_method(self):
-        """Clean up after tests."""
-        self.image_response_patcher.stop()
-        self.safe_image_patcher.stop()
+        self.service = ImageGenerationService(self.mock_client)
 
     def test_generate_scene_basic(self):
         """Test basic scene generation with minimal parameters."""
@@ -95,11 +51,8 @@ class TestImageGenerationService:
         assert "casual clothes" in call_args["prompt"]
         assert "happiness" in call_args["prompt"]
 
-        # Verify the mock was called correctly
-        self.mock_image_response.assert_called_once()
-        image_args = self.mock_image_response.call_args[1]
-        assert image_args["url"] == "https://example.com/generated-image.jpg"
-        assert "happiness" in image_args["revised_prompt"]
+        assert result.data[0].url == "https://example.com/generated-image.jpg"
+        assert "happiness" in result.data[0].revised_prompt
 
     def test_generate_scene_with_user_description(self):
         """Test scene generation with user description included."""
@@ -124,10 +77,8 @@ class TestImageGenerationService:
         call_args = self.mock_client.generate_image.call_args[1]
         assert "blonde hair" in call_args["prompt"]
 
-        # Verify the mock was called correctly
-        image_args = self.mock_image_response.call_args[1]
-        assert image_args["url"] == "https://example.com/generated-image.jpg"
-        assert "blonde hair" in image_args["revised_prompt"]
+        assert result.data[0].url == "https://example.com/generated-image.jpg"
+        assert "blonde hair" in result.data[0].revised_prompt
 
     def test_generate_scene_with_feedback(self):
         """Test scene generation with user feedback and previous prompt."""
@@ -153,10 +104,8 @@ class TestImageGenerationService:
         call_args = self.mock_client.generate_image.call_args[1]
         assert "IMPORTANT REQUIREMENTS FROM USER" in call_args["prompt"]
         assert "Make the mountains more snowy" in call_args["prompt"]
-        assert (
-            "previous_augmented_prompt"
-            in self.service.generate_scene.__code__.co_varnames
-        )
+        assert "A photo of a person in a mountain setting." in call_args["prompt"]
+        assert result.data[0].revised_prompt == "An improved photo incorporating user feedback."
 
     def test_generate_scene_empty_result(self):
         """Test handling of empty result from generate_image."""
@@ -171,11 +120,7 @@ class TestImageGenerationService:
         # Validate empty result handling
         assert isinstance(result, ImageResponse)
 
-        # Verify the mock was called for empty response
-        self.mock_image_response.assert_called_once()
-        image_args = self.mock_image_response.call_args[1]
-        assert image_args["url"] == ""
-        assert image_args["revised_prompt"] == ""
+        assert result.data == []
 
     def test_safe_generate_scene_success(self):
         """Test safe_generate_scene with successful generation."""
@@ -196,12 +141,11 @@ class TestImageGenerationService:
         # Validate result
         assert isinstance(result, SafeImageResponse)
 
-        # Verify the mock was called correctly
-        safe_args = self.mock_safe_image_response.call_args[1]
-        assert safe_args["success"] is True
-        assert safe_args["url"] == "https://example.com/safe-image.jpg"
-        assert safe_args["revised_prompt"] == "A safe image as requested."
-        assert safe_args["error"] is None
+        assert result.success is True
+        assert result.data.data[0].url == "https://example.com/safe-image.jpg"
+        assert result.data.data[0].revised_prompt == "A safe image as requested."
+        assert result.error is None
+        assert "library" in result.original_prompt
 
     def test_safe_generate_scene_empty_result(self):
         """Test safe_generate_scene with empty result."""
@@ -216,12 +160,9 @@ class TestImageGenerationService:
         # Validate result
         assert isinstance(result, SafeImageResponse)
 
-        # Verify the mock was called correctly
-        safe_args = self.mock_safe_image_response.call_args[1]
-        assert safe_args["success"] is False
-        assert safe_args["url"] == ""
-        assert safe_args["revised_prompt"] == ""
-        assert safe_args["error"] == "No image was generated"
+        assert result.success is False
+        assert result.data is None
+        assert result.error == "No image was generated"
 
     def test_safe_generate_scene_error_handling(self):
         """Test error handling in safe_generate_scene."""
@@ -236,9 +177,6 @@ class TestImageGenerationService:
         # Validate error handling
         assert isinstance(result, SafeImageResponse)
 
-        # Verify the mock was called correctly
-        safe_args = self.mock_safe_image_response.call_args[1]
-        assert safe_args["success"] is False
-        assert safe_args["url"] == ""
-        assert safe_args["revised_prompt"] == ""
-        assert safe_args["error"] == "API error"
+        assert result.success is False
+        assert result.data is None
+        assert result.error == "API error"
@@ -0,0 +1,118 @@
+"""Tests for prompt safety screening and content-policy retries."""
+
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+from discovita.models import RenderMode
+from discovita.service.openai.core.base import OpenAIService
+from discovita.service.openai.core.image_generation import ImageGenerationService
+from discovita.service.openai.core.prompt_safety import (
+    CleanedPromptCache,
+    is_content_policy_violation,
+    screen_prompt,
+)
+
+IMAGE = {"url": "https://example.com/image.png", "revised_prompt": "A calm person"}
+
+
+def policy_error() -> openai.BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/images/generations")
+    return openai.BadRequestError(
+        "Your request was rejected as a result of our safety system.",
+        response=httpx.Response(400, request=request),
+        body={"code": "content_policy_violation"},
+    )
+
+
+def make_service(*generate_results) -> ImageGenerationService:
+    open_ai_service = MagicMock(spec=OpenAIService)
+    open_ai_service.generate_image.side_effect = list(generate_results)
+    open_ai_service.create_chat_completion.return_value = "  A calm person at a range  "
+    return ImageGenerationService(open_ai_service, prompt_cache=CleanedPromptCache())
+
+
+def generated_prompts(service: ImageGenerationService) -> list:
+    return [call[1]["prompt"] for call in service.open_ai_service.generate_image.call_args_list]
+
+
+def test_screen_prompt_reports_categories() -> None:
+    assert screen_prompt("A person holding a Gun, covered in blood") == ["violence"]
+    assert screen_prompt("A person in a sunny park") == []
+    # Whole words only
+    assert screen_prompt("A person at a gunnery museum") == []
+
+
+def test_policy_errors_are_recognized() -> None:
+    assert is_content_policy_violation(policy_error())
+    assert not is_content_policy_violation(RuntimeError("safety system"))
+
+
+def test_clean_prompt_is_generated_unchanged() -> None:
+    service = make_service([IMAGE])
+
+    response = service._safe_generate("A person in a sunny park", RenderMode.DRAFT)
+
+    assert response.success
+    assert not response.safety_violation
+    assert response.cleaned_prompt is None
+    assert generated_prompts(service) == ["A person in a sunny park"]
+    service.open_ai_service.create_chat_completion.assert_not_called()
+
+
+def test_risky_prompt_is_rewritten_before_the_first_attempt() -> None:
+    service = make_service([IMAGE])
+
+    response = service._safe_generate("A person holding a gun", RenderMode.DRAFT)
+
+    assert response.success
+    assert response.safety_violation
+    assert response.cleaned_prompt == "A calm person at a range"
+    assert generated_prompts(service) == ["A calm person at a range"]
+
+
+def test_rejected_prompt_is_retried_once_and_cached() -> None:
+    service = make_service(policy_error(), [IMAGE], [IMAGE])
+
+    first = service._safe_generate("A person at a protest", RenderMode.DRAFT)
+    second = service._safe_generate("a person  at a PROTEST", RenderMode.DRAFT)
+
+    assert first.success and second.success
+    assert first.cleaned_prompt == second.cleaned_prompt == "A calm person at a range"
+    assert generated_prompts(service) == [
+        "A person at a protest",
+        "A calm person at a range",
+        "A calm person at a range",
+    ]
+    service.open_ai_service.create_chat_completion.assert_called_once()
+
+
+def test_rejected_rewrite_is_not_retried_again() -> None:
+    service = make_service(policy_error(), policy_error())
+
+    response = service._safe_generate("A person at a protest", RenderMode.DRAFT)
+
+    assert not response.success
+    assert response.safety_violation
+    assert service.open_ai_service.generate_image.call_count == 2
+
+
+def test_other_errors_are_not_retried() -> None:
+    service = make_service(RuntimeError("timeout"))
+
+    response = service._safe_generate("A person in a sunny park", RenderMode.DRAFT)
+
+    assert not response.success
+    assert not response.safety_violation
+    assert response.error == "timeout"
+    service.open_ai_service.create_chat_completion.assert_not_called()
+
+
+def test_empty_result_is_not_a_safety_violation() -> None:
+    service = make_service([])
+
+    response = service._safe_generate("A person holding a gun", RenderMode.DRAFT)
+
+    assert not response.success
+    assert not response.safety_violation
+    assert response.error == "No image was generated"
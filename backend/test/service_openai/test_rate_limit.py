@@ -0,0 +1,186 @@
+"""Tests for client-side rate limiting of OpenAI requests."""
+
+import json
+import threading
+import time
+
+import httpx
+from discovita.service.openai.core.rate_limit import (
+    Priority,
+    RateLimitedTransport,
+    RateLimitScheduler,
+    TokenBucket,
+    request_priority,
+)
+from discovita.service.openai.core.rate_limit.http import UPSTREAM
+from discovita.service.openai.core.rate_limit.transport import (
+    estimate_request,
+    parse_duration,
+    retry_delay,
+)
+
+CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def chat_request(content: str = "Hello", **body) -> httpx.Request:
+    body = {"model": "gpt-4o", "messages": [{"role": "user", "content": content}], **body}
+    return httpx.Request("POST", CHAT_URL, content=json.dumps(body).encode())
+
+
+def test_bucket_refills_over_its_period() -> None:
+    bucket = TokenBucket(capacity=60, period=60)
+
+    bucket.take(60, now=0)
+
+    assert bucket.wait_time(1, now=0) == 1.0
+    assert bucket.wait_time(30, now=10) == 20.0
+    assert bucket.wait_time(30, now=30) == 0.0
+
+
+def test_bucket_follows_reported_limits() -> None:
+    bucket = TokenBucket(capacity=100)
+
+    bucket.observe(limit=10, remaining=0, now=0)
+
+    assert bucket.capacity == 10
+    assert bucket.wait_time(1, now=0) == 6.0
+
+
+def test_blocked_model_waits_for_the_server_delay() -> None:
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(clock=clock)
+
+    scheduler.block("gpt-4o", 5)
+
+    assert scheduler._limits("gpt-4o").wait_time(1, clock()) == 5.0
+
+
+def test_queued_requests_are_admitted_by_priority() -> None:
+    scheduler = RateLimitScheduler(requests_per_minute=60, tokens_per_minute=0)
+    scheduler.acquire("gpt-4o")
+    scheduler.observe("gpt-4o", requests=(60, 0))
+
+    admitted = []
+
+    def acquire(priority: Priority) -> None:
+        scheduler.acquire("gpt-4o", priority=priority, timeout=10)
+        admitted.append(priority)
+
+    background = threading.Thread(target=acquire, args=(Priority.BACKGROUND,))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=acquire, args=(Priority.INTERACTIVE,))
+    interactive.start()
+    time.sleep(0.05)
+
+    # Capacity for both, reported by the next response
+    scheduler.observe("gpt-4o", requests=(6000, 2))
+    background.join(5)
+    interactive.join(5)
+
+    assert admitted == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+
+def test_image_models_have_no_token_limit() -> None:
+    scheduler = RateLimitScheduler(image_requests_per_minute=5)
+
+    limits = scheduler._limits("dall-e-3")
+
+    assert limits.tokens is None
+    assert limits.requests.capacity == 5
+
+
+def test_estimate_counts_prompt_and_completion_tokens() -> None:
+    model, tokens = estimate_request(chat_request("x" * 400, max_tokens=50))
+
+    assert model == "gpt-4o"
+    assert tokens == 150
+
+
+def test_estimate_for_image_requests_is_requests_only() -> None:
+    request = httpx.Request(
+        "POST",
+        "https://api.openai.com/v1/images/generations",
+        content=json.dumps({"model": "dall-e-3", "prompt": "A studio"}).encode(),
+    )
+
+    assert estimate_request(request) == ("dall-e-3", 0)
+
+
+def test_retry_delay_reads_the_reset_headers() -> None:
+    assert parse_duration("1m30s") == 90.0
+    assert parse_duration("20ms") == 0.02
+    assert retry_delay(httpx.Headers({"retry-after-ms": "1500"})) == 1.5
+    assert retry_delay(httpx.Headers({
+        "x-ratelimit-reset-requests": "2s", "x-ratelimit-reset-tokens": "6m0s",
+    })) == 360.0
+
+
+def test_transport_retries_rate_limited_requests() -> None:
+    responses = [
+        httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": {"code": "rate_limit_exceeded"}}),
+        httpx.Response(200, headers={
+            "x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "99",
+        }, json={"ok": True}),
+    ]
+    sleeps = []
+    scheduler = RateLimitScheduler()
+    transport = RateLimitedTransport(
+        scheduler, transport=httpx.MockTransport(lambda request: responses.pop(0)), sleep=sleeps.append,
+    )
+
+    with httpx.Client(transport=transport) as client:
+        response = client.send(chat_request())
+
+    assert response.status_code == 200
+    assert len(sleeps) == 1
+    assert scheduler._limits("gpt-4o").requests.capacity == 100
+
+
+def test_transport_does_not_retry_exhausted_quota() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(429, json={"error": {"code": "insufficient_quota"}})
+
+    transport = RateLimitedTransport(
+        RateLimitScheduler(), transport=httpx.MockTransport(handler), sleep=lambda _: None,
+    )
+
+    with httpx.Client(transport=transport) as client:
+        response = client.send(chat_request())
+
+    assert response.status_code == 429
+    assert len(calls) == 1
+
+
+def test_transport_queues_at_the_context_priority() -> None:
+    seen = []
+
+    class RecordingScheduler(RateLimitScheduler):
+        def acquire(self, model, tokens=0, priority=Priority.NORMAL, timeout=None):
+            seen.append(priority)
+
+    transport = RateLimitedTransport(
+        RecordingScheduler(), transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+    )
+
+    with httpx.Client(transport=transport) as client, request_priority(Priority.BACKGROUND):
+        client.send(chat_request())
+
+    assert seen == [Priority.BACKGROUND]
+
+
+def test_only_completions_are_hedged() -> None:
+    """A hedged image generation would be billed twice."""
+    assert UPSTREAM.hedge(chat_request())
+    assert not UPSTREAM.hedge(httpx.Request("POST", "https://api.openai.com/v1/images/generations"))
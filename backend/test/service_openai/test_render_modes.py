@@ -0,0 +1,50 @@
+"""Tests for draft and final scene renders."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from discovita.models import RenderMode
+from discovita.service.openai.core.base import OpenAIService
+from discovita.service.openai.core.image_generation import AS_IS_PREFIX, ImageGenerationService
+
+pytestmark = pytest.mark.asyncio
+
+SCENE = {"setting": "a beach", "outfit": "linen", "emotion": "calm"}
+
+
+def make_service() -> ImageGenerationService:
+    open_ai_service = MagicMock(spec=OpenAIService)
+    open_ai_service.generate_image.return_value = [
+        {"url": "https://example.com/image.png", "revised_prompt": "A calm person on a beach"}
+    ]
+    return ImageGenerationService(open_ai_service)
+
+
+async def test_draft_uses_standard_quality() -> None:
+    service = make_service()
+
+    response = await service.safe_generate_scene_async(**SCENE, mode=RenderMode.DRAFT)
+
+    assert response.success
+    call_args = service.open_ai_service.generate_image.call_args[1]
+    assert call_args["quality"] == "standard"
+    assert call_args["model"] == "dall-e-3"
+
+
+async def test_final_is_the_default() -> None:
+    service = make_service()
+
+    await service.safe_generate_scene_async(**SCENE)
+
+    assert service.open_ai_service.generate_image.call_args[1]["quality"] == "hd"
+
+
+async def test_render_final_reuses_the_accepted_prompt_in_hd() -> None:
+    service = make_service()
+
+    response = await service.render_final("A calm person on a beach")
+
+    assert response.success
+    call_args = service.open_ai_service.generate_image.call_args[1]
+    assert call_args["quality"] == "hd"
+    assert call_args["prompt"] == f"{AS_IS_PREFIX}A calm person on a beach"
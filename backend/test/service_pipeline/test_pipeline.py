@@ -0,0 +1,221 @@
+"""Tests for the identity image pipeline."""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from discovita.models import IdentityImageRequest, ProcessedImageResult, ProcessingStatus, SwapFaceResult
+from discovita.service.icons8.models import ImageFaces
+from discovita.service.openai.models.image_models import SafeImageResponse
+from discovita.service.assets import AssetMirror, LocalAssetStore
+from discovita.service.pipeline import IdentityImagePipeline
+from discovita.service.scenes import LibraryScene, SceneLibrary
+from fixtures.image_generation import DALLE_URL, FakeGenerationService
+
+pytestmark = pytest.mark.asyncio
+
+HEADSHOT_URL = "https://example.com/headshot.jpg"
+RESULT_URL = "https://example.com/result.jpg"
+ASSETS_URL = "https://assets.example.com"
+FACE = {"bbox": [10, 10, 200, 200, 0.99], "landmarks": [0.0] * 10}
+
+
+class FakeDescriptionService:
+    async def get_clean_description(self, image_url) -> str:
+        return "short brown hair"
+
+
+class SlowGenerationService(FakeGenerationService):
+    """Generation double that only finishes when cancelled."""
+
+    def __init__(self):
+        super().__init__()
+        self.cancelled = False
+
+    async def safe_generate_scene_async(self, **kwargs) -> SafeImageResponse:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class FakeIcons8Service:
+    """Icons8 double with configurable face detection."""
+
+    def __init__(self, faces: bool = True):
+        self.faces = faces
+        self.swaps = []
+
+    async def get_image_faces(self, url) -> ImageFaces:
+        return ImageFaces(img_url=str(url), faces=[FACE] if self.faces else [])
+
+    async def run_swap(self, source_url, target_url, on_update=None) -> SwapFaceResult:
+        self.swaps.append((str(source_url), target_url))
+        if on_update:
+            on_update(SwapFaceResult(job_id="job", status=ProcessingStatus.PROCESSING, status_name="processing"))
+        return SwapFaceResult(
+            job_id="job",
+            status=ProcessingStatus.READY,
+            status_name="ready",
+            processed=ProcessedImageResult(width=1024, height=1024, type="jpeg", url=RESULT_URL),
+        )
+
+
+def image_server(request: httpx.Request) -> httpx.Response:
+    assert str(request.url) == DALLE_URL
+    return httpx.Response(200, content=b"png bytes", headers={"content-type": "image/png"})
+
+
+@pytest.fixture
+def store(tmp_path) -> LocalAssetStore:
+    return LocalAssetStore(str(tmp_path), base_url=ASSETS_URL)
+
+
+def make_pipeline(store, generation=None, icons8=None, library=None) -> IdentityImagePipeline:
+    mirror = AssetMirror(
+        store, http_client=httpx.AsyncClient(transport=httpx.MockTransport(image_server))
+    )
+    return IdentityImagePipeline(
+        FakeDescriptionService(),
+        generation or FakeGenerationService(),
+        icons8 or FakeIcons8Service(),
+        mirror,
+        library=library,
+    )
+
+
+def make_library() -> SceneLibrary:
+    scene = LibraryScene(
+        id="beach",
+        setting="a sunny beach",
+        outfit="linen clothes",
+        emotion="calm",
+        url=f"{ASSETS_URL}/beach.png",
+        sha256="ab" * 32,
+        prompt="A person in linen on a sunny beach",
+        faces=ImageFaces(img_url=f"{ASSETS_URL}/beach.png", faces=[FACE]),
+    )
+    return SceneLibrary([scene], min_score=0.6)
+
+
+def make_request(**overrides) -> IdentityImageRequest:
+    fields = {"headshot_url": HEADSHOT_URL, "setting": "a beach", "outfit": "linen", "emotion": "calm"}
+    return IdentityImageRequest(**{**fields, **overrides})
+
+
+async def test_pipeline_swaps_headshot_into_mirrored_scene(store) -> None:
+    """The headshot is swapped onto the stored copy of the generated scene, not the DALL-E URL."""
+    icons8 = FakeIcons8Service()
+    pipeline = make_pipeline(store, icons8=icons8)
+
+    events = [event async for event in pipeline.run(make_request())]
+
+    result = events[-1]
+    assert result.event == "result"
+    assert result.data["url"] == RESULT_URL
+    assert result.data["description"] == "short brown hair"
+    assert result.data["augmentedPrompt"] == "A person in a beach"
+    scene_url = result.data["sceneUrl"]
+    assert scene_url.startswith(ASSETS_URL) and scene_url.endswith(".png")
+    assert icons8.swaps == [(HEADSHOT_URL, scene_url)]
+    assert os.listdir(store.directory) == [scene_url.rsplit("/", 1)[1]]
+
+    finished = [e.data["step"] for e in events if e.event == "step" and e.data["status"] == "done"]
+    assert sorted(finished) == ["describe", "generate", "landmarks", "mirror", "swap"]
+    assert any(e.event == "swap" and e.data["status"] == "processing" for e in events)
+
+
+async def test_given_description_skips_describe_step(store, generation_service) -> None:
+    pipeline = make_pipeline(store, generation=generation_service)
+
+    events = [event async for event in pipeline.run(make_request(userDescription="red hair"))]
+
+    assert generation_service.descriptions == ["red hair"]
+    assert not any(e.event == "step" and e.data["step"] == "describe" for e in events)
+
+
+async def test_headshot_without_face_fails_without_swapping(store) -> None:
+    """A faceless headshot stops the run while the scene is still being generated."""
+    generation, icons8 = SlowGenerationService(), FakeIcons8Service(faces=False)
+    pipeline = make_pipeline(store, generation=generation, icons8=icons8)
+
+    events = [event async for event in pipeline.run(make_request())]
+
+    assert events[-1].event == "error"
+    assert events[-1].data == {
+        "step": "landmarks", "status_code": 422, "detail": "No faces detected in headshot"
+    }
+    assert generation.cancelled
+    assert icons8.swaps == []
+
+
+async def test_generation_failure_is_reported(store) -> None:
+    pipeline = make_pipeline(store, generation=FakeGenerationService(fail=True))
+
+    events = [event async for event in pipeline.run(make_request())]
+
+    assert events[-1].event == "error"
+    assert events[-1].data["step"] == "generate"
+    assert events[-1].data["status_code"] == 500
+    assert events[-1].data["detail"] == "Blocked"
+
+
+async def test_safety_violation_is_a_client_error(store) -> None:
+    """A prompt rejected by the safety system is a 422, as on /generate."""
+    pipeline = make_pipeline(store, generation=FakeGenerationService(fail=True, safety_violation=True))
+
+    events = [event async for event in pipeline.run(make_request())]
+
+    assert events[-1].event == "error"
+    assert events[-1].data["step"] == "generate"
+    assert events[-1].data["status_code"] == 422
+
+
+async def test_closing_the_stream_cancels_the_run(store) -> None:
+    """A disconnected client stops the pipeline instead of leaving it running."""
+    generation = SlowGenerationService()
+    pipeline = make_pipeline(store, generation=generation)
+    events = pipeline.run(make_request())
+    while (await events.__anext__()).data.get("step") != "generate":
+        pass
+    await events.aclose()
+
+    assert generation.cancelled
+
+
+async def test_library_scene_is_served_by_a_swap_alone(store, generation_service) -> None:
+    """A request matching a library scene skips describe, generate and mirror."""
+    icons8 = FakeIcons8Service()
+    pipeline = make_pipeline(store, generation=generation_service, icons8=icons8, library=make_library())
+
+    events = [event async for event in pipeline.run(make_request(setting="the beach"))]
+
+    result = events[-1]
+    assert result.data["librarySceneId"] == "beach"
+    assert result.data["sceneUrl"] == f"{ASSETS_URL}/beach.png"
+    assert result.data["augmentedPrompt"] == "A person in linen on a sunny beach"
+    assert result.data["description"] is None
+    assert icons8.swaps == [(HEADSHOT_URL, f"{ASSETS_URL}/beach.png")]
+    assert generation_service.calls == []
+    assert os.listdir(store.directory) == []
+
+    finished = [e.data["step"] for e in events if e.event == "step" and e.data["status"] == "done"]
+    assert finished == ["library", "landmarks", "swap"]
+
+
+async def test_refinements_described_users_and_opt_outs_are_generated(store) -> None:
+    """Requests with feedback, a description or useLibrary=false never use the library."""
+    for request in (
+        make_request(userFeedback="more sun", previousAugmentedPrompt="A beach"),
+        make_request(userDescription="red hair, freckles"),
+        make_request(useLibrary=False),
+    ):
+        generation = FakeGenerationService()
+        pipeline = make_pipeline(store, generation=generation, library=make_library())
+
+        events = [event async for event in pipeline.run(request)]
+
+        assert events[-1].data["librarySceneId"] is None
+        assert len(generation.descriptions) == 1
@@ -0,0 +1,37 @@
+"""Fixtures for S3 service tests."""
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from moto import mock_aws
+
+from discovita.config import Settings
+from discovita.service.s3 import S3Service
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def s3_service():
+    settings = Settings(
+        icons8_api_key="key",
+        icons8_base_url="https://icons8.example.com",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        aws_region="us-east-1",
+        s3_bucket=BUCKET,
+        openai_api_key="key",
+        adalo_app_id="app",
+        adalo_api_key="key",
+    )
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        # Small parts so the multipart path is exercised with a small file
+        service = S3Service(
+            settings,
+            transfer_config=TransferConfig(
+                multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024
+            ),
+        )
+        yield service
+        service.close()
@@ -0,0 +1,36 @@
+"""Tests for the S3-backed asset store."""
+
+import hashlib
+
+from discovita.service.assets import S3AssetStore
+from discovita.service.s3 import S3Service
+
+from .conftest import BUCKET
+
+
+def test_s3_asset_store_uses_content_addressed_uploads(s3_service: S3Service) -> None:
+    store = S3AssetStore(s3_service)
+
+    first = store.put_bytes(b"generated image", "image/png")
+    second = store.put_bytes(b"generated image", "image/png")
+
+    assert first == second
+    key = f"uploads/{first.sha256}.png"
+    assert first.url.endswith(key)
+    obj = s3_service.client.get_object(Bucket=BUCKET, Key=key)
+    assert obj["ContentType"] == "image/png"
+
+
+def test_s3_asset_store_does_not_rehash_known_content(s3_service: S3Service, monkeypatch) -> None:
+    """The digest computed while mirroring is used as is."""
+    def fail(fileobj):
+        raise AssertionError("content was hashed again")
+
+    monkeypatch.setattr(s3_service, "_hash_fileobj", fail)
+    content = b"mirrored image"
+
+    asset = S3AssetStore(s3_service).put_bytes(content, "image/png")
+
+    assert asset.sha256 == hashlib.sha256(content).hexdigest()
+    obj = s3_service.client.get_object(Bucket=BUCKET, Key=f"uploads/{asset.sha256}.png")
+    assert obj["Body"].read() == content
@@ -0,0 +1,89 @@
+"""Tests for content-addressed upload deduplication."""
+
+import hashlib
+import io
+
+from botocore.exceptions import ClientError
+
+from discovita.service.s3 import S3Service
+
+from .conftest import BUCKET
+
+CONTENT = b"the same headshot"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+class CountingClient:
+    """Wraps the S3 client to count HEAD requests."""
+
+    def __init__(self, client):
+        self._client = client
+        self.heads = 0
+
+    def head_object(self, **kwargs):
+        self.heads += 1
+        return self._client.head_object(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class ForbiddenHeadClient(CountingClient):
+    """Answers HEAD like a bucket policy without s3:ListBucket."""
+
+    def head_object(self, **kwargs):
+        self.heads += 1
+        raise ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+
+
+def test_key_is_derived_from_content(s3_service: S3Service) -> None:
+    """The object key is the SHA-256 of the bytes plus the extension."""
+    result = s3_service.upload_fileobj(io.BytesIO(CONTENT), "Face.JPG", "image/jpeg")
+
+    assert result.key == f"uploads/{DIGEST}.jpg"
+    assert result.sha256 == DIGEST
+    assert result.url == f"https://{BUCKET}.s3.us-east-1.amazonaws.com/uploads/{DIGEST}.jpg"
+    assert not result.deduplicated
+
+
+def test_reupload_returns_same_url_without_put(s3_service: S3Service) -> None:
+    """Uploading identical bytes again is answered from the local index."""
+    first = s3_service.upload_fileobj(io.BytesIO(CONTENT), "a.jpg", "image/jpeg")
+    second = s3_service.upload_fileobj(io.BytesIO(CONTENT), "b.jpg", "image/jpeg")
+
+    assert second.url == first.url
+    assert second.deduplicated
+    listed = s3_service.client.list_objects_v2(Bucket=BUCKET, Prefix="uploads/")
+    assert listed["KeyCount"] == 1
+
+
+def test_existing_object_is_found_with_head(s3_service: S3Service) -> None:
+    """Objects uploaded by another process are detected with a HEAD request."""
+    s3_service.client.put_object(Bucket=BUCKET, Key=f"uploads/{DIGEST}.jpg", Body=CONTENT)
+    s3_service.client = CountingClient(s3_service.client)
+
+    result = s3_service.upload_fileobj(io.BytesIO(CONTENT), "a.jpg", "image/jpeg")
+    again = s3_service.upload_fileobj(io.BytesIO(CONTENT), "a.jpg", "image/jpeg")
+
+    assert result.deduplicated and again.deduplicated
+    assert s3_service.client.heads == 1
+
+
+def test_different_content_gets_a_different_key(s3_service: S3Service) -> None:
+    """Different bytes never share a key."""
+    first = s3_service.upload_fileobj(io.BytesIO(CONTENT), "a.jpg", "image/jpeg")
+    other = s3_service.upload_fileobj(io.BytesIO(b"another face"), "a.jpg", "image/jpeg")
+
+    assert first.key != other.key
+
+
+def test_forbidden_head_uploads_anyway(s3_service: S3Service) -> None:
+    """A 403 from HEAD does not fail the upload; the object is written."""
+    s3_service.client = ForbiddenHeadClient(s3_service.client)
+
+    result = s3_service.upload_fileobj(io.BytesIO(CONTENT), "a.jpg", "image/jpeg")
+
+    assert not result.deduplicated
+    assert s3_service.client.heads == 1
+    stored = s3_service.client.get_object(Bucket=BUCKET, Key=result.key)
+    assert stored["Body"].read() == CONTENT
@@ -0,0 +1,140 @@
+"""Tests for direct-to-S3 presigned uploads."""
+
+import base64
+import hashlib
+import io
+import json
+
+import pytest
+import requests
+
+from discovita.service.s3 import S3Service, S3UploadError
+from discovita.service.s3.service import DIRECT_UPLOAD_PREFIX
+
+from .conftest import BUCKET
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+
+def policy_conditions(fields: dict) -> list:
+    return json.loads(base64.b64decode(fields["policy"]))["conditions"]
+
+
+def test_presigned_post_pins_key_type_and_size(s3_service: S3Service) -> None:
+    """The POST policy restricts the key, content type and size."""
+    upload = s3_service.create_presigned_upload("Face.PNG", "image/png", max_bytes=1024)
+
+    assert upload.key.startswith(DIRECT_UPLOAD_PREFIX)
+    assert upload.key.endswith(".png")
+    assert upload.fields["key"] == upload.key
+    assert upload.fields["Content-Type"] == "image/png"
+    conditions = policy_conditions(upload.fields)
+    assert ["content-length-range", 1, 1024] in conditions
+    assert {"Content-Type": "image/png"} in conditions
+    assert {"key": upload.key} in conditions
+
+
+def test_non_image_content_type_is_rejected(s3_service: S3Service) -> None:
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.create_presigned_upload("notes.txt", "text/plain")
+    assert exc_info.value.status_code == 415
+
+
+def post_file(upload, content: bytes) -> None:
+    fields = upload.fields
+    response = requests.post(
+        upload.url, data=fields, files={"file": ("face", content, fields["Content-Type"])}
+    )
+    assert response.status_code == 204
+
+
+def test_presigned_post_pins_declared_digest(s3_service: S3Service) -> None:
+    digest = hashlib.sha256(PNG).hexdigest()
+    upload = s3_service.create_presigned_upload("face.png", "image/png", digest.upper())
+
+    assert upload.fields["x-amz-meta-sha256"] == digest
+    assert {"x-amz-meta-sha256": digest} in policy_conditions(upload.fields)
+
+
+def test_complete_stores_upload_by_content(s3_service: S3Service) -> None:
+    """A finished upload is moved to its content-addressed key."""
+    upload = s3_service.create_presigned_upload("face.PNG", "image/png")
+    post_file(upload, PNG)
+
+    result = s3_service.complete_presigned_upload(upload.key)
+
+    digest = hashlib.sha256(PNG).hexdigest()
+    assert result.key == f"uploads/{digest}.png"
+    assert result.url == f"https://{BUCKET}.s3.us-east-1.amazonaws.com/{result.key}"
+    assert result.sha256 == digest
+    keys = [obj["Key"] for obj in s3_service.client.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert keys == [result.key]
+
+
+def test_completed_upload_is_found_by_declared_digest(s3_service: S3Service) -> None:
+    """The next client with the same file skips the upload."""
+    digest = hashlib.sha256(PNG).hexdigest()
+    upload = s3_service.create_presigned_upload("face.png", "image/png", digest)
+    post_file(upload, PNG)
+    assert s3_service.find_existing_upload(digest, "face.png") is None
+
+    result = s3_service.complete_presigned_upload(upload.key)
+
+    assert s3_service.find_existing_upload(digest, "other.png") == result.url
+
+
+def test_complete_rejects_missing_and_invalid_objects(s3_service: S3Service) -> None:
+    """Missing objects are 404s; oversized or non-image objects are deleted."""
+    upload = s3_service.create_presigned_upload("face.jpg", "image/jpeg")
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.complete_presigned_upload(upload.key)
+    assert exc_info.value.status_code == 404
+
+    s3_service.client.put_object(Bucket=BUCKET, Key=upload.key, Body=b"x" * 10, ContentType="image/jpeg")
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.complete_presigned_upload(upload.key, max_bytes=5)
+    assert exc_info.value.status_code == 413
+    assert s3_service.client.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
+
+
+def test_complete_sniffs_content_not_declared_type(s3_service: S3Service) -> None:
+    """An object sent as image/png that is not an image is deleted."""
+    upload = s3_service.create_presigned_upload("face.png", "image/png")
+    post_file(upload, b"<html><script>alert(1)</script></html>")
+
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.complete_presigned_upload(upload.key)
+
+    assert exc_info.value.status_code == 415
+    assert s3_service.client.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
+
+
+def test_complete_rejects_digest_mismatch(s3_service: S3Service) -> None:
+    """Content that does not match its declared hash is not stored under it."""
+    digest = hashlib.sha256(b"some other file").hexdigest()
+    upload = s3_service.create_presigned_upload("face.png", "image/png", digest)
+    post_file(upload, PNG)
+
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.complete_presigned_upload(upload.key)
+
+    assert exc_info.value.status_code == 422
+    assert s3_service.client.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
+    assert s3_service.find_existing_upload(digest, "face.png") is None
+
+
+def test_complete_only_accepts_direct_upload_keys(s3_service: S3Service) -> None:
+    with pytest.raises(S3UploadError) as exc_info:
+        s3_service.complete_presigned_upload("uploads/other.jpg")
+    assert exc_info.value.status_code == 400
+
+
+def test_existing_content_is_found_by_hash(s3_service: S3Service) -> None:
+    """Clients that send a hash of already uploaded content can skip the upload."""
+    content = b"known face"
+    digest = hashlib.sha256(content).hexdigest()
+    assert s3_service.find_existing_upload(digest, "a.jpg") is None
+
+    uploaded = s3_service.upload_fileobj(io.BytesIO(content), "a.jpg", "image/jpeg")
+
+    assert s3_service.find_existing_upload(digest.upper(), "b.JPG") == uploaded.url
@@ -0,0 +1,46 @@
+"""Tests for streaming uploads to S3."""
+
+import io
+import tempfile
+
+from discovita.service.s3 import FileUploadRequest, S3Service
+
+from .conftest import BUCKET
+
+
+def stored_object(service: S3Service, url: str) -> dict:
+    key = url.split(".amazonaws.com/", 1)[1]
+    return service.client.get_object(Bucket=BUCKET, Key=key)
+
+
+def test_upload_fileobj_streams_spooled_file(s3_service: S3Service) -> None:
+    """A spooled file is uploaded with its content type and extension."""
+    with tempfile.SpooledTemporaryFile(max_size=1024) as spooled:
+        spooled.write(b"image bytes" * 1000)
+        spooled.seek(0)
+        url = s3_service.upload_fileobj(spooled, "face.png", "image/png").url
+
+    assert url.startswith(f"https://{BUCKET}.s3.us-east-1.amazonaws.com/uploads/")
+    assert url.endswith(".png")
+    obj = stored_object(s3_service, url)
+    assert obj["ContentType"] == "image/png"
+    assert obj["Body"].read() == b"image bytes" * 1000
+
+
+def test_large_files_use_multipart_upload(s3_service: S3Service) -> None:
+    """Files above the threshold are uploaded in parts."""
+    content = b"x" * (11 * 1024 * 1024)
+    url = s3_service.upload_fileobj(io.BytesIO(content), "big.jpg", "image/jpeg").url
+
+    obj = stored_object(s3_service, url)
+    # Multipart uploads get an ETag suffixed with the number of parts
+    assert obj["ETag"].strip('"').endswith("-3")
+    assert obj["ContentLength"] == len(content)
+
+
+def test_upload_request_still_supported(s3_service: S3Service) -> None:
+    """In-memory uploads go through the same path."""
+    url = s3_service.upload(
+        FileUploadRequest(filename="a.jpg", content_type="image/jpeg", content=b"abc")
+    )
+    assert stored_object(s3_service, url)["Body"].read() == b"abc"
@@ -0,0 +1,121 @@
+"""Tests for the /upload route."""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from discovita.api.routes import upload
+from discovita.config import Settings
+from discovita.service.imaging import ImageNormalizer
+from discovita.service.s3 import S3Service
+from discovita.utils.background import BackgroundTaskSet
+
+from .conftest import BUCKET
+
+
+class RecordingService:
+    """Stand-in for the description and Icons8 services."""
+
+    def __init__(self):
+        self.urls = []
+
+    async def get_clean_description(self, url: str) -> str:
+        self.urls.append(url)
+        return "description"
+
+    async def get_image_faces(self, url: str) -> None:
+        self.urls.append(url)
+
+
+@pytest.fixture
+def precompute_service() -> RecordingService:
+    return RecordingService()
+
+
+@pytest.fixture
+def client(s3_service: S3Service, precompute_service: RecordingService):
+    settings = Settings(
+        icons8_api_key="key",
+        icons8_base_url="https://icons8.example.com",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        aws_region="us-east-1",
+        s3_bucket=BUCKET,
+        openai_api_key="key",
+        adalo_app_id="app",
+        adalo_api_key="key",
+        upload_max_dimension=100,
+        upload_max_bytes=1024 * 1024,
+    )
+    normalizer = ImageNormalizer(max_dimension=100, max_workers=1)
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[upload.get_settings] = lambda: settings
+    app.dependency_overrides[upload.get_s3_service] = lambda: s3_service
+    app.dependency_overrides[upload.get_normalizer] = lambda: normalizer
+    app.dependency_overrides[upload.get_icons8_service] = lambda: precompute_service
+    app.dependency_overrides[upload.get_image_description_service] = lambda: precompute_service
+    app.dependency_overrides[upload.get_background_tasks] = BackgroundTaskSet
+    with TestClient(app) as test_client:
+        yield test_client
+    normalizer.close()
+
+
+def png_bytes(size=(400, 300)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "purple").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_upload_stores_normalized_jpeg(client: TestClient, s3_service: S3Service) -> None:
+    """The stored object is the downscaled JPEG, not the original PNG."""
+    response = client.post("/upload", files={"file": ("me.png", png_bytes(), "image/png")})
+
+    assert response.status_code == 200
+    url = response.json()["url"]
+    assert url.endswith(".jpg")
+    obj = s3_service.client.get_object(Bucket=BUCKET, Key=url.split(".com/", 1)[1])
+    assert obj["ContentType"] == "image/jpeg"
+    assert Image.open(io.BytesIO(obj["Body"].read())).size == (100, 75)
+
+
+def test_upload_rejects_non_images_by_content(client: TestClient) -> None:
+    """The declared content type is not trusted."""
+    response = client.post("/upload", files={"file": ("me.png", b"#!/bin/sh\necho hi", "image/png")})
+    assert response.status_code == 415
+
+
+def test_upload_rejects_large_files(client: TestClient) -> None:
+    content = png_bytes()[:16] + b"\0" * (2 * 1024 * 1024)
+    response = client.post("/upload", files={"file": ("me.png", content, "image/png")})
+    assert response.status_code == 413
+
+
+def test_upload_precompute_runs_description_and_face_detection(
+    client: TestClient, precompute_service: RecordingService
+) -> None:
+    """With precompute=true the headshot is described and its faces detected."""
+    response = client.post(
+        "/upload",
+        params={"precompute": "true"},
+        files={"file": ("me.png", png_bytes(), "image/png")},
+    )
+
+    assert response.status_code == 200
+    url = response.json()["url"]
+    # The background tasks run on the test client's event loop
+    client.portal.call(asyncio.sleep, 0.05)
+    assert precompute_service.urls == [url, url]
+
+
+def test_upload_skips_precompute_by_default(
+    client: TestClient, precompute_service: RecordingService
+) -> None:
+    response = client.post("/upload", files={"file": ("me.png", png_bytes(), "image/png")})
+
+    assert response.status_code == 200
+    assert precompute_service.urls == []
@@ -0,0 +1,72 @@
+"""Tests for building library scenes."""
+
+import httpx
+import pytest
+from discovita.models import RenderMode
+from discovita.service.assets import AssetMirror, LocalAssetStore
+from discovita.service.icons8.models import ImageFaces
+from discovita.service.scenes import SceneBuildError, SceneCombination, SceneLibraryBuilder
+
+pytestmark = pytest.mark.asyncio
+
+ASSETS_URL = "https://assets.example.com"
+FACE = {"bbox": [10, 10, 200, 200, 0.99], "landmarks": [0.0] * 10}
+
+
+class FakeIcons8Service:
+    def __init__(self, faces: bool = True):
+        self.faces = faces
+        self.urls = []
+
+    async def get_image_faces(self, url) -> ImageFaces:
+        self.urls.append(url)
+        return ImageFaces(img_url=url, faces=[FACE] if self.faces else [])
+
+
+def image_server(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=str(request.url).encode(), headers={"content-type": "image/png"})
+
+
+def make_builder(tmp_path, generation, icons8=None) -> SceneLibraryBuilder:
+    mirror = AssetMirror(
+        LocalAssetStore(str(tmp_path), base_url=ASSETS_URL),
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(image_server)),
+    )
+    return SceneLibraryBuilder(generation, icons8 or FakeIcons8Service(), mirror)
+
+
+def combination(setting: str) -> SceneCombination:
+    return SceneCombination(setting=setting, outfit="a suit", emotion="confident")
+
+
+async def test_scene_is_generated_person_neutral_and_stored(tmp_path, generation_service) -> None:
+    icons8 = FakeIcons8Service()
+    builder = make_builder(tmp_path, generation_service, icons8)
+
+    scene = await builder.build_scene(combination("office"))
+
+    assert generation_service.calls[0]["mode"] == RenderMode.FINAL
+    assert "user_description" not in generation_service.calls[0]
+    assert scene.url.startswith(ASSETS_URL)
+    assert scene.id == scene.sha256[:16]
+    assert scene.prompt == "A person in office"
+    assert scene.faces.faces
+    # Faces are detected on the stored copy, not the expiring DALL-E URL
+    assert icons8.urls == [scene.url]
+
+
+async def test_scene_without_a_face_is_rejected(tmp_path, generation_service) -> None:
+    builder = make_builder(tmp_path, generation_service, FakeIcons8Service(faces=False))
+
+    with pytest.raises(SceneBuildError, match="No faces"):
+        await builder.build_scene(combination("landscape"))
+
+
+async def test_build_skips_failed_scenes(tmp_path, generation_service) -> None:
+    builder = make_builder(tmp_path, generation_service)
+
+    scenes = await builder.build([combination("office"), combination("blocked"), combination("park")])
+
+    assert [scene.setting for scene in scenes] == ["office", "park"]
+    with pytest.raises(SceneBuildError, match="Blocked"):
+        await builder.build_scene(combination("blocked"))
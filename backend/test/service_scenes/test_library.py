@@ -0,0 +1,107 @@
+"""Tests for the scene library index and manifest."""
+
+import asyncio
+
+from discovita.service.icons8.cache import LandmarkCache
+from discovita.service.icons8.models import ImageFaces
+from discovita.service.scenes import LibraryScene, SceneIndex, SceneLibrary
+from discovita.service.scenes.index import terms
+from discovita.utils.content_hash import ContentHasher
+
+FACE = {"bbox": [10, 10, 200, 200, 0.99], "landmarks": [0.0] * 10}
+
+
+def make_scene(scene_id: str, setting: str, outfit: str, emotion: str) -> LibraryScene:
+    url = f"https://assets.example.com/{scene_id}.png"
+    return LibraryScene(
+        id=scene_id,
+        setting=setting,
+        outfit=outfit,
+        emotion=emotion,
+        url=url,
+        sha256=scene_id * 8,
+        prompt=f"A person in {setting}",
+        faces=ImageFaces(img_url=url, faces=[FACE]),
+    )
+
+
+SCENES = [
+    make_scene("office", "a modern office", "a business suit", "confident"),
+    make_scene("summit", "a mountain summit", "hiking gear", "triumphant"),
+    make_scene("beach", "a beach at sunset", "casual summer clothes", "peaceful"),
+]
+
+
+def test_terms_ignore_stopwords_case_and_plurals() -> None:
+    assert terms("The Mountains at sunset") == {"mountain", "sunset"}
+    assert terms("a dress") == {"dress"}
+
+
+def test_same_words_match_exactly() -> None:
+    index = SceneIndex(SCENES)
+
+    match = index.match("Modern office", "business suits", "CONFIDENT", min_score=0.99)
+
+    assert match.scene.id == "office"
+    assert match.score == 1.0
+
+
+def test_close_request_matches_best_scene() -> None:
+    index = SceneIndex(SCENES)
+
+    match = index.match("a sunny beach at sunset", "summer clothes", "peaceful", min_score=0.6)
+
+    assert match.scene.id == "beach"
+    assert 0.6 <= match.score < 1.0
+
+
+def test_unrelated_request_does_not_match() -> None:
+    index = SceneIndex(SCENES)
+
+    assert index.match("a space station", "a space suit", "curious", min_score=0.5) is None
+    # Same setting, but everything else differs
+    assert index.match("a modern office", "pajamas", "sleepy", min_score=0.75) is None
+
+
+def test_different_emotion_does_not_match() -> None:
+    """Setting and outfit alone score 0.8, but the emotion must match too."""
+    index = SceneIndex([make_scene("joy", "a sunny beach", "a linen shirt", "joyful")])
+
+    for emotion in ("grieving", "angry", "terrified"):
+        assert index.match("a sunny beach", "linen shirt", emotion, min_score=0.75) is None
+    assert index.match("a sunny beach", "linen shirt", "joyful and relaxed", min_score=0.75)
+
+
+def test_different_outfit_does_not_match() -> None:
+    index = SceneIndex([make_scene("joy", "a sunny beach", "a linen shirt", "joyful")])
+
+    assert index.match("a sunny beach", "a wetsuit", "joyful", min_score=0.5) is None
+
+
+def test_library_round_trips_through_manifest(tmp_path) -> None:
+    path = str(tmp_path / "library.json")
+
+    SceneLibrary.save(SCENES, path)
+    library = SceneLibrary.load(path)
+
+    assert [scene.id for scene in library.scenes] == ["office", "summit", "beach"]
+    assert library.scenes[0].faces.faces[0].bbox == FACE["bbox"]
+
+
+def test_missing_manifest_gives_empty_library(tmp_path) -> None:
+    library = SceneLibrary.load(str(tmp_path / "missing.json"))
+
+    assert len(library) == 0
+    assert library.match("a modern office", "a business suit", "confident") is None
+
+
+def test_prime_seeds_hasher_and_landmark_cache() -> None:
+    hasher = ContentHasher()
+    landmark_cache = LandmarkCache()
+    library = SceneLibrary(SCENES, hasher=hasher, landmark_cache=landmark_cache)
+
+    library.prime(SCENES[0])
+
+    assert landmark_cache.get(SCENES[0].sha256) == SCENES[0].faces
+    # Known digests are returned without downloading the scene
+    assert asyncio.run(hasher.hash_url(SCENES[0].url)) == SCENES[0].sha256
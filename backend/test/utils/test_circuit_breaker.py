@@ -0,0 +1,111 @@
+"""Tests for circuit breakers and the sync resilient transport."""
+
+import threading
+
+import httpx
+from discovita.utils.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    ResilientTransport,
+    Upstream,
+    idempotent_requests,
+)
+
+URL = "https://api.example.com/v1/items/42"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker("upstream", window=4, min_calls=4, failure_threshold=0.5, reset_timeout=10, clock=clock)
+
+
+def test_breaker_opens_when_failures_spike() -> None:
+    breaker = make_breaker(FakeClock())
+
+    for success in (True, True, False):
+        breaker.record(success)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record(False)
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_probes_once_after_reset_timeout() -> None:
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one probe at a time
+
+    breaker.record(False)
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_circuit_fails_fast_with_503() -> None:
+    calls = []
+    upstream = Upstream("items", breaker=make_breaker(FakeClock()))
+    transport = ResilientTransport(
+        upstream, httpx.MockTransport(lambda request: calls.append(request) or httpx.Response(500))
+    )
+
+    with httpx.Client(transport=transport) as client:
+        statuses = [client.get(URL).status_code for _ in range(6)]
+
+    assert statuses == [500] * 4 + [503] * 2
+    assert len(calls) == 4
+    assert upstream.metrics.failures == 4
+    assert upstream.metrics.short_circuited == 2
+
+
+def test_slow_request_is_hedged() -> None:
+    release = threading.Event()
+    calls = []
+    stall_next = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal stall_next
+        calls.append(request)
+        if stall_next:
+            stall_next = False
+            release.wait(5)
+            return httpx.Response(200, json={"attempt": "primary"})
+        return httpx.Response(200, json={"attempt": "hedge"})
+
+    upstream = Upstream("items", hedge=idempotent_requests(), min_samples=2, max_hedge_ratio=1.0)
+    transport = ResilientTransport(upstream, httpx.MockTransport(handler))
+
+    with httpx.Client(transport=transport) as client:
+        client.get("https://api.example.com/slow")  # Fast samples for the route
+        client.get("https://api.example.com/slow")
+        stall_next = True
+        response = client.get("https://api.example.com/slow")
+        release.set()
+
+    assert response.json() == {"attempt": "hedge"}
+    assert len(calls) == 4
+    assert upstream.metrics.hedged == 1
+    assert upstream.metrics.hedge_wins == 1
+
+
+def test_writes_are_not_hedged() -> None:
+    upstream = Upstream("items", hedge=idempotent_requests("/search"), min_samples=0, max_hedge_ratio=1.0)
+
+    assert upstream.hedge_delay(httpx.Request("POST", "https://api.example.com/items")) is None
+    assert upstream.hedge_delay(httpx.Request("POST", "https://api.example.com/search")) is not None
@@ -0,0 +1,57 @@
+"""Tests for the console formatter's caller context."""
+
+import logging
+
+from discovita.utils.logger.logger import ConsoleFormatter, visible_length
+
+
+class Greeter:
+    def greet(self, logger: logging.Logger) -> None:
+        logger.info("hello")
+
+
+def module_function(logger: logging.Logger) -> None:
+    logger.info("hello")
+
+
+def capture(call, context_display: str) -> str:
+    records = []
+    logger = logging.getLogger(f"test.console_formatter.{context_display}")
+    logger.propagate = False
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        call(logger)
+    finally:
+        logger.removeHandler(handler)
+    return ConsoleFormatter(context_display=context_display).get_context_info(records[0])
+
+
+def test_method_context_includes_class_name() -> None:
+    """Methods are reported as Class.method() from the record's location."""
+    context = capture(Greeter().greet, "full")
+    assert context.startswith("\x1b[90m[Greeter.greet() in test_console_formatter.py:")
+
+
+def test_function_context_has_no_class() -> None:
+    """Plain functions are reported without a class name."""
+    assert capture(module_function, "class_function") == "\x1b[90m[module_function()]\x1b[0m"
+
+
+def test_no_context_by_default() -> None:
+    """Context display "none" leaves the message untouched."""
+    formatter = ConsoleFormatter(context_display="none")
+    record = logging.makeLogRecord({"levelno": logging.INFO, "msg": "hi"})
+    assert formatter.format(record) == "\x1b[32mINFO\x1b[0m:\t  hi"
+
+
+def test_context_is_right_aligned_to_terminal_width() -> None:
+    """The context ends at the cached terminal width minus a margin."""
+    formatter = ConsoleFormatter(context_display="function")
+    formatter.terminal_width = 60
+    record = logging.makeLogRecord(
+        {"levelno": logging.WARNING, "msg": "careful", "funcName": "run", "pathname": "missing.py"}
+    )
+    assert visible_length(formatter.format(record)) == 58
@@ -0,0 +1,92 @@
+"""Tests for content hashing of remote files."""
+
+import hashlib
+
+import httpx
+import pytest
+from discovita.utils.content_hash import ContentHasher, ContentHashError
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_hash_is_streamed_and_memoized() -> None:
+    """The digest matches the body and each URL is downloaded once."""
+    body = b"image-bytes" * 10_000
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        return httpx.Response(200, content=body)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        hasher = ContentHasher(http_client=client)
+        first = await hasher.hash_url("https://example.com/a.jpg")
+        second = await hasher.hash_url("https://example.com/a.jpg")
+
+    assert first == second == hashlib.sha256(body).hexdigest()
+    assert len(requests) == 1
+
+
+async def test_remembered_digest_skips_download() -> None:
+    """Known digests are returned without fetching the URL."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("should not download")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        hasher = ContentHasher(http_client=client)
+        hasher.remember("https://example.com/a.jpg", "abc")
+        assert await hasher.hash_url("https://example.com/a.jpg") == "abc"
+
+
+async def test_http_errors_are_raised() -> None:
+    """Failed downloads raise instead of hashing an error page."""
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    ) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await ContentHasher(http_client=client).hash_url("https://example.com/missing.jpg")
+
+
+async def test_only_allowed_hosts_are_downloaded() -> None:
+    """Client-supplied URLs on other hosts are refused without a request."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        return httpx.Response(200, content=b"image")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        hasher = ContentHasher(http_client=client, allowed_hosts=["assets.example.com"])
+        for url in (
+            "https://169.254.169.254/latest/meta-data/",
+            "http://assets.example.com/a.jpg",
+            "https://evil.example.com/a.jpg",
+        ):
+            with pytest.raises(ContentHashError):
+                await hasher.hash_url(url)
+        hasher.remember("https://evil.example.com/known.jpg", "abc")
+
+        assert await hasher.hash_url("https://assets.example.com/a.jpg")
+        assert await hasher.hash_url("https://evil.example.com/known.jpg") == "abc"
+
+    assert [str(url) for url in requests] == ["https://assets.example.com/a.jpg"]
+
+
+async def test_redirects_off_allowed_hosts_are_not_followed() -> None:
+    """An allowed host cannot redirect the download to another host."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        if request.url.host == "assets.example.com":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return httpx.Response(200, content=b"secret")
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), follow_redirects=True
+    ) as client:
+        hasher = ContentHasher(http_client=client, allowed_hosts=["assets.example.com"])
+        with pytest.raises(httpx.HTTPStatusError):
+            await hasher.hash_url("https://assets.example.com/a.jpg")
+
+    assert [str(url) for url in requests] == ["https://assets.example.com/a.jpg"]
@@ -0,0 +1,46 @@
+"""Tests for the disk LRU cache."""
+
+import pytest
+
+from discovita.utils.disk_cache import DiskLRUCache
+
+
+def test_round_trip(tmp_path) -> None:
+    cache = DiskLRUCache(str(tmp_path), max_bytes=100)
+    cache.set("a", b"hello")
+
+    assert cache.get("a") == b"hello"
+    assert cache.get("missing") is None
+    assert cache.total_bytes == 5
+
+
+def test_evicts_least_recently_used_over_cap(tmp_path) -> None:
+    """Reading an entry protects it from eviction."""
+    cache = DiskLRUCache(str(tmp_path), max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+
+    assert "b" not in cache
+    assert not (tmp_path / "b").exists()
+    assert cache.get("a") == b"1234"
+    assert cache.total_bytes == 8
+
+
+def test_index_is_rebuilt_from_disk(tmp_path) -> None:
+    """Entries survive a restart; partial writes are cleaned up."""
+    DiskLRUCache(str(tmp_path), max_bytes=100).set("a", b"kept")
+    (tmp_path / ".b.123.tmp").write_bytes(b"partial")
+
+    reloaded = DiskLRUCache(str(tmp_path), max_bytes=100)
+
+    assert reloaded.get("a") == b"kept"
+    assert reloaded.total_bytes == 4
+    assert not (tmp_path / ".b.123.tmp").exists()
+
+
+def test_rejects_keys_that_are_not_plain_names(tmp_path) -> None:
+    cache = DiskLRUCache(str(tmp_path), max_bytes=100)
+    with pytest.raises(ValueError):
+        cache.set("../escape", b"x")
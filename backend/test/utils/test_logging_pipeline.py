@@ -0,0 +1,40 @@
+"""Tests for the application logging pipeline."""
+
+import json
+import logging
+
+from discovita.utils.logger.pipeline import JsonLinesFormatter, configure_app_logging
+
+
+def test_json_lines_include_extra_fields() -> None:
+    """Fields passed through `extra` end up in the JSON object."""
+    record = logging.makeLogRecord(
+        {"name": "icons8", "levelname": "WARNING", "msg": "status %s", "args": (500,)}
+    )
+    record.icons8 = {"endpoint": "get_bbox"}
+
+    entry = json.loads(JsonLinesFormatter().format(record))
+
+    assert entry["message"] == "status 500"
+    assert entry["logger"] == "icons8"
+    assert entry["icons8"] == {"endpoint": "get_bbox"}
+
+
+def test_pipeline_writes_text_and_json_files(tmp_path) -> None:
+    """Records reach the rotating text and JSON-lines files once flushed."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        listener = configure_app_logging(log_dir=str(tmp_path), log_filename="app.log", json_lines=True)
+        logging.getLogger("test.pipeline").info("hello %s", "world")
+        listener.stop()
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+    assert "hello world" in (tmp_path / "app.log").read_text()
+    entry = json.loads((tmp_path / "app.jsonl").read_text().splitlines()[-1])
+    assert entry["message"] == "hello world"
@@ -0,0 +1,71 @@
+"""Tests for queue-based logging."""
+
+import logging
+import queue
+
+from discovita.utils.logger.queue import NonBlockingQueueHandler, start_queue_logging
+
+
+class RenderCounter:
+    """Argument that counts how often it is rendered."""
+
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self) -> str:
+        self.renders += 1
+        return "rendered"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(self.format(record))
+
+
+def test_arguments_are_rendered_by_the_listener_only() -> None:
+    """The caller enqueues the record without formatting its arguments."""
+    logger = logging.getLogger("test.queue_logging.render")
+    logger.propagate = False
+    target = ListHandler()
+    listener = start_queue_logging(logger, [target])
+    argument = RenderCounter()
+
+    logger.warning("value: %s", argument)
+    assert argument.renders == 0
+
+    listener.stop()
+    assert target.messages == ["value: rendered"]
+    assert argument.renders == 1
+
+
+def test_full_queue_drops_records_instead_of_blocking() -> None:
+    """Records beyond the queue capacity are counted and dropped."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test.queue_logging.drop")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    logger.warning("first")
+    logger.warning("second")
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_stop_flushes_a_full_queue() -> None:
+    """Stopping the listener waits for room instead of failing on a full queue."""
+    logger = logging.getLogger("test.queue_logging.stop")
+    logger.propagate = False
+    target = ListHandler()
+    listener = start_queue_logging(logger, [target], max_queue_size=1)
+    listener.stop()
+    listener.queue.put_nowait(logging.makeLogRecord({"msg": "queued", "levelno": logging.INFO}))
+
+    listener.start()
+    listener.stop()
+
+    assert target.messages == ["queued"]
@@ -0,0 +1,72 @@
+"""Tests for hedged requests through the async resilient transport."""
+
+import asyncio
+
+import httpx
+import pytest
+from discovita.utils.resilience import AsyncResilientTransport, Upstream, idempotent_requests
+
+pytestmark = pytest.mark.asyncio
+
+STATUS_URL = "https://api.example.com/process_image/abc123"
+
+
+def make_upstream() -> Upstream:
+    return Upstream("icons8", hedge=idempotent_requests("/get_bbox"), min_samples=2, max_hedge_ratio=1.0)
+
+
+async def test_hedge_answers_when_the_primary_stalls() -> None:
+    calls = 0
+    cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return httpx.Response(200, json={"call": calls})
+
+    upstream = make_upstream()
+    async with httpx.AsyncClient(transport=AsyncResilientTransport(upstream, httpx.MockTransport(handler))) as client:
+        await client.get(STATUS_URL)
+        await client.get("https://api.example.com/process_image/def456")  # Same route
+        response = await client.get(STATUS_URL)
+
+    assert response.json() == {"call": 4}
+    assert cancelled.is_set()
+    assert upstream.metrics.hedge_wins == 1
+
+
+async def test_job_submissions_are_never_hedged() -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls > 2:
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, json={})
+
+    upstream = make_upstream()
+    async with httpx.AsyncClient(transport=AsyncResilientTransport(upstream, httpx.MockTransport(handler))) as client:
+        for _ in range(3):
+            await client.post("https://api.example.com/process_image", json={})
+
+    assert calls == 3
+    assert upstream.metrics.hedged == 0
+
+
+async def test_transport_errors_count_as_failures() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    upstream = make_upstream()
+    async with httpx.AsyncClient(transport=AsyncResilientTransport(upstream, httpx.MockTransport(handler))) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get(STATUS_URL)
+
+    assert upstream.metrics.failures == 1
@@ -0,0 +1,68 @@
+"""Tests for single-flight call coalescing."""
+
+import asyncio
+
+import pytest
+from discovita.utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_concurrent_calls_share_one_execution() -> None:
+    """Callers with the same key get the result of a single call."""
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+async def test_errors_are_shared_and_not_cached() -> None:
+    """A failure reaches every waiter, and the next call runs again."""
+    flight: SingleFlight[int] = SingleFlight()
+    attempts = 0
+
+    async def failing() -> int:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        await flight.do("key", failing)
+    assert attempts == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call() -> None:
+    """Cancelling one waiter leaves the call running for the others."""
+    flight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def work() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
@@ -0,0 +1,86 @@
+"""Tests for coalescing blocking calls across threads."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from discovita.service.openai.core.base import OpenAIService
+from discovita.utils.singleflight import ThreadSingleFlight, coalescing, request_key
+from pydantic import BaseModel
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight: ThreadSingleFlight[int] = ThreadSingleFlight()
+    release = threading.Event()
+    calls = 0
+
+    def work() -> int:
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return 42
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "key", work) for _ in range(4)]
+        while flight.coalesced < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [42] * 4
+    assert calls == 1
+    assert len(flight) == 0
+
+
+def test_failure_is_shared_and_not_remembered() -> None:
+    flight: ThreadSingleFlight[int] = ThreadSingleFlight()
+
+    def fail() -> int:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_request_key_is_canonical() -> None:
+    assert request_key("chat", model="gpt-4o", messages=[{"role": "user"}]) == request_key(
+        "chat", messages=[{"role": "user"}], model="gpt-4o"
+    )
+    assert request_key(response_format=Answer) != request_key(response_format=BaseModel)
+    assert request_key(Answer(text="a")) != request_key(Answer(text="b"))
+
+
+def make_openai_service(flight: ThreadSingleFlight) -> OpenAIService:
+    service = OpenAIService(api_key="test-key", in_flight=flight)
+    service.client = MagicMock()
+    return service
+
+
+def test_openai_calls_are_coalesced_and_can_opt_out() -> None:
+    flight = ThreadSingleFlight()
+    service = make_openai_service(flight)
+    release = threading.Event()
+    service.client.images.generate.side_effect = lambda **kwargs: release.wait(5) and MagicMock(data=[])
+
+    def generate():
+        return service.generate_image(prompt="A studio", model="dall-e-3")
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(generate) for _ in range(2)]
+        while flight.coalesced < 1:
+            threading.Event().wait(0.01)
+        release.set()
+        [future.result() for future in futures]
+
+    assert service.client.images.generate.call_count == 1
+
+    with coalescing(False):
+        generate()
+    assert service.client.images.generate.call_count == 2